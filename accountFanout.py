@@ -0,0 +1,216 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from config import config
+from tracing import tracer
+
+# État du processus worker (un compte MT5 par processus)
+_worker = {}
+
+
+def _init_worker(account_type, credentials, risk_per_signal_eur, fake_terminal=None):
+    """
+    Initialise un processus worker: terminal MT5 du compte, session, SendOrder et RiskManager.
+
+    Args:
+        account_type (str): Nom du compte
+        credentials (dict): {login, password, server, path}
+        risk_per_signal_eur (float): Budget de risque du compte par signal
+        fake_terminal (dict): Paramètres d'un FakeTerminal (tests/benchmarks hors Windows)
+    """
+    if fake_terminal is not None:
+        import fakeMt5
+        fakeMt5.install(fakeMt5.FakeTerminal(**fake_terminal))
+
+    # Imports MT5 après l'installation éventuelle du faux terminal
+    from exposureBook import ExposureBook
+    from mt5Session import get_session
+    from order import SendOrder
+    from riskManager import RiskManager
+    from symbolResolver import symbol_resolver
+
+    session = get_session(account_type, credentials)
+    # Sans heartbeat, les appels mis en file pendant une déconnexion ne seraient jamais rejoués
+    session.start_heartbeat()
+    _worker.update(
+        account_type=account_type,
+        session=session,
+        sender=SendOrder(account_type),
+        risk_manager=RiskManager(risk_per_signal_eur),
+        # Limite MAX_RISK_PERCENTAGE contrôlée sur le solde et l'exposition propres au compte
+        exposure_book=ExposureBook(),
+        resolver=symbol_resolver
+    )
+    # Livre synchronisé au démarrage puis en tâche de fond (comme exposure_sync_loop du bot):
+    # le chemin d'un signal ne fait que record_results
+    threading.Thread(target=_exposure_sync_loop, name=f"exposure-{account_type}", daemon=True).start()
+
+
+def _exposure_sync_loop():
+    """Rapproche périodiquement le livre d'exposition du worker de son terminal (thread MT5)."""
+    session, exposure_book = _worker['session'], _worker['exposure_book']
+    while True:
+        try:
+            if session.is_connected:
+                session.submit(exposure_book.sync).result(timeout=config.MT5_FANOUT_TIMEOUT)
+        except Exception as e:
+            print(f"❌ Fan-out {_worker['account_type']}: erreur synchronisation exposition: {e}")
+        time.sleep(config.EXPOSURE_SYNC_INTERVAL)
+
+
+def _worker_status():
+    session = _worker['session']
+    return {'account': _worker['account_type'], 'connected': session.is_connected, 'login': session.current_login}
+
+
+def _worker_execute(orders):
+    """Dimensionne puis place les jambes sur le compte du worker (thread MT5 du processus)."""
+    start = time.perf_counter()
+    # Au-delà, aucun ordre n'est plus envoyé: le parent a déjà rapporté l'échec du compte
+    deadline = time.monotonic() + config.MT5_FANOUT_TIMEOUT
+    sender = _worker['sender']
+    risk_manager = _worker['risk_manager']
+    exposure_book = _worker['exposure_book']
+    if not sender.session.is_connected:
+        return _failed_report(_worker['account_type'], "terminal MT5 déconnecté", start)
+
+    def size_and_place():
+        # Chaque courtier a ses propres noms de symboles (XAUUSD.m chez l'un, GOLD chez l'autre)
+        resolved = {}
+        for order in orders:
+            if order['symbol'] not in resolved:
+                resolved[order['symbol']] = _worker['resolver'].resolve(order['symbol'])
+        if not all(resolved.values()):
+            return [], [], "symbole introuvable chez le courtier"
+        orders[:] = [{**order, 'symbol': resolved[order['symbol']]} for order in orders]
+        lot_sizes = risk_manager.calculate_lot_sizes(orders)
+        # Exécution séquentielle dans le worker: contrôle et placement ne peuvent pas se croiser
+        lot_sizes = exposure_book.fit(orders, lot_sizes, risk_manager)
+        if lot_sizes is None:
+            return [], [], "limite de risque du compte atteinte"
+        results = sender.place_orders_batch(orders, lot_sizes, deadline=deadline)
+        exposure_book.record_results(results)
+        return lot_sizes, results, None
+
+    future = sender.session.submit(size_and_place)
+    try:
+        outcome = future.result(timeout=config.MT5_FANOUT_TIMEOUT)
+    except FutureTimeoutError:
+        # Appel encore en file: annulé; déjà en cours: la deadline bloque les envois restants
+        future.cancel()
+        return _failed_report(_worker['account_type'], f"pas de réponse MT5 en {config.MT5_FANOUT_TIMEOUT:.0f} s", start)
+    if outcome is None:
+        return _failed_report(_worker['account_type'], "appel MT5 périmé après reconnexion", start)
+    lot_sizes, results, error = outcome
+    if error:
+        return _failed_report(_worker['account_type'], error, start)
+    return {
+        'account': _worker['account_type'],
+        'lot_sizes': lot_sizes,
+        'results': results,
+        'execution_ms': round((time.perf_counter() - start) * 1000, 2),
+        'error': None
+    }
+
+
+def _failed_report(account, error, start):
+    print(f"❌ Fan-out {account}: {error} - signal ignoré")
+    return {'account': account, 'lot_sizes': [], 'results': [],
+            'execution_ms': round((time.perf_counter() - start) * 1000, 2), 'error': error}
+
+
+class AccountFanout:
+    """
+    Exécution d'un même signal (extrait une seule fois) sur plusieurs comptes MT5.
+    L'API MT5 n'attache qu'un terminal par processus: chaque compte a donc son
+    processus worker dédié, avec son terminal, sa session et son budget de risque.
+    """
+
+    def __init__(self, accounts, risk_per_signal_eur, credentials=None, fake_terminals=None):
+        """
+        Args:
+            accounts (list): Noms des comptes (ex: config.MT5_FANOUT_ACCOUNTS)
+            risk_per_signal_eur (float): Risque par défaut si MT5_<COMPTE>_RISK_EUR est absent
+            credentials (dict): {compte: identifiants} (défaut: config)
+            fake_terminals (dict): {compte: paramètres FakeTerminal} pour les tests
+        """
+        self.accounts = [account.upper() for account in accounts]
+        credentials = credentials or {}
+        fake_terminals = fake_terminals or {}
+        # spawn: pas de fork d'un processus qui a déjà des threads MT5 (et comportement identique sous Windows)
+        context = multiprocessing.get_context('spawn')
+
+        self.executors = {}
+        self.risks = {}
+        for account in self.accounts:
+            fake = fake_terminals.get(account)
+            account_credentials = credentials.get(account)
+            if account_credentials is None:
+                if fake is not None:
+                    account_credentials = {'login': fake.get('login', 123456), 'password': '', 'server': 'Fake'}
+                else:
+                    account_credentials = config.get_mt5_credentials(account)
+            self.risks[account] = config.get_account_risk(account, risk_per_signal_eur)
+            self.executors[account] = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(account, account_credentials, self.risks[account], fake)
+            )
+        print(f"🔀 Fan-out configuré sur {len(self.accounts)} compte(s): "
+              + ", ".join(f"{account} ({self.risks[account]}€)" for account in self.accounts))
+
+    def warm_up(self):
+        """
+        Démarre les workers et connecte leurs terminaux avant le premier signal.
+
+        Returns:
+            dict: {compte: connecté}
+        """
+        futures = {account: executor.submit(_worker_status) for account, executor in self.executors.items()}
+        status = {}
+        for account, future in futures.items():
+            try:
+                status[account] = future.result()['connected']
+            except Exception as e:
+                print(f"❌ Worker {account} indisponible: {e}")
+                status[account] = False
+        return status
+
+    async def execute(self, orders):
+        """
+        Dimensionne et place les jambes sur tous les comptes en parallèle.
+
+        Args:
+            orders (list): Jambes du signal (create_orders)
+
+        Returns:
+            dict: {compte: {lot_sizes, results, execution_ms, latency_ms, error}}
+        """
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+
+        async def run(account, executor):
+            try:
+                # Marge au-delà du délai du worker: démarrage du processus, IPC
+                report = await asyncio.wait_for(loop.run_in_executor(executor, _worker_execute, orders),
+                                                timeout=config.MT5_FANOUT_TIMEOUT + 5)
+            except Exception as e:
+                error = str(e) or type(e).__name__
+                print(f"❌ Fan-out {account}: {error}")
+                report = {'account': account, 'lot_sizes': [], 'results': [], 'execution_ms': None, 'error': error}
+            # Latence vue du bot: IPC + dimensionnement + placement
+            report['latency_ms'] = round((time.perf_counter() - start) * 1000, 2)
+            tracer.record(f'fanout_{account}', report['latency_ms'])
+            return report
+
+        reports = await asyncio.gather(*(run(account, executor) for account, executor in self.executors.items()))
+        summary = " | ".join(f"{r['account']} {len(r['results'])}/{len(orders)} en {r['latency_ms']:.0f} ms" for r in reports)
+        print(f"🔀 Fan-out: {summary}")
+        return {report['account']: report for report in reports}
+
+    def close(self):
+        for executor in self.executors.values():
+            executor.shutdown(wait=True, cancel_futures=True)
@@ -1,62 +1,54 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, make_response, request, stream_with_context
 from flask_cors import CORS
 import MetaTrader5 as mt5
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, timedelta
 import json
 import os
+import re
+import threading
 from config import config
+from dealStore import DealStore
+from statsEngine import StatsEngine
+from mt5Session import get_session
+from orderRegistry import OrderRegistry
+from snapshotPoller import SnapshotPoller
+from symbolCache import symbol_cache
+from tracing import summarize_log
+from warmUp import warm_up_symbols
 
 app = Flask(__name__)
 CORS(app)
 
+
+def conditional_json(data, etag):
+    """Réponse JSON avec ETag (304 si le client a déjà cette version)."""
+    response = make_response(jsonify(data))
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+
 class TradingAPI:
     def __init__(self, account_type='DEMO'):
         self.account_type = account_type.upper()
-        self.is_connected = False
-        self.current_login = None
-        self._connect_mt5()
+        # Session MT5 partagée (connexion, heartbeat et reconnexion)
+        self.session = get_session(self.account_type)
+        self.session.start_heartbeat()
+        self._deal_store = None
+        # Flask threaded=True: une seule création du store par changement de compte
+        self._deal_store_lock = threading.Lock()
+        # Registre des tickets placés par le bot (fichier partagé avec le listener)
+        self.order_registry = OrderRegistry()
+        self.stats_engine = StatsEngine(self.account_type)
     
-    def _connect_mt5(self):
-        """Connexion à MT5 sur le compte spécifié."""
-        try:
-            if not mt5.initialize():
-                print(f"❌ Erreur MT5: {mt5.last_error()}")
-                return False
-            
-            # Obtenir les identifiants du compte
-            credentials = config.get_mt5_credentials(self.account_type)
-            
-            if not all([credentials['login'], credentials['password'], credentials['server']]):
-                print(f"❌ Identifiants MT5 manquants pour le compte {self.account_type}")
-                return False
-            
-            self.current_login = credentials['login']
-            
-            # Se connecter
-            authorized = mt5.login(
-                login=credentials['login'],
-                password=credentials['password'],
-                server=credentials['server']
-            )
-            
-            if not authorized:
-                print(f"❌ Échec connexion MT5 ({self.account_type}): {mt5.last_error()}")
-                return False
-            
-            # Vérifier la connexion
-            account_info = mt5.account_info()
-            if not account_info or account_info.login != self.current_login:
-                print(f"❌ Connexion au mauvais compte")
-                return False
-            
-            self.is_connected = True
-            account_type_str = "DÉMO" if account_info.trade_mode == mt5.ACCOUNT_TRADE_MODE_DEMO else "RÉEL"
-            print(f"✅ API connectée à MT5 ({self.account_type}) - Compte {account_type_str}")
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erreur connexion MT5: {e}")
-            return False
+    @property
+    def is_connected(self):
+        return self.session.is_connected
+    
+    @property
+    def current_login(self):
+        return self.session.current_login
     
     def get_account_info(self):
         """Récupère les infos du compte."""
@@ -81,20 +73,24 @@ class TradingAPI:
         return None
     
     def get_open_orders(self):
-        """Récupère les ordres ouverts."""
+        """Récupère les ordres ouverts (None si le terminal ne répond pas)."""
         if not self.is_connected:
-            return []
+            return None
         
         try:
             # Positions ouvertes
             positions = mt5.positions_get()
+            pending_orders = mt5.orders_get()
+            if positions is None or pending_orders is None:
+                # Erreur MT5 (connexion perdue): à ne pas confondre avec « aucun ordre »
+                return None
             orders = []
             
             if positions:
                 for pos in positions:
                     orders.append({
                         'id': str(pos.ticket),
-                        'channelId': self._extract_channel_from_comment(pos.comment),
+                        'channelId': self._channel_for(pos.magic, pos.ticket, pos.comment),
                         'symbol': pos.symbol,
                         'type': 'BUY' if pos.type == 0 else 'SELL',
                         'volume': pos.volume,
@@ -108,12 +104,11 @@ class TradingAPI:
                     })
             
             # Ordres en attente
-            pending_orders = mt5.orders_get()
             if pending_orders:
                 for order in pending_orders:
                     orders.append({
                         'id': str(order.ticket),
-                        'channelId': self._extract_channel_from_comment(order.comment),
+                        'channelId': self._channel_for(order.magic, order.ticket, order.comment),
                         'symbol': order.symbol,
                         'type': 'BUY' if order.type in [2, 4] else 'SELL',
                         'volume': order.volume_initial,
@@ -130,146 +125,87 @@ class TradingAPI:
             
         except Exception as e:
             print(f"❌ Erreur récupération ordres: {e}")
-            return []
+            return None
     
-    def get_history(self, days=7):
-        """Récupère l'historique des trades."""
+    @property
+    def deal_store(self):
+        """Historique local du compte connecté (créé à la première utilisation)."""
+        with self._deal_store_lock:
+            if self._deal_store is None or self._deal_store.login != self.current_login:
+                store = DealStore(self.current_login, channel_resolver=self._channel_for_deal)
+                # Backfill: positions stockées avant l'attribution par magic number / registre
+                reattributed = store.reattribute()
+                if reattributed:
+                    print(f"🏷️ {reattributed} position(s) ré-attribuée(s) à leur canal")
+                # Statistiques pré-calculées: historique existant puis chaque nouvelle clôture
+                stats_engine = StatsEngine(self.account_type)
+                for trade in reversed(store.trades()):
+                    stats_engine.ingest(trade)
+                store.add_listener(stats_engine.ingest)
+                self.stats_engine, self._deal_store = stats_engine, store
+            return self._deal_store
+    
+    def _sync_deals(self, store):
+        """
+        Synchronise les nouveaux deals dans le thread MT5, sans bloquer la requête
+        au-delà de API_MT5_TIMEOUT (appel mis en file pendant une reconnexion).
+        
+        Returns:
+            bool: False si MT5 n'a pas répondu à temps (données locales servies)
+        """
+        future = self.session.submit(store.sync)
+        try:
+            future.result(timeout=config.API_MT5_TIMEOUT)
+            return True
+        except FutureTimeoutError:
+            future.cancel()
+            print(f"⌛ Deals non synchronisés: pas de réponse MT5 en {config.API_MT5_TIMEOUT:.0f} s - historique local servi")
+            return False
+    
+    def get_closed_trades(self, days):
+        """Synchronise les nouveaux deals puis lit les positions fermées depuis l'index local."""
         if not self.is_connected:
             return []
         
+        store = self.deal_store
+        self._sync_deals(store)
+        return store.trades(since=datetime.now() - timedelta(days=days))
+    
+    def get_history(self, days=7):
+        """Récupère l'historique des trades."""
         try:
-            # Date de début
-            from_date = datetime.now() - timedelta(days=days)
-            to_date = datetime.now()
-            
-            # Récupérer l'historique
-            deals = mt5.history_deals_get(from_date, to_date)
-            history = []
-            
-            if deals:
-                # Grouper les deals par position
-                positions = {}
-                for deal in deals:
-                    if deal.position_id not in positions:
-                        positions[deal.position_id] = []
-                    positions[deal.position_id].append(deal)
-                
-                # Traiter chaque position fermée
-                for pos_id, pos_deals in positions.items():
-                    if len(pos_deals) >= 2:  # Ouverture + fermeture
-                        open_deal = min(pos_deals, key=lambda x: x.time)
-                        close_deal = max(pos_deals, key=lambda x: x.time)
-                        
-                        if open_deal.entry == 0 and close_deal.entry == 1:  # Entrée puis sortie
-                            duration = (close_deal.time - open_deal.time) // 60  # en minutes
-                            
-                            history.append({
-                                'id': f'HIS{pos_id}',
-                                'channelId': self._extract_channel_from_comment(open_deal.comment),
-                                'symbol': open_deal.symbol,
-                                'type': 'BUY' if open_deal.type == 0 else 'SELL',
-                                'volume': open_deal.volume,
-                                'entryPrice': open_deal.price,
-                                'exitPrice': close_deal.price,
-                                'pnl': close_deal.profit,
-                                'duration': duration,
-                                'accountType': self.account_type,
-                                'closeTime': datetime.fromtimestamp(close_deal.time).isoformat()
-                            })
-            
-            return sorted(history, key=lambda x: x['closeTime'], reverse=True)
+            return [
+                {
+                    'id': f"HIS{trade['position_id']}",
+                    'channelId': trade['channel_id'],
+                    'symbol': trade['symbol'],
+                    'type': trade['type'],
+                    'volume': trade['volume'],
+                    'entryPrice': trade['entry_price'],
+                    'exitPrice': trade['exit_price'],
+                    'pnl': trade['pnl'],
+                    'duration': (trade['close_time'] - trade['open_time']) // 60,  # en minutes
+                    'accountType': self.account_type,
+                    'closeTime': datetime.fromtimestamp(trade['close_time']).isoformat()
+                }
+                for trade in self.get_closed_trades(days)
+            ]
             
         except Exception as e:
             print(f"❌ Erreur récupération historique: {e}")
             return []
     
-    def get_statistics(self):
-        """Calcule les statistiques."""
+    def get_statistics(self, window='30d'):
+        """Statistiques de la fenêtre demandée (1d, 7d, 30d, all), lues depuis les compteurs."""
         try:
-            history = self.get_history(30)  # 30 derniers jours
-            
-            if not history:
-                return self._empty_stats()
-            
-            # Stats globales
-            total_trades = len(history)
-            winning_trades = len([t for t in history if t['pnl'] > 0])
-            win_rate = round((winning_trades / total_trades) * 100) if total_trades > 0 else 0
-            
-            # Risk/Reward moyen (approximation)
-            avg_rr = 2.0  # Valeur par défaut
-            
-            # Stats par canal
-            channel1_trades = [t for t in history if t['channelId'] == 1]
-            channel2_trades = [t for t in history if t['channelId'] == 2]
-            
-            # Stats par symbole
-            symbols = {}
-            for trade in history:
-                symbol = trade['symbol']
-                if symbol not in symbols:
-                    symbols[symbol] = []
-                symbols[symbol].append(trade)
-            
-            symbol_stats = []
-            for symbol, trades in symbols.items():
-                wins = len([t for t in trades if t['pnl'] > 0])
-                symbol_win_rate = round((wins / len(trades)) * 100) if trades else 0
-                total_pnl = sum(t['pnl'] for t in trades)
-                
-                symbol_stats.append({
-                    'symbol': symbol,
-                    'totalTrades': len(trades),
-                    'winRate': symbol_win_rate,
-                    'avgRR': 2.0,  # Approximation
-                    'totalPnl': total_pnl
-                })
-            
-            return {
-                'global': {
-                    'winRate': win_rate,
-                    'avgRR': avg_rr,
-                    'totalSignals': total_trades
-                },
-                'channels': {
-                    'channel1': self._calculate_channel_stats(channel1_trades),
-                    'channel2': self._calculate_channel_stats(channel2_trades)
-                },
-                'symbols': symbol_stats,
-                'accountType': self.account_type
-            }
+            if self.is_connected:
+                self._sync_deals(self.deal_store)
+            return self.stats_engine.snapshot(window)
             
         except Exception as e:
             print(f"❌ Erreur calcul statistiques: {e}")
             return self._empty_stats()
     
-    def _calculate_channel_stats(self, trades):
-        """Calcule les stats d'un canal."""
-        if not trades:
-            return {
-                'totalSignals': 0,
-                'winRate': 0,
-                'avgRR': 0,
-                'totalPnl': 0,
-                'bestTrade': 0,
-                'worstTrade': 0
-            }
-        
-        wins = len([t for t in trades if t['pnl'] > 0])
-        win_rate = round((wins / len(trades)) * 100)
-        total_pnl = sum(t['pnl'] for t in trades)
-        best_trade = max(t['pnl'] for t in trades)
-        worst_trade = min(t['pnl'] for t in trades)
-        
-        return {
-            'totalSignals': len(trades),
-            'winRate': win_rate,
-            'avgRR': 2.0,  # Approximation
-            'totalPnl': total_pnl,
-            'bestTrade': best_trade,
-            'worstTrade': worst_trade
-        }
-    
     def _empty_stats(self):
         """Stats vides par défaut."""
         return {
@@ -282,21 +218,34 @@ class TradingAPI:
             'accountType': self.account_type
         }
     
+    def _channel_for(self, magic, ticket, comment):
+        """Canal d'un ordre ou d'une position: magic number encodé, registre des tickets, puis commentaire."""
+        channel_id = self.order_registry.channel_for(magic, ticket)
+        if channel_id is not None:
+            return channel_id
+        return self._extract_channel_from_comment(comment)
+    
+    def _channel_for_deal(self, deal):
+        return self._channel_for(deal['magic'], deal['position_id'], deal['comment'])
+    
     def _extract_channel_from_comment(self, comment):
-        """Extrait le numéro de canal du commentaire."""
-        if not comment:
-            return 1
-        
-        if 'Canal-2' in comment or 'Channel-2' in comment:
-            return 2
-        return 1
+        """Extrait le numéro de canal du commentaire (ordres placés avant le magic number encodé)."""
+        match = re.search(r'(?:Canal|Channel)-(\d+)', comment or '')
+        return int(match.group(1)) if match else 1
     
     def close_order(self, order_id):
-        """Ferme un ordre."""
+        """Ferme un ordre (appels MT5 sur le thread de la session, jamais sur le thread Flask)."""
         try:
-            # Convertir l'ID en entier
             ticket = int(order_id)
-            
+            return self.session.submit(self._close_order, ticket).result(timeout=config.API_MT5_TIMEOUT)
+        except FutureTimeoutError:
+            return {'success': False, 'message': f'MT5 ne répond pas ({self.account_type})'}
+        except Exception as e:
+            return {'success': False, 'message': f'Erreur: {str(e)}'}
+    
+    def _close_order(self, ticket):
+        """Ferme une position ou annule un ordre en attente. Thread MT5."""
+        try:
             # Vérifier si c'est une position ouverte
             position = mt5.positions_get(ticket=ticket)
             if position:
@@ -371,19 +320,34 @@ if __name__ == '__main__':
     
     # Instance globale de l'API
     trading_api = TradingAPI(account_type)
+    
+    # Symboles et caches prêts avant les premières requêtes
+    if trading_api.session.is_connected:
+        trading_api.session.submit(warm_up_symbols).result()
+    
+    # Instantané partagé: une seule interrogation du terminal pour tous les clients
+    snapshot = SnapshotPoller(trading_api)
+    snapshot.start()
 
     # Routes API
     @app.route('/api/account', methods=['GET'])
     def get_account():
-        account_info = trading_api.get_account_info()
+        account_info, etag = snapshot.get_account()
         if account_info:
-            return jsonify(account_info)
+            return conditional_json(account_info, etag)
         return jsonify({'error': 'Impossible de récupérer les infos du compte'}), 500
 
     @app.route('/api/orders', methods=['GET'])
     def get_orders():
-        orders = trading_api.get_open_orders()
-        return jsonify(orders)
+        orders, etag = snapshot.get_orders()
+        return conditional_json(orders, etag)
+
+    @app.route('/api/stream', methods=['GET'])
+    def stream():
+        response = Response(stream_with_context(snapshot.stream()), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
 
     @app.route('/api/history', methods=['GET'])
     def get_history():
@@ -393,22 +357,37 @@ if __name__ == '__main__':
 
     @app.route('/api/statistics', methods=['GET'])
     def get_statistics():
-        stats = trading_api.get_statistics()
+        window = request.args.get('window', '30d')
+        if window not in StatsEngine.WINDOWS:
+            return jsonify({'error': f'Fenêtre inconnue: {window}'}), 400
+        stats = trading_api.get_statistics(window)
         return jsonify(stats)
 
     @app.route('/api/orders/<order_id>/close', methods=['POST'])
     def close_order(order_id):
         result = trading_api.close_order(order_id)
         if result['success']:
+            snapshot.refresh()
             return jsonify(result)
         return jsonify(result), 400
 
+    @app.route('/api/metrics', methods=['GET'])
+    def get_metrics():
+        return jsonify({
+            # Traces du bot (autre processus) lues dans son journal structuré
+            'pipeline': summarize_log(config.LATENCY_LOG_PATH),
+            'session': trading_api.session.metrics(),
+            'symbolCache': symbol_cache.stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
     @app.route('/api/health', methods=['GET'])
     def health_check():
         return jsonify({
             'status': 'ok',
             'mt5_connected': trading_api.is_connected,
             'account_type': trading_api.account_type,
+            'session': trading_api.session.metrics(),
             'timestamp': datetime.now().isoformat()
         })
 
@@ -416,4 +395,4 @@ if __name__ == '__main__':
     print(f"📊 Compte connecté: {account_type}")
     print("📊 Interface web: http://localhost:3000")
     print("🔌 API: http://localhost:8000")
-    app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
+    app.run(host='0.0.0.0', port=8000, debug=True, threaded=True)
\ No newline at end of file
@@ -0,0 +1,384 @@
+"""
+Backtest hors ligne des signaux des canaux contre les ticks enregistrés.
+Rejoue chaque signal avec la logique du bot: décision marché / en attente
+(decide_order), dimensionnement (RiskManager.size_legs), puis exécutions, SL/TP,
+breakeven après TP1, annulations et expiration des ordres en attente
+(règles de LifecycleManager). Les recherches de franchissement SL/TP sont
+vectorisées par blocs de ticks croissants.
+
+Usage:
+    python backtester.py --registry --from 20260101 --to 20260331 --specs cache/specs.json
+    python backtester.py --signals signals.jsonl --from 20260101 --to 20260331 --account DEMO --risk 300
+"""
+
+import argparse
+import json
+import numpy as np
+import MetaTrader5 as mt5
+from config import config
+from order import decide_order
+from riskManager import RiskManager
+from tickRecorder import TICK_DTYPE, load_ticks, tick_file_days
+
+# Taille du premier bloc de ticks examiné (puis x4 tant que rien n'est franchi)
+SEARCH_CHUNK = 4096
+
+DEFAULT_RULES = {
+    'risk_per_signal_eur': config.TOTAL_RISK_EUR,
+    'leg_weights': config.LEG_RISK_WEIGHTS,
+    # Position des entrées du canal 2 dans la fourchette publiée (None = celles du signal)
+    'channel2_ladder': None,
+    'breakeven_after_tp1': config.LIFECYCLE_BREAKEVEN_AFTER_TP1,
+    'cancel_pending_on_tp1': config.LIFECYCLE_CANCEL_PENDING_ON_TP1,
+    'cancel_on_sl': config.LIFECYCLE_CANCEL_ON_SL,
+    'pending_expiry_minutes': config.LIFECYCLE_PENDING_EXPIRY_MINUTES,
+    # Délai de réaction de la gestion des trades (cycle de polling)
+    'reaction_seconds': config.LIFECYCLE_POLL_INTERVAL,
+}
+
+# Condition de déclenchement des ordres en attente: (champ du tick, comparaison)
+PENDING_TRIGGERS = {
+    mt5.ORDER_TYPE_BUY_LIMIT: ('ask', '<='),
+    mt5.ORDER_TYPE_BUY_STOP: ('ask', '>='),
+    mt5.ORDER_TYPE_SELL_LIMIT: ('bid', '>='),
+    mt5.ORDER_TYPE_SELL_STOP: ('bid', '<='),
+}
+
+
+def first_hit(ticks, start, end, tests):
+    """
+    Premier tick de [start, end) qui satisfait l'un des tests, par blocs vectorisés.
+
+    Args:
+        ticks (np.ndarray): Ticks (time_msc, bid, ask), éventuellement en mémoire mappée
+        start (int): Premier index examiné
+        end (int): Index de fin (exclu)
+        tests (list): [(champ, '<=' ou '>=', niveau)]
+
+    Returns:
+        tuple: (index, numéro du test) ou (None, None)
+    """
+    size = SEARCH_CHUNK
+    position = start
+    while position < end:
+        stop = min(end, position + size)
+        chunk = ticks[position:stop]
+        hits = [chunk[field] <= level if op == '<=' else chunk[field] >= level for field, op, level in tests]
+        any_hit = np.logical_or.reduce(hits)
+        if any_hit.any():
+            index = int(any_hit.argmax())
+            return position + index, next(k for k, hit in enumerate(hits) if hit[index])
+        position = stop
+        size *= 4
+    return None, None
+
+
+def symbol_specs(symbols):
+    """
+    Spécifications nécessaires au backtest, lues une fois sur le terminal (thread MT5).
+
+    Returns:
+        dict: {symbole: {digits, point, lot_step, min_lot, max_lot, pip_value_eur, point_value_eur}}
+    """
+    from info import Infos
+    specs = {}
+    for symbol in symbols:
+        symbol_info = Infos.get_symbol_info(symbol)
+        pip_value_eur = Infos.get_pip_value_eur(symbol, 1.0)
+        if not symbol_info or not pip_value_eur:
+            print(f"❌ Spécifications {symbol} indisponibles")
+            continue
+        specs[symbol] = {
+            key: symbol_info[key] for key in ('digits', 'point', 'lot_step', 'min_lot', 'max_lot')
+        }
+        specs[symbol]['pip_value_eur'] = pip_value_eur
+        # Valeur réelle d'un point pour 1 lot (P&L), le pip valant 1 ou 10 points
+        specs[symbol]['point_value_eur'] = pip_value_eur * symbol_info['point'] / symbol_info['pip_size']
+    return specs
+
+
+def load_tick_range(symbol, first_day, last_day, data_dir=None):
+    """Ticks d'un symbole sur une plage de jours AAAAMMJJ (concaténés, ordre chronologique)."""
+    days = [day for day in tick_file_days(symbol, data_dir) if first_day <= day <= last_day]
+    arrays = [load_ticks(symbol, day, data_dir) for day in days]
+    arrays = [array for array in arrays if len(array)]
+    if not arrays:
+        return np.empty(0, dtype=TICK_DTYPE)
+    return arrays[0] if len(arrays) == 1 else np.concatenate(arrays)
+
+
+def bars_to_ticks(rates, point):
+    """
+    Ticks synthétiques à partir de barres M1 (copy_rates_range): ouverture, extrêmes
+    dans l'ordre le plus probable, clôture; ask = bid + spread de la barre.
+    """
+    ticks = np.zeros(len(rates) * 4, dtype=TICK_DTYPE)
+    bullish = rates['close'] >= rates['open']
+    first = np.where(bullish, rates['low'], rates['high'])
+    second = np.where(bullish, rates['high'], rates['low'])
+    base = rates['time'].astype('i8') * 1000
+    for offset, (prices, delay) in enumerate(((rates['open'], 0), (first, 15000), (second, 30000), (rates['close'], 59999))):
+        ticks['time_msc'][offset::4] = base + delay
+        ticks['bid'][offset::4] = prices
+        ticks['ask'][offset::4] = prices + rates['spread'] * point
+    return ticks
+
+
+class Backtester:
+    """
+    Rejoue des signaux {time, channel_id, symbol, sens, sl, entry_prices, tps}
+    (time en secondes) contre des ticks par symbole.
+    """
+
+    def __init__(self, ticks, specs, rules=None, time_offset=0.0, times=None):
+        """
+        Args:
+            ticks (dict): {symbole: tableau TICK_DTYPE trié par time_msc (np.memmap accepté)}
+            specs (dict): Sortie de symbol_specs
+            rules (dict): Surcharge de DEFAULT_RULES
+            time_offset (float): Secondes à ajouter à l'heure des signaux pour l'horloge des ticks
+            times (dict): {symbole: time_msc contigu} déjà extraits (partagés entre processus)
+        """
+        self.ticks = ticks
+        # Horodatages contigus (et clés entières): sinon searchsorted recopie/convertit tout le tableau à chaque appel
+        self.times = dict(times or {})
+        for symbol, array in ticks.items():
+            if symbol not in self.times:
+                self.times[symbol] = np.ascontiguousarray(array['time_msc'])
+        self.specs = specs
+        self.rules = {**DEFAULT_RULES, **(rules or {})}
+        self.time_offset = time_offset
+
+    def run(self, signals):
+        """
+        Returns:
+            list: Une ligne par jambe {signal, channel_id, symbol, leg, order, status, open_time,
+                  open_price, close_time, close_price, volume, pnl_eur, risk_eur, r_multiple}
+        """
+        trades = []
+        for number, signal in enumerate(signals):
+            trades.extend(self.run_signal(signal, number))
+        return trades
+
+    def run_signal(self, signal, number=0):
+        symbol = signal['symbol']
+        ticks = self.ticks.get(symbol)
+        spec = self.specs.get(symbol)
+        base = {'signal': number, 'channel_id': signal.get('channel_id'), 'symbol': symbol}
+        if ticks is None or spec is None or not len(ticks):
+            return [self._row(base, {'leg': 0, 'order': None, 'status': 'no_data', 'volume': 0.0})]
+
+        times = self.times[symbol]
+        t0 = int((signal['time'] + self.time_offset) * 1000)
+        i0 = int(np.searchsorted(times, np.int64(t0), side='right')) - 1
+        if i0 < 0 or i0 >= len(ticks) - 1:
+            return [self._row(base, {'leg': 0, 'order': None, 'status': 'no_data', 'volume': 0.0})]
+
+        sens = signal['sens']
+        direction = 1 if sens == 'BUY' else -1
+        point, digits = spec['point'], spec['digits']
+        entries = np.asarray(signal['entry_prices'], dtype=float)
+        ladder = self.rules['channel2_ladder']
+        if ladder and signal.get('channel_id') == 2 and len(ladder) == len(entries):
+            low, high = entries.min(), entries.max()
+            entries = np.round(low + np.asarray(ladder, dtype=float) * (high - low), digits)
+        sl = round(signal['sl'], digits)
+
+        # Dimensionnement identique au bot (répartition du budget selon les poids des jambes)
+        sl_distances = np.abs(entries - signal['sl']) / point
+        budgets = RiskManager.leg_budgets(self.rules['risk_per_signal_eur'], len(entries), self.rules['leg_weights'])
+        lot_sizes, _ = RiskManager.size_legs(sl_distances, budgets, spec['point_value_eur'], spec)
+
+        expiry = self.rules['pending_expiry_minutes']
+        expiry_end = int(np.searchsorted(times, np.int64(t0 + expiry * 60000))) if expiry else len(ticks)
+        current_price = ticks['ask'][i0] if sens == 'BUY' else ticks['bid'][i0]
+
+        legs = []
+        for leg_number, (entry, tp, volume) in enumerate(zip(entries, signal['tps'], lot_sizes), start=1):
+            action, order_type, price = decide_order(sens, entry, current_price, point)
+            leg = {'leg': leg_number, 'volume': float(volume), 'tp': round(tp, digits), 'sl': sl, 'initial_sl': sl,
+                   'fill': None, 'exit': None, 'expires': expiry_end,
+                   'status': 'expired' if expiry_end < len(ticks) else 'not_filled'}
+            price = round(price, digits)
+            if action == mt5.TRADE_ACTION_DEAL:
+                leg.update(order='market', fill=i0, open_price=float(price))
+            else:
+                field, op = PENDING_TRIGGERS[order_type]
+                leg['order'] = 'limit' if order_type in (mt5.ORDER_TYPE_BUY_LIMIT, mt5.ORDER_TYPE_SELL_LIMIT) else 'stop'
+                index, _ = first_hit(ticks, i0 + 1, expiry_end, [(field, op, price)])
+                if index is not None:
+                    # Limite exécutée au prix demandé, stop au prix du marché (gap compris)
+                    fill_price = price if leg['order'] == 'limit' else float(ticks[field][index])
+                    leg.update(fill=index, open_price=float(fill_price))
+            if leg['fill'] is not None:
+                self._find_exit(ticks, leg, direction, leg['fill'] + 1, sl)
+            legs.append(leg)
+
+        self._apply_lifecycle(ticks, times, legs, direction)
+        return [self._report(base, leg, ticks, direction, spec) for leg in legs]
+
+    @staticmethod
+    def _find_exit(ticks, leg, direction, start, sl, reason_sl='sl'):
+        """SL ou TP franchi en premier depuis start (SL au prix du marché en cas de gap)."""
+        if direction == 1:
+            tests = [('bid', '<=', sl), ('bid', '>=', leg['tp'])]
+        else:
+            tests = [('ask', '>=', sl), ('ask', '<=', leg['tp'])]
+        index, which = first_hit(ticks, start, len(ticks), tests)
+        if index is None:
+            leg.update(exit=None, status='open')
+            return
+        if which == 0:
+            market = float(ticks['bid' if direction == 1 else 'ask'][index])
+            price = min(sl, market) if direction == 1 else max(sl, market)
+            leg.update(exit=index, close_price=price, status=reason_sl)
+        else:
+            leg.update(exit=index, close_price=leg['tp'], status='tp')
+
+    def _apply_lifecycle(self, ticks, times, legs, direction):
+        """Événements dans l'ordre chronologique: TP1 (breakeven, annulations) et SL (annulations)."""
+        reaction_ms = self.rules['reaction_seconds'] * 1000
+        processed = set()
+        while True:
+            pending_events = [leg for leg in legs if leg['exit'] is not None and leg['leg'] not in processed]
+            if not pending_events:
+                return
+            event = min(pending_events, key=lambda leg: leg['exit'])
+            processed.add(event['leg'])
+            react = int(np.searchsorted(times, np.int64(times[event['exit']] + reaction_ms)))
+
+            is_tp1 = event['status'] == 'tp' and event['leg'] == 1
+            is_sl = event['status'] in ('sl', 'breakeven')
+            for leg in legs:
+                if leg is event:
+                    continue
+                # Ordre encore en attente au moment où la gestion réagit
+                if leg['fill'] is None:
+                    waiting = leg['status'] != 'cancelled' and leg['expires'] > react
+                else:
+                    waiting = leg['fill'] > react
+                if waiting:
+                    if (is_tp1 and self.rules['cancel_pending_on_tp1']) or (is_sl and self.rules['cancel_on_sl']):
+                        leg.update(fill=None, exit=None, status='cancelled')
+                elif is_tp1 and self.rules['breakeven_after_tp1'] and not waiting:
+                    still_open = leg['exit'] is None or leg['exit'] > react
+                    protects = direction * (leg['open_price'] - leg['sl']) > 0
+                    if still_open and protects:
+                        leg['sl'] = leg['open_price']
+                        self._find_exit(ticks, leg, direction, react, leg['sl'], reason_sl='breakeven')
+                        processed.discard(leg['leg'])
+
+    @staticmethod
+    def _row(base, leg):
+        return {**base, 'leg': leg['leg'], 'order': leg['order'], 'status': leg['status'], 'volume': leg['volume'],
+                'open_time': None, 'open_price': None, 'close_time': None, 'close_price': None,
+                'pnl_eur': 0.0, 'risk_eur': 0.0, 'r_multiple': None}
+
+    def _report(self, base, leg, ticks, direction, spec):
+        row = self._row(base, leg)
+        if leg['fill'] is None:
+            return row
+
+        if leg['exit'] is None:
+            # Position encore ouverte en fin de données: valorisée au dernier tick
+            close_price = float(ticks['bid' if direction == 1 else 'ask'][-1])
+            close_time = None
+        else:
+            close_price = leg['close_price']
+            close_time = int(ticks['time_msc'][leg['exit']])
+
+        value = spec['point_value_eur'] * leg['volume'] / spec['point']
+        pnl = direction * (close_price - leg['open_price']) * value
+        risk = abs(leg['open_price'] - leg['initial_sl']) * value
+        row.update(open_time=int(ticks['time_msc'][leg['fill']]), open_price=leg['open_price'],
+                   close_time=close_time, close_price=close_price, pnl_eur=round(pnl, 2),
+                   risk_eur=round(risk, 2), r_multiple=round(pnl / risk, 3) if risk else None)
+        return row
+
+
+def summarize(trades):
+    """
+    Statistiques par canal et globales d'un backtest.
+
+    Returns:
+        dict: {global, channel1, channel2...} avec legs, wins, win_rate, pnl_eur, avg_r, max_drawdown_eur
+    """
+    groups = {'global': [trade for trade in trades if trade.get('open_time') is not None]}
+    for trade in groups['global']:
+        groups.setdefault(f"channel{trade['channel_id']}", []).append(trade)
+
+    summary = {}
+    for name, rows in groups.items():
+        rows = sorted(rows, key=lambda trade: trade['close_time'] or float('inf'))
+        pnl = np.array([trade['pnl_eur'] for trade in rows], dtype=float)
+        r_values = [trade['r_multiple'] for trade in rows if trade['r_multiple'] is not None]
+        equity = np.concatenate(([0.0], np.cumsum(pnl)))
+        summary[name] = {
+            'signals': len({trade['signal'] for trade in rows}),
+            'legs': len(rows),
+            'wins': int((pnl > 0).sum()),
+            'win_rate': round(float((pnl > 0).mean()) * 100, 1) if len(pnl) else 0.0,
+            'pnl_eur': round(float(pnl.sum()), 2),
+            'avg_r': round(float(np.mean(r_values)), 3) if r_values else 0.0,
+            'max_drawdown_eur': round(float((np.maximum.accumulate(equity) - equity).max()), 2)
+        }
+    return summary
+
+
+def load_signals(path):
+    """Signaux JSONL: une ligne {time, channel_id, symbol, sens, sl, entry_prices, tps} par signal."""
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest des signaux contre les ticks enregistrés")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--signals', help="Fichier JSONL de signaux horodatés")
+    source.add_argument('--registry', action='store_true', help="Signaux du registre des ordres")
+    parser.add_argument('--from', dest='first_day', required=True, help="Premier jour (AAAAMMJJ)")
+    parser.add_argument('--to', dest='last_day', required=True, help="Dernier jour (AAAAMMJJ)")
+    parser.add_argument('--specs', help="Spécifications JSON (sinon lues sur le terminal)")
+    parser.add_argument('--account', default='DEMO', help="Compte MT5 pour lire les spécifications")
+    parser.add_argument('--risk', type=float, default=config.TOTAL_RISK_EUR, help="Risque par signal (EUR)")
+    parser.add_argument('--server-offset', type=float, default=0.0, help="Décalage horaire du serveur (heures)")
+    parser.add_argument('--output', help="CSV des jambes simulées")
+    args = parser.parse_args()
+
+    if args.registry:
+        from orderRegistry import OrderRegistry
+        signals = OrderRegistry().signal_history()
+    else:
+        signals = load_signals(args.signals)
+    symbols = sorted({signal['symbol'] for signal in signals})
+
+    if args.specs:
+        with open(args.specs, encoding='utf-8') as file:
+            specs = json.load(file)
+    else:
+        from mt5Session import get_session
+        specs = get_session(args.account).submit(symbol_specs, symbols).result()
+
+    ticks = {symbol: load_tick_range(symbol, args.first_day, args.last_day) for symbol in symbols}
+    for symbol, array in ticks.items():
+        print(f"📂 {symbol}: {len(array)} ticks")
+
+    backtester = Backtester(ticks, specs, rules={'risk_per_signal_eur': args.risk},
+                            time_offset=args.server_offset * 3600)
+    trades = backtester.run(signals)
+    for name, stats in summarize(trades).items():
+        print(f"📊 {name}: {stats}")
+
+    if args.output and not trades:
+        print(f"⚠️ Aucune jambe simulée - {args.output} non écrit")
+    elif args.output:
+        import csv
+        with open(args.output, 'w', newline='', encoding='utf-8') as file:
+            writer = csv.DictWriter(file, fieldnames=list(trades[0]))
+            writer.writeheader()
+            writer.writerows(trades)
+        print(f"💾 {len(trades)} jambes écrites dans {args.output}")
+
+
+if __name__ == '__main__':
+    main()
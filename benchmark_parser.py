@@ -0,0 +1,143 @@
+"""
+Benchmark du parser local contre l'extraction ChatGPT.
+Mesure la latence et la concordance sur un corpus de messages réels.
+
+Usage:
+    python benchmark_parser.py                 # parser local uniquement
+    python benchmark_parser.py --gpt           # compare aussi avec ChatGPT (clé requise)
+    python benchmark_parser.py --corpus fichier.jsonl
+"""
+
+import argparse
+import json
+import statistics
+import time
+from localParser import LocalParser
+
+DEFAULT_CORPUS = "data/signals_corpus.jsonl"
+
+
+def load_corpus(path):
+    """Charge le corpus JSONL: {channel_id, text, expected}."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def signals_match(a, b, tolerance=1e-6):
+    """Compare deux signaux extraits (symbole, sens, SL, entrées, TPs)."""
+    if a is None or b is None:
+        return a is None and b is None
+    if a.get('symbol') != b.get('symbol') or a.get('sens') != b.get('sens'):
+        return False
+    try:
+        if abs(float(a['sl']) - float(b['sl'])) > tolerance:
+            return False
+        for key in ('entry_prices', 'tps'):
+            if len(a[key]) != len(b[key]):
+                return False
+            if any(abs(float(x) - float(y)) > tolerance for x, y in zip(a[key], b[key])):
+                return False
+    except (KeyError, TypeError, ValueError):
+        return False
+    return True
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_local(corpus, repeat=200):
+    """Latence et exactitude du parser local."""
+    latencies = []
+    correct = 0
+    fallbacks = 0
+    results = []
+
+    for item in corpus:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            parser = LocalParser(item['text'], item['channel_id'])
+            signal = parser.get_signal()
+        latencies.append((time.perf_counter() - start) / repeat * 1000)
+
+        results.append(signal)
+        if signal is None and item['expected'] is not None:
+            fallbacks += 1
+        if signals_match(signal, item['expected']):
+            correct += 1
+        else:
+            print(f"⚠️ Écart local: {item['text'][:40]!r} → {signal}")
+
+    return latencies, correct, fallbacks, results
+
+
+def run_gpt(corpus):
+    """Latence de l'extraction ChatGPT (appels réels)."""
+    from chatGpt import chatGpt
+
+    latencies = []
+    results = []
+    for item in corpus:
+        start = time.perf_counter()
+        signal = chatGpt(item['text'], item['channel_id']).get_signal()
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append(signal)
+    return latencies, results
+
+
+def print_latency(label, latencies):
+    print(f"{label}: moyenne {statistics.mean(latencies):.3f} ms | "
+          f"p50 {percentile(latencies, 50):.3f} ms | "
+          f"p95 {percentile(latencies, 95):.3f} ms | "
+          f"max {max(latencies):.3f} ms")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark parser local vs ChatGPT")
+    arg_parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    arg_parser.add_argument("--gpt", action="store_true", help="Comparer avec ChatGPT (appels payants)")
+    arg_parser.add_argument("--repeat", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    print("⏱️ BENCHMARK PARSER LOCAL")
+    print("=" * 50)
+    print(f"📚 Corpus: {len(corpus)} messages ({args.corpus})")
+
+    local_latencies, correct, fallbacks, local_results = run_local(corpus, args.repeat)
+    print_latency("⚡ Local", local_latencies)
+    print(f"🎯 Exactitude locale: {correct}/{len(corpus)} ({correct / len(corpus) * 100:.1f}%)")
+    print(f"🤖 Replis ChatGPT nécessaires: {fallbacks}")
+
+    from signalFilter import signal_filter
+    # Le modèle livré est entraîné sur ce corpus: la précision/rappel rapportée est hors échantillon
+    latency_us = signal_filter.evaluate(corpus)['latency_us']
+    report = signal_filter.cross_validate(corpus)
+    print(f"🚦 Pré-filtre (leave-one-out): précision {report['precision']:.2f} | rappel {report['recall']:.2f} | "
+          f"{latency_us:.1f} µs/message")
+
+    if args.gpt:
+        signals = [(i, item) for i, item in enumerate(corpus) if item['expected'] is not None]
+        gpt_latencies, gpt_results = run_gpt([item for _, item in signals])
+        print_latency("🤖 ChatGPT", gpt_latencies)
+
+        agreement = sum(
+            1 for (i, _), gpt_signal in zip(signals, gpt_results)
+            if signals_match(local_results[i], gpt_signal)
+        )
+        gpt_correct = sum(
+            1 for (_, item), gpt_signal in zip(signals, gpt_results)
+            if signals_match(gpt_signal, item['expected'])
+        )
+        print(f"🤝 Concordance local/ChatGPT: {agreement}/{len(signals)}")
+        print(f"🎯 Exactitude ChatGPT: {gpt_correct}/{len(signals)}")
+        speedup = statistics.mean(gpt_latencies) / max(statistics.mean(local_latencies), 1e-9)
+        print(f"🚀 Gain de latence: x{speedup:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Benchmark hors ligne du pipeline complet: rejoue un corpus JSONL de messages
+dans TradingBot.process_message avec un faux terminal MT5 et un faux client OpenAI.
+Rapporte le débit (messages/s), les percentiles de latence par étape et
+l'exactitude d'extraction.
+
+Usage:
+    python benchmark_pipeline.py
+    python benchmark_pipeline.py --force-gpt --gpt-latency 1.5 --order-latency 0.05
+    python benchmark_pipeline.py --concurrency 8 --repeat 10
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import random
+import time
+
+import fakeMt5
+from benchmark_parser import load_corpus, signals_match, DEFAULT_CORPUS
+
+
+def random_walk(start, step, seed):
+    """Flux de prix infini (marche aléatoire) pour le faux terminal."""
+    rng = random.Random(seed)
+    price = start
+    while True:
+        price += rng.uniform(-step, step)
+        yield round(price, 5)
+
+
+def setup(args, corpus):
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal(order_latency=args.order_latency))
+    for i, (name, spec) in enumerate(terminal.symbols.items()):
+        terminal.set_tick_stream(name, random_walk(spec['bid'], spec['point'] * 10, seed=i))
+
+    from config import config
+    import chatGpt
+    import fakeOpenAI
+    import tracing
+
+    config.MT5_DEMO_LOGIN = str(terminal.login_id)
+    config.MT5_DEMO_PASSWORD = "benchmark"
+    config.MT5_DEMO_SERVER = "Fake-Demo"
+    if args.force_gpt:
+        # Seuil inatteignable: toutes les extractions passent par le faux ChatGPT
+        config.LOCAL_PARSER_MIN_CONFIDENCE = 1.1
+    tracing.tracer.log_path = args.log
+
+    responses = {item['text']: item['expected'] for item in corpus}
+    _, gpt_client = fakeOpenAI.install(chatGpt, responses, latency=args.gpt_latency)
+
+    from signalCache import SignalCache
+    config.SIGNAL_CACHE_PATH = ':memory:'
+    config.ORDER_REGISTRY_PATH = ':memory:'
+    from telegramListener import TradingBot
+    bot = TradingBot(args.risk, 'DEMO')
+    # Les passes répétées accumulent des positions: pas de limite de compte pendant la mesure
+    bot.exposure_book.max_risk_percentage = float('inf')
+    if not args.cache:
+        # TTL nul: chaque passe refait l'extraction et le placement
+        bot.signal_cache = SignalCache(path=':memory:', ttl=0)
+    return terminal, bot, gpt_client, tracing.tracer
+
+
+def resolved(expected):
+    """Signal attendu avec le symbole du courtier (le pipeline place BTCUSDT sur BTCUSD)."""
+    from symbolResolver import symbol_resolver
+    if expected is None:
+        return None
+    return dict(expected, symbol=symbol_resolver.resolve(expected['symbol']))
+
+
+async def replay(bot, corpus, concurrency):
+    """Rejoue le corpus par vagues de `concurrency` messages simultanés."""
+    outputs = []
+    for start in range(0, len(corpus), concurrency):
+        wave = corpus[start:start + concurrency]
+        outputs.extend(await asyncio.gather(*(
+            bot.process_message(item['text'], item['channel_id']) for item in wave
+        )))
+    return outputs
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark hors ligne du pipeline de signaux")
+    arg_parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Nombre de passes sur le corpus")
+    arg_parser.add_argument("--concurrency", type=int, default=1, help="Messages traités simultanément")
+    arg_parser.add_argument("--gpt-latency", type=float, default=1.0, help="Latence du faux ChatGPT (s)")
+    arg_parser.add_argument("--order-latency", type=float, default=0.02, help="Latence de order_send (s)")
+    arg_parser.add_argument("--force-gpt", action="store_true", help="Désactiver le parser local")
+    arg_parser.add_argument("--cache", action="store_true", help="Activer le cache d'extraction et l'anti-doublon")
+    arg_parser.add_argument("--risk", type=float, default=45.0, help="Risque par signal (EUR)")
+    arg_parser.add_argument("--log", default=None, help="Journal JSONL des traces (désactivé par défaut)")
+    arg_parser.add_argument("--verbose", action="store_true", help="Afficher les logs du bot")
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(args.corpus) * args.repeat
+    output = io.StringIO()
+    quiet = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(output)
+
+    with quiet:
+        terminal, bot, gpt_client, tracer = setup(args, corpus)
+        start = time.perf_counter()
+        outputs = asyncio.run(replay(bot, corpus, max(1, args.concurrency)))
+        elapsed = time.perf_counter() - start
+        bot.order_sender.close_connection()
+
+    correct = sum(1 for item, signal in zip(corpus, outputs) if signals_match(signal, resolved(item['expected'])))
+
+    print("⏱️ BENCHMARK PIPELINE (hors ligne)")
+    print("=" * 60)
+    print(f"📚 Messages: {len(corpus)} | Concurrence: {args.concurrency} | "
+          f"ChatGPT: {args.gpt_latency * 1000:.0f} ms | order_send: {args.order_latency * 1000:.0f} ms")
+    print(f"🚀 Débit: {len(corpus) / elapsed:.1f} messages/s ({elapsed:.2f}s)")
+    print(f"🎯 Exactitude d'extraction: {correct}/{len(corpus)} ({correct / len(corpus) * 100:.1f}%)")
+    print(f"🤖 Appels ChatGPT: {gpt_client.chat.completions.calls}")
+    print(f"📈 Appels MT5: {dict(terminal.calls)}")
+    print("\n📊 Latences par étape (ms):")
+    for stage, stats in sorted(tracer.summary().items()):
+        if stats['p50'] is None:
+            continue
+        print(f"   {stage:<22} n={stats['count']:<5} p50={stats['p50']:<10} p95={stats['p95']:<10} p99={stats['p99']}")
+
+
+if __name__ == "__main__":
+    main()
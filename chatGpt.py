@@ -1,7 +1,166 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+from collections import deque
 from config import config
+from tracing import traced, tracer
+import asyncio
+import random
 import re
 import json
+import time
+
+# Erreurs transitoires: nouvel essai avec attente exponentielle et gigue
+RETRYABLE_ERRORS = (RateLimitError, APIConnectionError, APITimeoutError, InternalServerError)
+
+
+class GptClient:
+    """
+    Client d'extraction partagé: un seul AsyncOpenAI (connexions keep-alive réutilisées),
+    nombre de requêtes simultanées limité, nouvel essai avec gigue sur 429/5xx/timeout,
+    requête doublée (hedging) si la réponse tarde au-delà du p95 observé, et mode JSON
+    pour obtenir directement un objet sans extraction par regex.
+    """
+
+    def __init__(self, api_key=None, base_url=None, model=None, max_concurrency=None, max_retries=None,
+                 timeout=None, hedge_delay=None, json_mode=None):
+        """
+        Args:
+            api_key (str): Clé OpenAI (défaut: config.GPT_KEY)
+            base_url (str): URL de l'API (défaut: config.GPT_BASE_URL, vide = OpenAI)
+            model (str): Modèle (défaut: config.GPT_MODEL)
+            max_concurrency (int): Requêtes simultanées maximales
+            max_retries (int): Nouveaux essais sur erreur transitoire
+            timeout (float): Timeout d'une requête en secondes
+            hedge_delay (float): Délai avant la requête doublée tant que le p95 est inconnu (0 = pas de hedging)
+            json_mode (bool): Demander une réponse au format JSON (response_format)
+        """
+        self.api_key = api_key if api_key is not None else config.GPT_KEY
+        self.base_url = base_url if base_url is not None else config.GPT_BASE_URL
+        self.model = model or config.GPT_MODEL
+        self.max_concurrency = max_concurrency or config.GPT_MAX_CONCURRENCY
+        self.max_retries = max_retries if max_retries is not None else config.GPT_MAX_RETRIES
+        self.timeout = timeout or config.GPT_TIMEOUT
+        self.hedge_delay = hedge_delay if hedge_delay is not None else config.GPT_HEDGE_DELAY
+        self.json_mode = json_mode if json_mode is not None else config.GPT_JSON_MODE
+        self.latencies = deque(maxlen=200)      # durées des réponses reçues (secondes)
+        self.stats = {'requests': 0, 'retries': 0, 'hedged': 0, 'hedge_wins': 0, 'failures': 0}
+        self.reset()
+
+    def reset(self):
+        """Oublie le client HTTP (recréé au prochain appel, ex: après remplacement d'AsyncOpenAI)."""
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+
+    def _ensure_client(self):
+        # Client et sémaphore sont liés à la boucle asyncio qui les utilise
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            kwargs = {'api_key': self.api_key, 'max_retries': 0, 'timeout': self.timeout}
+            if self.base_url:
+                kwargs['base_url'] = self.base_url
+            self._client = AsyncOpenAI(**kwargs)
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._loop = loop
+        return self._client
+
+    def current_hedge_delay(self):
+        """p95 des latences observées (délai configuré tant qu'il y a moins de 20 mesures)."""
+        if not self.hedge_delay:
+            return None
+        if len(self.latencies) < 20:
+            return self.hedge_delay
+        ordered = sorted(self.latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    async def extract(self, prompt):
+        """
+        Envoie le prompt et retourne le premier JSON valide (requête doublée si elle tarde).
+
+        Returns:
+            dict: Signal extrait ou None
+        """
+        self._ensure_client()
+        tasks = {asyncio.create_task(self._request(prompt))}
+        delay = self.current_hedge_delay()
+        try:
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done:
+                    self.stats['hedged'] += 1
+                    print(f"🔁 Réponse GPT > {delay * 1000:.0f} ms: requête doublée")
+                    hedge = asyncio.create_task(self._request(prompt))
+                    hedge.hedge = True
+                    tasks.add(hedge)
+
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    signal = task.result()
+                    if signal is not None:
+                        if getattr(task, 'hedge', False):
+                            self.stats['hedge_wins'] += 1
+                        return signal
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _request(self, prompt):
+        """Une requête avec nouveaux essais (attente exponentielle, gigue complète, Retry-After)."""
+        client = self._ensure_client()
+        kwargs = {'model': self.model, 'messages': [{"role": "user", "content": prompt}], 'timeout': self.timeout}
+        if self.json_mode:
+            kwargs['response_format'] = {"type": "json_object"}
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with self._semaphore:
+                    self.stats['requests'] += 1
+                    start = time.perf_counter()
+                    response = await client.chat.completions.create(**kwargs)
+                    elapsed = time.perf_counter() - start
+                self.latencies.append(elapsed)
+                tracer.record('gpt_request', elapsed * 1000)
+                return chatGpt.signal_cleaner(response)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    self.stats['failures'] += 1
+                    print(f"Erreur ChatGPT après {attempt + 1} essai(s): {e}")
+                    return None
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    self.stats['failures'] += 1
+                    print(f"Erreur ChatGPT: Retry-After au-delà de {self.timeout:.0f} s, abandon ({e})")
+                    return None
+                self.stats['retries'] += 1
+                print(f"⏳ ChatGPT indisponible ({type(e).__name__}), nouvel essai dans {delay:.2f} s")
+                await asyncio.sleep(delay)
+            except Exception as e:
+                self.stats['failures'] += 1
+                print(f"Erreur ChatGPT: {e}")
+                return None
+        return None
+
+    def _retry_delay(self, error, attempt):
+        """
+        Attente avant le prochain essai: Retry-After du serveur, plafonné au timeout
+        (None au-delà: un signal extrait des minutes plus tard ne vaut plus rien).
+        """
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        try:
+            if retry_after is not None:
+                delay = float(retry_after)
+                return delay if delay <= self.timeout else None
+        except ValueError:
+            pass
+        # Gigue complète: évite que les requêtes limitées ensemble réessaient ensemble
+        return random.uniform(0, config.GPT_RETRY_BASE_DELAY * 2 ** attempt)
+
+
+# Instance globale (connexions réutilisées entre messages)
+gpt_client = GptClient()
+_sync_client = None
 
 class chatGpt():
     def __init__(self, signal, channel_id=1):
@@ -9,9 +168,6 @@ class chatGpt():
         self.signal = signal
         self.channel_id = channel_id
         
-        # Initialiser le client OpenAI
-        self.client = OpenAI(api_key=self.gpt_key)
-        
         # Prompts spécifiques pour chaque canal
         if channel_id == 1:
             self.prompt = self._get_channel_1_prompt()
@@ -101,22 +257,46 @@ class chatGpt():
         "{self.signal}"
         """
 
+    @property
+    def client(self):
+        """Client synchrone partagé (créé une seule fois)."""
+        global _sync_client
+        if _sync_client is None:
+            kwargs = {'api_key': self.gpt_key, 'max_retries': config.GPT_MAX_RETRIES}
+            if config.GPT_BASE_URL:
+                kwargs['base_url'] = config.GPT_BASE_URL
+            _sync_client = OpenAI(**kwargs)
+        return _sync_client
+
+    @traced('gpt_extraction')
     def get_signal(self):
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4-turbo",
+                model=config.GPT_MODEL,
                 messages=[{"role": "user", "content": self.prompt}],
-                timeout=30
+                timeout=config.GPT_TIMEOUT
             )
             return self.signal_cleaner(response)
         except Exception as e:
             print(f"Erreur ChatGPT: {e}")
             return None
     
+    @traced('gpt_extraction')
+    async def get_signal_async(self):
+        """Version asynchrone de get_signal via le client partagé (ne bloque pas la boucle Telethon)."""
+        return await gpt_client.extract(self.prompt)
+    
     @staticmethod
     def signal_cleaner(response):
         try:
             content = response.choices[0].message.content
+            try:
+                # Mode JSON: la réponse est directement l'objet
+                signal = json.loads(content)
+                if isinstance(signal, dict):
+                    return signal
+            except ValueError:
+                pass
             match = re.search(r'\{.*?\}', content, re.DOTALL)
             if match:
                 signal = json.loads(match.group(0))
@@ -20,13 +20,101 @@ class Config:
     # Trading
     TOTAL_RISK_EUR = float(os.getenv("TOTAL_RISK_EUR", "45.0"))
     MAX_RISK_PERCENTAGE = float(os.getenv("MAX_RISK_PERCENTAGE", "7.0"))
+    # Poids des jambes 1/2/3 dans le risque du signal (parts égales par défaut)
+    LEG_RISK_WEIGHTS = [float(weight) for weight in os.getenv("LEG_RISK_WEIGHTS", "1,1,1").split(",") if weight.strip()]
+    EXPOSURE_SYNC_INTERVAL = float(os.getenv("EXPOSURE_SYNC_INTERVAL", "5.0"))
     GPT_KEY = os.getenv("GPT_KEY", "")
     
+    # Client d'extraction GPT (connexions partagées, limite de concurrence, nouveaux essais, hedging)
+    GPT_MODEL = os.getenv("GPT_MODEL", "gpt-4-turbo")
+    GPT_BASE_URL = os.getenv("GPT_BASE_URL", "")
+    GPT_TIMEOUT = float(os.getenv("GPT_TIMEOUT", "30.0"))
+    GPT_MAX_CONCURRENCY = int(os.getenv("GPT_MAX_CONCURRENCY", "4"))
+    GPT_MAX_RETRIES = int(os.getenv("GPT_MAX_RETRIES", "3"))
+    GPT_RETRY_BASE_DELAY = float(os.getenv("GPT_RETRY_BASE_DELAY", "0.5"))
+    GPT_HEDGE_DELAY = float(os.getenv("GPT_HEDGE_DELAY", "4.0"))
+    GPT_JSON_MODE = os.getenv("GPT_JSON_MODE", "true").lower() == "true"
+    
+    # Gestion des trades après placement (boucle de polling, secondes/minutes/points)
+    LIFECYCLE_POLL_INTERVAL = float(os.getenv("LIFECYCLE_POLL_INTERVAL", "1.0"))
+    LIFECYCLE_BREAKEVEN_AFTER_TP1 = os.getenv("LIFECYCLE_BREAKEVEN_AFTER_TP1", "true").lower() == "true"
+    LIFECYCLE_CANCEL_PENDING_ON_TP1 = os.getenv("LIFECYCLE_CANCEL_PENDING_ON_TP1", "true").lower() == "true"
+    LIFECYCLE_CANCEL_ON_SL = os.getenv("LIFECYCLE_CANCEL_ON_SL", "true").lower() == "true"
+    LIFECYCLE_PENDING_EXPIRY_MINUTES = float(os.getenv("LIFECYCLE_PENDING_EXPIRY_MINUTES", "240"))
+    LIFECYCLE_TRAILING_POINTS = float(os.getenv("LIFECYCLE_TRAILING_POINTS", "0"))
+    LIFECYCLE_TRAILING_STEP_POINTS = float(os.getenv("LIFECYCLE_TRAILING_STEP_POINTS", "10"))
+    
+    # Parser local (repli sur ChatGPT si confiance insuffisante)
+    LOCAL_PARSER_MIN_CONFIDENCE = float(os.getenv("LOCAL_PARSER_MIN_CONFIDENCE", "0.8"))
+    CHANNEL_2_DEFAULT_SYMBOL = os.getenv("CHANNEL_2_DEFAULT_SYMBOL", "XAUUSD")
+    
+    # Pré-filtre avant extraction (régression logistique sur caractéristiques lexicales)
+    SIGNAL_FILTER_MODEL = os.getenv("SIGNAL_FILTER_MODEL", "data/signal_filter.json")
+    SIGNAL_FILTER_THRESHOLD = float(os.getenv("SIGNAL_FILTER_THRESHOLD", "0.5"))
+    
+    # Cache des spécifications symboles (secondes)
+    SYMBOL_TICK_VALUE_TTL = float(os.getenv("SYMBOL_TICK_VALUE_TTL", "5.0"))
+    FX_RATE_TTL = float(os.getenv("FX_RATE_TTL", "2.0"))
+    
+    # Résolution des symboles du courtier (suffixes, alias) et surcharges "GOLD=XAUUSD.m,US30=DJ30.cash"
+    SYMBOL_OVERRIDES = dict(
+        (alias.strip(), symbol.strip()) for alias, _, symbol in
+        (item.partition("=") for item in os.getenv("SYMBOL_OVERRIDES", "").split(",")) if alias.strip() and symbol.strip()
+    )
+    SYMBOL_RESOLVER_REFRESH_INTERVAL = float(os.getenv("SYMBOL_RESOLVER_REFRESH_INTERVAL", "60.0"))
+    
+    # Enregistrement des ticks (tampon mémoire par symbole, fichiers journaliers)
+    TICK_DATA_DIR = os.getenv("TICK_DATA_DIR", "cache/ticks")
+    TICK_RECORDER_CAPACITY = int(os.getenv("TICK_RECORDER_CAPACITY", "200000"))
+    TICK_RECORDER_INTERVAL = float(os.getenv("TICK_RECORDER_INTERVAL", "0.25"))
+    TICK_RECORDER_FLUSH_INTERVAL = float(os.getenv("TICK_RECORDER_FLUSH_INTERVAL", "60.0"))
+    TICK_RECORDER_MAX_AGE = float(os.getenv("TICK_RECORDER_MAX_AGE", "0.5"))
+    
+    # Préparation au démarrage: symboles sélectionnés et caches chargés avant le premier signal
+    WARMUP_SYMBOLS = [name.strip() for name in os.getenv("WARMUP_SYMBOLS", "XAUUSD,EURUSD,GBPUSD,USDJPY").split(",") if name.strip()]
+    WARMUP_HISTORY_DAYS = int(os.getenv("WARMUP_HISTORY_DAYS", "30"))
+    WARMUP_TICK_TIMEOUT = float(os.getenv("WARMUP_TICK_TIMEOUT", "2.0"))
+    
+    # Session MT5 (secondes)
+    MT5_HEARTBEAT_INTERVAL = float(os.getenv("MT5_HEARTBEAT_INTERVAL", "5.0"))
+    MT5_RECONNECT_BASE_DELAY = float(os.getenv("MT5_RECONNECT_BASE_DELAY", "1.0"))
+    MT5_RECONNECT_MAX_DELAY = float(os.getenv("MT5_RECONNECT_MAX_DELAY", "60.0"))
+    MT5_ORDER_MAX_STALENESS = float(os.getenv("MT5_ORDER_MAX_STALENESS", "10.0"))
+    
+    # Journal structuré des latences du pipeline
+    LATENCY_LOG_PATH = os.getenv("LATENCY_LOG_PATH", "logs/latency.jsonl")
+    LATENCY_LOG_MAX_BYTES = int(os.getenv("LATENCY_LOG_MAX_BYTES", "5000000"))  # rotation vers .1 au-delà
+    
+    # Cache des extractions de signaux et anti-doublon (secondes)
+    SIGNAL_CACHE_PATH = os.getenv("SIGNAL_CACHE_PATH", "cache/signals.sqlite3")
+    SIGNAL_CACHE_TTL = float(os.getenv("SIGNAL_CACHE_TTL", "3600"))
+    SIGNAL_CACHE_SIZE = int(os.getenv("SIGNAL_CACHE_SIZE", "1024"))
+    
+    # Registre local des ordres placés (message → tickets)
+    ORDER_REGISTRY_PATH = os.getenv("ORDER_REGISTRY_PATH", "cache/orders.sqlite3")
+    
+    # Historique local des deals (SQLite incrémental)
+    DEAL_STORE_PATH = os.getenv("DEAL_STORE_PATH", "cache/deals.sqlite3")
+    DEAL_STORE_BACKFILL_DAYS = int(os.getenv("DEAL_STORE_BACKFILL_DAYS", "365"))
+    DEAL_STORE_SYNC_INTERVAL = float(os.getenv("DEAL_STORE_SYNC_INTERVAL", "2.0"))
+    
+    # API: cadence de l'instantané partagé (secondes)
+    API_SNAPSHOT_INTERVAL = float(os.getenv("API_SNAPSHOT_INTERVAL", "1.0"))
+    # Attente maximale d'un appel MT5 déclenché par une requête HTTP (secondes)
+    API_MT5_TIMEOUT = float(os.getenv("API_MT5_TIMEOUT", "10.0"))
+    
     # IDs des canaux
     TELEGRAM_CHANNEL_1_ID = int(os.getenv("TELEGRAM_CHANNEL_1_ID", "-2125503665"))
     TELEGRAM_CHANNEL_2_ID = int(os.getenv("TELEGRAM_CHANNEL_2_ID", "-2259371711"))
     
-    # Comptes MT5 - Seulement DID et DEMO
+    # Comptes supplémentaires recevant chaque signal en parallèle (ex: "ALPHA,BETA")
+    # Identifiants: MT5_<COMPTE>_LOGIN / _MDP / _SERVEUR, terminal: MT5_<COMPTE>_PATH,
+    # risque propre: MT5_<COMPTE>_RISK_EUR (défaut: risque saisi au lancement)
+    MT5_FANOUT_ACCOUNTS = [name.strip().upper() for name in os.getenv("MT5_FANOUT_ACCOUNTS", "").split(",") if name.strip()]
+    # Délai maximal d'exécution d'un signal sur un compte secondaire (secondes)
+    MT5_FANOUT_TIMEOUT = float(os.getenv("MT5_FANOUT_TIMEOUT", "10.0"))
+    
+    # Comptes MT5 principaux: DID et DEMO
     # Compte DID
     MT5_DID_LOGIN = os.getenv("MT5_DID_LOGIN", "")
     MT5_DID_PASSWORD = os.getenv("MT5_DID_MDP", "")
@@ -56,8 +144,13 @@ class Config:
             password = self.MT5_DEMO_PASSWORD
             server = self.MT5_DEMO_SERVER
             print(f"🔧 DEBUG Config: DEMO - Login: '{login}', Password: '{password}', Server: '{server}'")
+        elif account_type in self.MT5_FANOUT_ACCOUNTS:
+            print(f"🔧 DEBUG Config: Récupération credentials {account_type} (fan-out)...")
+            login = os.getenv(f"MT5_{account_type}_LOGIN", "")
+            password = os.getenv(f"MT5_{account_type}_MDP", "")
+            server = os.getenv(f"MT5_{account_type}_SERVEUR", "")
         else:
-            error_msg = f"Type de compte non supporté: {account_type}. Comptes disponibles: DID, DEMO"
+            error_msg = f"Type de compte non supporté: {account_type}. Comptes disponibles: DID, DEMO, {', '.join(self.MT5_FANOUT_ACCOUNTS)}"
             print(f"❌ DEBUG Config: {error_msg}")
             raise ValueError(error_msg)
         
@@ -75,12 +168,18 @@ class Config:
         result = {
             'login': login_int,
             'password': password,
-            'server': server
+            'server': server,
+            'path': os.getenv(f"MT5_{account_type}_PATH") or None
         }
         
         print(f"🔧 DEBUG Config: Credentials finaux pour {account_type}: {result}")
         return result
     
+    def get_account_risk(self, account_type, default_risk_eur):
+        """Risque par signal (EUR) propre à un compte, sinon le risque par défaut."""
+        value = os.getenv(f"MT5_{account_type.upper()}_RISK_EUR")
+        return float(value) if value else default_risk_eur
+    
     def get_telegram_credentials(self, account_type=None):
         """Retourne les identifiants Telegram pour DID."""
         print(f"🔧 DEBUG Config: get_telegram_credentials appelé avec account_type='{account_type}'")
@@ -0,0 +1,17 @@
+"""
+Configuration commune des tests: identifiants du terminal simulé et stockages en mémoire.
+"""
+
+import pytest
+from config import config
+
+
+@pytest.fixture(autouse=True)
+def fake_mt5_config(monkeypatch):
+    """Compte démo du terminal simulé (fakeMt5) et bases SQLite en mémoire, restaurés après chaque test."""
+    monkeypatch.setattr(config, 'MT5_DEMO_LOGIN', "123456")
+    monkeypatch.setattr(config, 'MT5_DEMO_PASSWORD', "secret")
+    monkeypatch.setattr(config, 'MT5_DEMO_SERVER', "Fake-Demo")
+    monkeypatch.setattr(config, 'SIGNAL_CACHE_PATH', ':memory:')
+    monkeypatch.setattr(config, 'ORDER_REGISTRY_PATH', ':memory:')
+    monkeypatch.setattr(config, 'DEAL_STORE_PATH', ':memory:')
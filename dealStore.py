@@ -0,0 +1,282 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+import MetaTrader5 as mt5
+from config import config
+
+
+class DealStore:
+    """
+    Historique local des deals MT5, alimenté de façon incrémentale.
+    Seuls les deals postérieurs au dernier deal connu sont demandés au terminal;
+    les positions fermées sont matérialisées dans une table indexée
+    (date de clôture, symbole, canal, position) interrogée par l'API.
+    """
+
+    def __init__(self, login, path=None, channel_resolver=None, backfill_days=None):
+        """
+        Args:
+            login (int): Compte MT5 dont on stocke l'historique
+            path (str): Fichier SQLite (':memory:' pour les tests)
+            channel_resolver (callable): deal d'ouverture → numéro de canal
+            backfill_days (int): Profondeur de la première synchronisation
+        """
+        self.login = login
+        self.path = path if path is not None else config.DEAL_STORE_PATH
+        self.channel_resolver = channel_resolver or (lambda deal: 1)
+        self.backfill_days = backfill_days if backfill_days is not None else config.DEAL_STORE_BACKFILL_DAYS
+        self.last_sync = 0.0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS deals (
+                ticket INTEGER PRIMARY KEY,
+                login INTEGER NOT NULL,
+                position_id INTEGER NOT NULL,
+                time INTEGER NOT NULL,
+                type INTEGER NOT NULL,
+                entry INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                volume REAL NOT NULL,
+                price REAL NOT NULL,
+                profit REAL NOT NULL,
+                commission REAL NOT NULL DEFAULT 0,
+                swap REAL NOT NULL DEFAULT 0,
+                magic INTEGER NOT NULL DEFAULT 0,
+                comment TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_deals_login_time ON deals (login, time);
+            CREATE INDEX IF NOT EXISTS idx_deals_position ON deals (login, position_id);
+
+            CREATE TABLE IF NOT EXISTS trades (
+                login INTEGER NOT NULL,
+                position_id INTEGER NOT NULL,
+                channel_id INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                type TEXT NOT NULL,
+                volume REAL NOT NULL,
+                entry_price REAL NOT NULL,
+                exit_price REAL NOT NULL,
+                pnl REAL NOT NULL,
+                open_time INTEGER NOT NULL,
+                close_time INTEGER NOT NULL,
+                magic INTEGER NOT NULL DEFAULT 0,
+                sl REAL,
+                r_multiple REAL,
+                PRIMARY KEY (login, position_id)
+            );
+            CREATE INDEX IF NOT EXISTS idx_trades_close ON trades (login, close_time);
+            CREATE INDEX IF NOT EXISTS idx_trades_symbol ON trades (login, symbol, close_time);
+            CREATE INDEX IF NOT EXISTS idx_trades_channel ON trades (login, channel_id, close_time);
+        """)
+        # Bases créées avant l'ajout du R multiple
+        columns = {row['name'] for row in self._db.execute("PRAGMA table_info(trades)")}
+        for column in ('sl', 'r_multiple'):
+            if column not in columns:
+                self._db.execute(f"ALTER TABLE trades ADD COLUMN {column} REAL")
+        self._db.commit()
+
+    def add_listener(self, callback):
+        """Abonne un callback appelé avec chaque position fermée ingérée (dict trades)."""
+        self._listeners.append(callback)
+
+    def last_deal_time(self):
+        row = self._db.execute("SELECT MAX(time) FROM deals WHERE login = ?", (self.login,)).fetchone()
+        return row[0]
+
+    def sync(self, min_interval=None):
+        """
+        Ingère les nouveaux deals du terminal (à appeler depuis le thread MT5).
+
+        Args:
+            min_interval (float): Pas de nouvel appel au terminal avant ce délai (secondes)
+
+        Returns:
+            int: Nombre de deals ajoutés
+        """
+        min_interval = config.DEAL_STORE_SYNC_INTERVAL if min_interval is None else min_interval
+        if time.time() - self.last_sync < min_interval:
+            return 0
+
+        with self._lock:
+            last_time = self.last_deal_time()
+            # Reprise à la seconde du dernier deal: les doublons sont ignorés par ticket
+            if last_time is None:
+                from_date = datetime.now() - timedelta(days=self.backfill_days)
+            else:
+                from_date = datetime.fromtimestamp(last_time)
+            deals = mt5.history_deals_get(from_date, datetime.now() + timedelta(days=1))
+            self.last_sync = time.time()
+            if not deals:
+                return 0
+
+            before = self._db.total_changes
+            self._db.executemany("""
+                INSERT OR IGNORE INTO deals
+                    (ticket, login, position_id, time, type, entry, symbol, volume, price, profit, commission, swap, magic, comment)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (deal.ticket, self.login, deal.position_id, deal.time, deal.type, deal.entry, deal.symbol,
+                 deal.volume, deal.price, deal.profit, getattr(deal, 'commission', 0.0),
+                 getattr(deal, 'swap', 0.0), getattr(deal, 'magic', 0), getattr(deal, 'comment', ''))
+                for deal in deals
+            ])
+            added = self._db.total_changes - before
+
+            trades = self._rebuild_trades({deal.position_id for deal in deals}) if added else []
+            self._db.commit()
+
+        for trade in trades:
+            for callback in self._listeners:
+                callback(trade)
+        return added
+
+    def _rebuild_trades(self, position_ids):
+        """
+        Recalcule les positions fermées touchées par les nouveaux deals.
+
+        Returns:
+            list: Positions fermées (re)matérialisées
+        """
+        trades = []
+        for position_id in sorted(position_ids):
+            pos_deals = self._db.execute(
+                "SELECT * FROM deals WHERE login = ? AND position_id = ? ORDER BY time, ticket",
+                (self.login, position_id)
+            ).fetchall()
+            if len(pos_deals) < 2:  # Ouverture + fermeture
+                continue
+
+            open_deal, close_deal = pos_deals[0], pos_deals[-1]
+            if open_deal['entry'] != 0 or close_deal['entry'] != 1:  # Entrée puis sortie
+                continue
+
+            trade = {
+                'login': self.login,
+                'position_id': position_id,
+                'channel_id': self.channel_resolver(open_deal),
+                'symbol': open_deal['symbol'],
+                'type': 'BUY' if open_deal['type'] == 0 else 'SELL',
+                'volume': open_deal['volume'],
+                'entry_price': open_deal['price'],
+                'exit_price': close_deal['price'],
+                'pnl': close_deal['profit'],
+                'open_time': open_deal['time'],
+                'close_time': close_deal['time'],
+                'magic': open_deal['magic'],
+                'sl': self._initial_sl(position_id)
+            }
+            trade['r_multiple'] = self.r_multiple(trade)
+
+            self._db.execute(f"""
+                INSERT OR REPLACE INTO trades ({', '.join(trade)}) VALUES ({', '.join('?' * len(trade))})
+            """, tuple(trade.values()))
+            trades.append(trade)
+        return trades
+
+    def reattribute(self):
+        """
+        Backfill: ré-attribue le canal de toutes les positions déjà stockées avec le
+        channel_resolver courant (ex: après l'ajout du registre d'ordres).
+        
+        Returns:
+            int: Nombre de positions dont le canal a changé
+        """
+        with self._lock:
+            rows = self._db.execute(
+                """
+                SELECT t.position_id, t.channel_id, d.*
+                FROM trades t JOIN deals d ON d.login = t.login AND d.position_id = t.position_id AND d.entry = 0
+                WHERE t.login = ?
+                """,
+                (self.login,)
+            ).fetchall()
+            updates, seen = [], set()
+            for row in rows:
+                if row['position_id'] in seen:
+                    continue
+                seen.add(row['position_id'])
+                channel_id = self.channel_resolver(row)
+                if channel_id != row['channel_id']:
+                    updates.append((channel_id, self.login, row['position_id']))
+            self._db.executemany("UPDATE trades SET channel_id = ? WHERE login = ? AND position_id = ?", updates)
+            self._db.commit()
+        return len(updates)
+
+    @staticmethod
+    def _initial_sl(position_id):
+        """SL de l'ordre d'ouverture (avant tout déplacement au breakeven ou trailing)."""
+        orders = mt5.history_orders_get(position=position_id)
+        for order in sorted(orders or (), key=lambda o: (o.time_setup, o.ticket)):
+            if order.sl:
+                return order.sl
+        return None
+
+    @staticmethod
+    def r_multiple(trade):
+        """
+        R réalisé: gain en prix rapporté à la distance du SL initial.
+
+        Returns:
+            float: R multiple (ex: 2.0 = deux fois le risque) ou None si SL inconnu
+        """
+        sl = trade.get('sl')
+        if not sl:
+            return None
+        direction = 1 if trade['type'] == 'BUY' else -1
+        risk = direction * (trade['entry_price'] - sl)
+        if risk <= 0:
+            return None
+        return direction * (trade['exit_price'] - trade['entry_price']) / risk
+
+    def trades(self, since=None, until=None, channel_id=None, symbol=None):
+        """
+        Positions fermées, de la plus récente à la plus ancienne (parcours d'index).
+
+        Args:
+            since (datetime): Date de clôture minimale
+            until (datetime): Date de clôture maximale
+            channel_id (int): Filtre canal
+            symbol (str): Filtre symbole
+
+        Returns:
+            list: Lignes de la table trades (dict)
+        """
+        clauses, params = ["login = ?"], [self.login]
+        if since is not None:
+            clauses.append("close_time >= ?")
+            params.append(int(since.timestamp()))
+        if until is not None:
+            clauses.append("close_time <= ?")
+            params.append(int(until.timestamp()))
+        if channel_id is not None:
+            clauses.append("channel_id = ?")
+            params.append(channel_id)
+        if symbol is not None:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT * FROM trades WHERE {' AND '.join(clauses)} ORDER BY close_time DESC, position_id DESC",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def stats(self):
+        with self._lock:
+            deals = self._db.execute("SELECT COUNT(*) FROM deals WHERE login = ?", (self.login,)).fetchone()[0]
+            trades = self._db.execute("SELECT COUNT(*) FROM trades WHERE login = ?", (self.login,)).fetchone()[0]
+        return {'deals': deals, 'trades': trades, 'last_sync': self.last_sync}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
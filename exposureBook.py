@@ -0,0 +1,166 @@
+import asyncio
+import threading
+import MetaTrader5 as mt5
+from config import config
+from riskManager import RiskManager
+
+
+class ExposureBook:
+    """
+    Livre d'exposition: risque jusqu'au SL de chaque position et ordre en attente,
+    en EUR. Tenu à jour de façon incrémentale (résultats de placement, puis
+    instantanés positions/ordres où seuls les tickets modifiés sont recalculés),
+    ce qui rend le contrôle d'un nouveau signal contre MAX_RISK_PERCENTAGE O(1).
+    """
+
+    def __init__(self, max_risk_percentage=None):
+        self.max_risk_percentage = max_risk_percentage if max_risk_percentage is not None else config.MAX_RISK_PERCENTAGE
+        self.entries = {}         # ticket → (clé d'état, risque EUR)
+        self.total_risk = 0.0
+        self.balance = None
+        self._lock = threading.Lock()
+        # Sérialise contrôle + placement: deux signaux rapprochés ne passent pas tous deux le contrôle
+        self.gate = asyncio.Lock()
+
+    @property
+    def cap(self):
+        """Risque ouvert maximal autorisé (EUR), None tant que le solde est inconnu."""
+        if self.balance is None:
+            return None
+        return self.balance * self.max_risk_percentage / 100
+
+    @property
+    def available(self):
+        cap = self.cap
+        return None if cap is None else max(0.0, cap - self.total_risk)
+
+    def check(self, requested_risk):
+        """
+        Contrôle un nouveau signal contre la limite (O(1)).
+
+        Args:
+            requested_risk (float): Risque total du signal en EUR
+
+        Returns:
+            float: Facteur à appliquer au risque (1.0 = accepté, 0.0 = rejeté, aussi tant que le solde est inconnu)
+        """
+        available = self.available
+        if available is None:
+            return 0.0
+        if requested_risk <= available:
+            return 1.0
+        if available <= 0:
+            return 0.0
+        return available / requested_risk
+
+    def fit(self, orders, lot_sizes, risk_manager):
+        """
+        Applique la limite à un signal dimensionné (thread MT5): accepté tel quel,
+        redimensionné sur le risque encore disponible, ou rejeté.
+
+        Args:
+            orders (list): Jambes du signal
+            lot_sizes (list): Tailles de lot calculées
+            risk_manager (RiskManager): Pour redimensionner sur le budget disponible
+
+        Returns:
+            list: Tailles de lot (inchangées ou réduites), None si le signal est rejeté
+        """
+        if self.balance is None:
+            self.sync()
+        if self.balance is None:
+            print("🛑 Solde du compte inconnu - signal rejeté (limite de risque non vérifiable)")
+            return None
+
+        requested = self.signal_risk(orders, lot_sizes)
+        factor = self.check(requested)
+        if factor >= 1.0:
+            return lot_sizes
+
+        available = self.available
+        if factor > 0:
+            # Redimensionner sur le risque encore disponible (arrondi des lots à l'inférieur)
+            lot_sizes = risk_manager.calculate_lot_sizes(orders, available)
+            scaled = self.signal_risk(orders, lot_sizes)
+            if scaled <= available + 1e-9:
+                print(f"⚖️ Signal réduit: {requested:.2f}€ → {scaled:.2f}€ (disponible: {available:.2f}€)")
+                return lot_sizes
+
+        print(f"🛑 Limite de risque atteinte ({self.max_risk_percentage}% = {self.cap:.2f}€, "
+              f"ouvert: {self.total_risk:.2f}€) - signal de {requested:.2f}€ rejeté")
+        return None
+
+    @staticmethod
+    def signal_risk(orders, lot_sizes):
+        """Risque total d'un signal dimensionné (EUR). Thread MT5."""
+        return sum(
+            RiskManager.leg_risk(order['symbol'], order['sens'], order['entry_price'], order['sl'], lot_size)
+            for order, lot_size in zip(orders, lot_sizes)
+        )
+
+    def _set(self, ticket, state, risk):
+        with self._lock:
+            previous = self.entries.get(ticket)
+            if previous is not None:
+                self.total_risk -= previous[1]
+            self.entries[ticket] = (state, risk)
+            self.total_risk += risk
+
+    def _remove(self, ticket):
+        with self._lock:
+            previous = self.entries.pop(ticket, None)
+            if previous is not None:
+                self.total_risk -= previous[1]
+
+    def record_results(self, results):
+        """
+        Ajoute les jambes placées (résultats de SendOrder). Thread MT5.
+
+        Returns:
+            float: Risque ajouté en EUR
+        """
+        added = 0.0
+        for result in results:
+            state = (result['symbol'], result['type'], result['price'], result['sl'], result['volume'])
+            risk = RiskManager.leg_risk(*state)
+            self._set(result['mt5_order_id'], state, risk)
+            added += risk
+        return added
+
+    def sync(self):
+        """
+        Rapproche le livre de l'état du terminal (thread MT5): seuls les tickets
+        nouveaux ou modifiés (SL, volume) sont recalculés, les tickets disparus retirés.
+
+        Returns:
+            float: Risque ouvert total en EUR
+        """
+        account_info = mt5.account_info()
+        if account_info:
+            self.balance = account_info.balance
+
+        snapshot = {}
+        for position in mt5.positions_get() or ():
+            sens = 'BUY' if position.type == mt5.POSITION_TYPE_BUY else 'SELL'
+            snapshot[position.ticket] = (position.symbol, sens, position.price_open, position.sl, position.volume)
+        for order in mt5.orders_get() or ():
+            sens = 'BUY' if order.type in (mt5.ORDER_TYPE_BUY_LIMIT, mt5.ORDER_TYPE_BUY_STOP) else 'SELL'
+            snapshot[order.ticket] = (order.symbol, sens, order.price_open, order.sl, order.volume_current)
+
+        for ticket in [ticket for ticket in self.entries if ticket not in snapshot]:
+            self._remove(ticket)
+        for ticket, state in snapshot.items():
+            known = self.entries.get(ticket)
+            if known is None or known[0] != state:
+                self._set(ticket, state, RiskManager.leg_risk(*state))
+        return self.total_risk
+
+    def summary(self):
+        with self._lock:
+            cap = self.cap
+            return {
+                'open_risk_eur': round(self.total_risk, 2),
+                'cap_eur': round(cap, 2) if cap is not None else None,
+                'available_eur': round(max(0.0, cap - self.total_risk), 2) if cap is not None else None,
+                'tickets': len(self.entries)
+            }
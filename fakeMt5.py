@@ -0,0 +1,467 @@
+"""
+Faux module MetaTrader5 pour les tests et benchmarks hors terminal (Linux).
+Reproduit le sous-ensemble de l'API utilisé par le système, sur un univers
+de symboles synthétique.
+
+Usage:
+    import fakeMt5
+    terminal = fakeMt5.install()   # remplace MetaTrader5 dans sys.modules
+    import info                    # importe désormais le faux module
+"""
+
+import sys
+import time
+import types
+from collections import Counter
+from types import SimpleNamespace
+
+# Constantes MT5 (mêmes valeurs que le module officiel)
+ORDER_TYPE_BUY = 0
+ORDER_TYPE_SELL = 1
+ORDER_TYPE_BUY_LIMIT = 2
+ORDER_TYPE_SELL_LIMIT = 3
+ORDER_TYPE_BUY_STOP = 4
+ORDER_TYPE_SELL_STOP = 5
+TRADE_ACTION_DEAL = 1
+TRADE_ACTION_PENDING = 5
+TRADE_ACTION_SLTP = 6
+TRADE_ACTION_MODIFY = 7
+TRADE_ACTION_REMOVE = 8
+TRADE_RETCODE_DONE = 10009
+TRADE_RETCODE_INVALID = 10013
+TRADE_RETCODE_NO_MONEY = 10019
+ORDER_TIME_GTC = 0
+ORDER_FILLING_FOK = 0
+ORDER_FILLING_IOC = 1
+ACCOUNT_TRADE_MODE_DEMO = 0
+DEAL_TYPE_BUY = 0
+DEAL_TYPE_SELL = 1
+DEAL_ENTRY_IN = 0
+DEAL_ENTRY_OUT = 1
+DEAL_REASON_CLIENT = 0
+DEAL_REASON_EXPERT = 3
+DEAL_REASON_SL = 4
+DEAL_REASON_TP = 5
+POSITION_TYPE_BUY = 0
+POSITION_TYPE_SELL = 1
+COPY_TICKS_ALL = -1
+COPY_TICKS_INFO = 1
+
+CONSTANTS = {name: value for name, value in globals().items() if name.isupper()}
+
+# Univers synthétique: nom → (base, profit, bid, digits, contract_size)
+DEFAULT_UNIVERSE = {
+    'EURUSD': ('EUR', 'USD', 1.08500, 5, 100000),
+    'GBPUSD': ('GBP', 'USD', 1.27000, 5, 100000),
+    'EURGBP': ('EUR', 'GBP', 0.85430, 5, 100000),
+    'USDJPY': ('USD', 'JPY', 151.200, 3, 100000),
+    'GBPJPY': ('GBP', 'JPY', 192.020, 3, 100000),
+    'USDCHF': ('USD', 'CHF', 0.90100, 5, 100000),
+    'AUDUSD': ('AUD', 'USD', 0.65800, 5, 100000),
+    'XAUUSD': ('XAU', 'USD', 2330.00, 2, 100),
+    'BTCUSD': ('BTC', 'USD', 64000.00, 2, 1),
+    'US30': ('USD', 'USD', 39100.0, 1, 1),
+}
+
+
+class FakeTerminal:
+    """État d'un faux terminal MT5: symboles, prix, compte, ordres et positions."""
+
+    def __init__(self, universe=None, login=123456, balance=10000.0, currency='EUR', spread_points=20,
+                 order_latency=0.0, simulate_fills=False, reject_login=False, server_offset=0):
+        self.login_id = login
+        self.server_offset = server_offset
+        self.reject_login = reject_login
+        self.simulate_fills = simulate_fills
+        self.order_latency = order_latency
+        self.tick_streams = {}
+        self.tick_log = {}
+        self.balance = balance
+        self.currency = currency
+        self.connected = False
+        self.error = (1, 'Success')
+        self.calls = Counter()
+        self.symbols = {}
+        self.selected = set()
+        self.orders = {}
+        self.positions = {}
+        self.deals = []
+        self.history_orders = []
+        self._next_ticket = 1000
+        for name, (base, profit, bid, digits, contract_size) in (universe or DEFAULT_UNIVERSE).items():
+            self.add_symbol(name, base, profit, bid, digits=digits, contract_size=contract_size,
+                            spread_points=spread_points)
+
+    def server_time(self):
+        """Horloge du serveur: les temps MT5 sont en heure du serveur (ex: UTC+3), pas en UTC."""
+        return time.time() + self.server_offset
+
+    # --- Gestion de l'univers synthétique ---
+
+    def add_symbol(self, name, base, profit, bid, digits=5, contract_size=100000, spread_points=20):
+        point = 10 ** -digits
+        self.symbols[name] = {
+            'name': name,
+            'currency_base': base,
+            'currency_profit': profit,
+            'currency_margin': base,
+            'digits': digits,
+            'point': point,
+            'trade_tick_size': point,
+            'trade_contract_size': contract_size,
+            'volume_min': 0.01,
+            'volume_max': 100.0,
+            'volume_step': 0.01,
+            'bid': bid,
+            'ask': round(bid + spread_points * point, digits),
+            'time': int(self.server_time()),
+            'time_msc': int(self.server_time() * 1000),
+        }
+        self.tick_log[name] = [(self.symbols[name]['time_msc'], bid, self.symbols[name]['ask'])]
+
+    def set_price(self, name, bid, ask=None):
+        spec = self.symbols[name]
+        spread = spec['ask'] - spec['bid']
+        spec['bid'] = bid
+        spec['ask'] = ask if ask is not None else round(bid + spread, spec['digits'])
+        spec['time'] = int(self.server_time())
+        spec['time_msc'] = max(int(self.server_time() * 1000), spec['time_msc'] + 1)
+        self.tick_log[name].append((spec['time_msc'], spec['bid'], spec['ask']))
+        if self.simulate_fills:
+            self._trigger(name)
+
+    def set_tick_stream(self, name, bids):
+        """Flux de prix: chaque appel à symbol_info_tick consomme le bid suivant."""
+        self.tick_streams[name] = iter(bids)
+
+    def drop_connection(self):
+        """Simule la perte du terminal (les appels échouent jusqu'au prochain initialize)."""
+        self.connected = False
+        self.error = (-10004, 'No IPC connection')
+
+    def _next(self):
+        self._next_ticket += 1
+        return self._next_ticket
+
+    def _symbol_info(self, name):
+        spec = self.symbols[name]
+        return SimpleNamespace(
+            trade_tick_value=self._tick_value(spec),
+            select=name in self.selected,
+            visible=name in self.selected,
+            **spec
+        )
+
+    def _tick_value(self, spec):
+        """Valeur d'un tick pour 1 lot, dans la devise du compte."""
+        value = spec['trade_tick_size'] * spec['trade_contract_size']
+        rate = self._rate(spec['currency_profit'], self.currency)
+        return value * rate if rate else value
+
+    def _rate(self, source, target):
+        if source == target:
+            return 1.0
+        for spec in self.symbols.values():
+            if spec['currency_base'] == source and spec['currency_profit'] == target:
+                return spec['bid']
+            if spec['currency_base'] == target and spec['currency_profit'] == source and spec['bid'] > 0:
+                return 1.0 / spec['bid']
+        return None
+
+    # --- API MetaTrader5 ---
+
+    def initialize(self, *args, **kwargs):
+        self.calls['initialize'] += 1
+        self.connected = True
+        return True
+
+    def login(self, login=None, password=None, server=None, **kwargs):
+        self.calls['login'] += 1
+        if not self.connected:
+            self.error = (-10004, 'No IPC connection')
+            return False
+        if self.reject_login:
+            self.error = (-6, 'Terminal: Authorization failed')
+            return False
+        self.login_id = login or self.login_id
+        return True
+
+    def shutdown(self):
+        self.calls['shutdown'] += 1
+        self.connected = False
+
+    def last_error(self):
+        return self.error
+
+    def account_info(self):
+        self.calls['account_info'] += 1
+        if not self.connected:
+            return None
+        profit = sum(position['profit'] for position in self.positions.values())
+        return SimpleNamespace(
+            login=self.login_id, balance=self.balance, equity=self.balance + profit,
+            margin=0.0, margin_free=self.balance + profit, currency=self.currency,
+            trade_mode=ACCOUNT_TRADE_MODE_DEMO, server='Fake-Demo'
+        )
+
+    def symbol_select(self, name, enable=True):
+        self.calls['symbol_select'] += 1
+        if not self.connected or name not in self.symbols:
+            return False
+        if enable:
+            self.selected.add(name)
+        else:
+            self.selected.discard(name)
+        return True
+
+    def symbol_info(self, name):
+        self.calls['symbol_info'] += 1
+        if not self.connected or name not in self.symbols:
+            return None
+        return self._symbol_info(name)
+
+    def symbol_info_tick(self, name):
+        self.calls['symbol_info_tick'] += 1
+        if not self.connected or name not in self.selected:
+            return None
+        stream = self.tick_streams.get(name)
+        if stream is not None:
+            bid = next(stream, None)
+            if bid is not None:
+                self.set_price(name, bid)
+        spec = self.symbols[name]
+        return SimpleNamespace(time=spec['time'], time_msc=spec['time_msc'],
+                               bid=spec['bid'], ask=spec['ask'], last=spec['bid'], volume=0)
+
+    def copy_ticks_from(self, name, date_from, count, flags=COPY_TICKS_ALL):
+        """Ticks enregistrés depuis date_from (tableau structuré comme le module officiel)."""
+        import numpy as np
+        self.calls['copy_ticks_from'] += 1
+        if not self.connected or name not in self.symbols:
+            return None
+        if not isinstance(date_from, (int, float)):
+            date_from = date_from.timestamp()
+        ticks = [tick for tick in self.tick_log[name] if tick[0] >= date_from * 1000][:count]
+        array = np.zeros(len(ticks), dtype=[('time', 'i8'), ('bid', 'f8'), ('ask', 'f8'), ('last', 'f8'),
+                                            ('volume', 'u8'), ('time_msc', 'i8'), ('flags', 'u4'),
+                                            ('volume_real', 'f8')])
+        for i, (time_msc, bid, ask) in enumerate(ticks):
+            array[i] = (time_msc // 1000, bid, ask, bid, 0, time_msc, 6, 0.0)
+        return array
+
+    def symbols_get(self, group=None):
+        self.calls['symbols_get'] += 1
+        if not self.connected:
+            return None
+        names = list(self.symbols)
+        if group:
+            wanted = {name.strip() for name in group.split(',')}
+            names = [name for name in names if name in wanted]
+        return tuple(self._symbol_info(name) for name in names)
+
+    def symbols_total(self):
+        return len(self.symbols)
+
+    def order_check(self, request):
+        self.calls['order_check'] += 1
+        retcode = 0 if self._validate(request) else TRADE_RETCODE_INVALID
+        return SimpleNamespace(retcode=retcode, comment='Done' if retcode == 0 else 'Invalid request',
+                               request=SimpleNamespace(**request))
+
+    def order_send(self, request):
+        self.calls['order_send'] += 1
+        if self.order_latency:
+            time.sleep(self.order_latency)
+        if not self.connected:
+            self.error = (-10004, 'No IPC connection')
+            return None
+        if not self._validate(request):
+            return SimpleNamespace(retcode=TRADE_RETCODE_INVALID, comment='Invalid request',
+                                   order=0, deal=0, volume=0.0, price=0.0)
+
+        action = request['action']
+        ticket = self._next()
+        deal = 0
+        if action == TRADE_ACTION_DEAL and 'position' in request:
+            self._close_position(request['position'], request)
+        elif action == TRADE_ACTION_DEAL:
+            deal = self._open_position(ticket, request)
+        elif action == TRADE_ACTION_PENDING:
+            self.orders[ticket] = dict(request, ticket=ticket, time_setup=int(self.server_time()))
+        elif action == TRADE_ACTION_SLTP:
+            position = self.positions.get(request['position'])
+            if position is None:
+                return SimpleNamespace(retcode=TRADE_RETCODE_INVALID, comment='Position not found',
+                                       order=0, deal=0, volume=0.0, price=0.0)
+            position['sl'] = request.get('sl', position['sl'])
+            position['tp'] = request.get('tp', position['tp'])
+        elif action == TRADE_ACTION_MODIFY:
+            order = self.orders.get(request['order'])
+            if order is None:
+                return SimpleNamespace(retcode=TRADE_RETCODE_INVALID, comment='Order not found',
+                                       order=0, deal=0, volume=0.0, price=0.0)
+            for field in ('price', 'sl', 'tp'):
+                if field in request:
+                    order[field] = request[field]
+        elif action == TRADE_ACTION_REMOVE:
+            if self.orders.pop(request['order'], None) is None:
+                return SimpleNamespace(retcode=TRADE_RETCODE_INVALID, comment='Order not found',
+                                       order=0, deal=0, volume=0.0, price=0.0)
+
+        return SimpleNamespace(retcode=TRADE_RETCODE_DONE, comment='Request executed', order=ticket,
+                               deal=deal, volume=request.get('volume', 0.0), price=request.get('price', 0.0))
+
+    def positions_get(self, symbol=None, ticket=None, **kwargs):
+        self.calls['positions_get'] += 1
+        if not self.connected:
+            return None
+        positions = [p for p in self.positions.values()
+                     if (symbol is None or p['symbol'] == symbol) and (ticket is None or p['ticket'] == ticket)]
+        return tuple(SimpleNamespace(**p) for p in positions)
+
+    def orders_get(self, symbol=None, ticket=None, **kwargs):
+        self.calls['orders_get'] += 1
+        if not self.connected:
+            return None
+        orders = [o for o in self.orders.values()
+                  if (symbol is None or o['symbol'] == symbol) and (ticket is None or o['ticket'] == ticket)]
+        return tuple(SimpleNamespace(
+            ticket=o['ticket'], symbol=o['symbol'], type=o['type'], volume_initial=o['volume'],
+            volume_current=o['volume'], price_open=o['price'], sl=o.get('sl', 0.0), tp=o.get('tp', 0.0),
+            magic=o.get('magic', 0), comment=o.get('comment', ''), time_setup=o['time_setup']
+        ) for o in orders)
+
+    def history_deals_get(self, date_from=None, date_to=None, **kwargs):
+        self.calls['history_deals_get'] += 1
+        deals = self.deals
+        if date_from is not None and not isinstance(date_from, (int, float)):
+            date_from = date_from.timestamp()
+        if date_to is not None and not isinstance(date_to, (int, float)):
+            date_to = date_to.timestamp()
+        if date_from is not None:
+            deals = [d for d in deals if d['time'] >= date_from]
+        if date_to is not None:
+            deals = [d for d in deals if d['time'] <= date_to]
+        if 'position' in kwargs:
+            deals = [d for d in deals if d['position_id'] == kwargs['position']]
+        return tuple(SimpleNamespace(**d) for d in deals)
+
+    def history_orders_get(self, date_from=None, date_to=None, **kwargs):
+        self.calls['history_orders_get'] += 1
+        orders = self.history_orders
+        if 'position' in kwargs:
+            orders = [o for o in orders if o['position_id'] == kwargs['position']]
+        if 'ticket' in kwargs:
+            orders = [o for o in orders if o['ticket'] == kwargs['ticket']]
+        return tuple(SimpleNamespace(**o) for o in orders)
+
+    # --- Simulation interne ---
+
+    def _validate(self, request):
+        action = request.get('action')
+        if action in (TRADE_ACTION_MODIFY, TRADE_ACTION_REMOVE, TRADE_ACTION_SLTP):
+            return True
+        spec = self.symbols.get(request.get('symbol'))
+        if spec is None:
+            return False
+        volume = request.get('volume', 0)
+        return spec['volume_min'] <= volume <= spec['volume_max']
+
+    def _trigger(self, name):
+        """Mode simulation: déclenche les ordres en attente et les SL/TP touchés par le prix."""
+        spec = self.symbols[name]
+        bid, ask = spec['bid'], spec['ask']
+        for ticket, order in list(self.orders.items()):
+            if order['symbol'] != name:
+                continue
+            order_type, price = order['type'], order['price']
+            if ((order_type == ORDER_TYPE_BUY_LIMIT and ask <= price) or (order_type == ORDER_TYPE_BUY_STOP and ask >= price)
+                    or (order_type == ORDER_TYPE_SELL_LIMIT and bid >= price)
+                    or (order_type == ORDER_TYPE_SELL_STOP and bid <= price)):
+                del self.orders[ticket]
+                is_buy = order_type in (ORDER_TYPE_BUY_LIMIT, ORDER_TYPE_BUY_STOP)
+                self._open_position(ticket, dict(order, type=ORDER_TYPE_BUY if is_buy else ORDER_TYPE_SELL))
+        for ticket, position in list(self.positions.items()):
+            if position['symbol'] != name:
+                continue
+            is_buy = position['type'] == POSITION_TYPE_BUY
+            price = bid if is_buy else ask
+            direction = 1 if is_buy else -1
+            if position['sl'] and direction * (price - position['sl']) <= 0:
+                self._close_position(ticket, position, reason=DEAL_REASON_SL)
+            elif position['tp'] and direction * (price - position['tp']) >= 0:
+                self._close_position(ticket, position, reason=DEAL_REASON_TP)
+
+    def _add_deal(self, position_id, symbol, deal_type, entry, volume, price, profit, request, reason=DEAL_REASON_EXPERT):
+        deal = {
+            'ticket': self._next(), 'order': position_id, 'position_id': position_id,
+            'symbol': symbol, 'type': deal_type, 'entry': entry, 'volume': volume, 'reason': reason,
+            'price': price, 'profit': profit, 'commission': 0.0, 'swap': 0.0,
+            'magic': request.get('magic', 0), 'comment': request.get('comment', ''),
+            'time': int(self.server_time()), 'time_msc': int(self.server_time() * 1000),
+        }
+        self.deals.append(deal)
+        return deal['ticket']
+
+    def _open_position(self, ticket, request):
+        spec = self.symbols[request['symbol']]
+        is_buy = request['type'] == ORDER_TYPE_BUY
+        price = spec['ask'] if is_buy else spec['bid']
+        self.positions[ticket] = {
+            'ticket': ticket, 'symbol': request['symbol'],
+            'type': POSITION_TYPE_BUY if is_buy else POSITION_TYPE_SELL,
+            'volume': request['volume'], 'price_open': price, 'price_current': price,
+            'sl': request.get('sl', 0.0), 'tp': request.get('tp', 0.0), 'profit': 0.0,
+            'magic': request.get('magic', 0), 'comment': request.get('comment', ''),
+            'time': int(self.server_time()), 'identifier': ticket,
+        }
+        self.history_orders.append({
+            'ticket': ticket, 'position_id': ticket, 'symbol': request['symbol'], 'type': request['type'],
+            'volume_initial': request['volume'], 'price_open': price, 'sl': request.get('sl', 0.0),
+            'tp': request.get('tp', 0.0), 'magic': request.get('magic', 0), 'comment': request.get('comment', ''),
+            'time_setup': int(self.server_time()), 'time_done': int(self.server_time()),
+        })
+        return self._add_deal(ticket, request['symbol'], DEAL_TYPE_BUY if is_buy else DEAL_TYPE_SELL,
+                              DEAL_ENTRY_IN, request['volume'], price, 0.0, request)
+
+    def _close_position(self, ticket, request, reason=DEAL_REASON_EXPERT):
+        position = self.positions.pop(ticket, None)
+        if position is None:
+            return
+        spec = self.symbols[position['symbol']]
+        is_buy = position['type'] == POSITION_TYPE_BUY
+        price = spec['bid'] if is_buy else spec['ask']
+        direction = 1 if is_buy else -1
+        ticks = (price - position['price_open']) / spec['trade_tick_size']
+        profit = direction * ticks * self._tick_value(spec) * position['volume']
+        self.balance += profit
+        self._add_deal(ticket, position['symbol'], DEAL_TYPE_SELL if is_buy else DEAL_TYPE_BUY,
+                       DEAL_ENTRY_OUT, position['volume'], price, profit, position, reason)
+
+
+def install(terminal=None):
+    """
+    Installe un faux module MetaTrader5 dans sys.modules.
+
+    Args:
+        terminal (FakeTerminal): Terminal à exposer (nouveau terminal par défaut)
+
+    Returns:
+        FakeTerminal: Le terminal installé (connecté)
+    """
+    terminal = terminal or FakeTerminal()
+    # Réutiliser le module déjà installé pour que les imports existants suivent le nouveau terminal
+    module = sys.modules.get('MetaTrader5')
+    if not hasattr(module, 'terminal'):
+        module = types.ModuleType('MetaTrader5')
+    module.__dict__.update(CONSTANTS)
+    for name in dir(terminal):
+        if not name.startswith('_'):
+            attribute = getattr(terminal, name)
+            if callable(attribute):
+                setattr(module, name, attribute)
+    module.terminal = terminal
+    module.__version__ = 'fake'
+    sys.modules['MetaTrader5'] = module
+    terminal.initialize()
+    return terminal
@@ -0,0 +1,85 @@
+"""
+Faux clients OpenAI pour les benchmarks hors ligne.
+Les réponses sont tirées d'une table {texte du message: signal attendu}
+et renvoyées après une latence configurable.
+
+Usage:
+    import chatGpt, fakeOpenAI
+    fakeOpenAI.install(chatGpt, responses, latency=1.5)
+"""
+
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+
+class _Completions:
+    def __init__(self, responses, latency, is_async):
+        self.responses = responses
+        self.latency = latency
+        self.is_async = is_async
+        self.calls = 0
+
+    def _answer(self, messages):
+        self.calls += 1
+        prompt = messages[-1]['content']
+        signal = None
+        # Le prompt contient le texte du message: retrouver la réponse correspondante
+        for text, expected in self.responses.items():
+            if text in prompt:
+                signal = expected
+                break
+        content = json.dumps(signal) if signal else "Je ne trouve pas de signal exploitable."
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def create(self, model=None, messages=None, **kwargs):
+        if self.is_async:
+            return self._create_async(messages)
+        time.sleep(self.latency)
+        return self._answer(messages)
+
+    async def _create_async(self, messages):
+        await asyncio.sleep(self.latency)
+        return self._answer(messages)
+
+
+class FakeOpenAI:
+    """Remplaçant de openai.OpenAI (synchrone)."""
+
+    def __init__(self, responses, latency=0.0, is_async=False):
+        self.chat = SimpleNamespace(completions=_Completions(responses, latency, is_async))
+
+    def __call__(self, *args, **kwargs):
+        # Utilisé comme fabrique: OpenAI(api_key=...) renvoie ce même client
+        return self
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    """Remplaçant de openai.AsyncOpenAI."""
+
+    def __init__(self, responses, latency=0.0):
+        super().__init__(responses, latency, is_async=True)
+
+
+def install(module, responses, latency=0.0):
+    """
+    Remplace les clients OpenAI utilisés par un module (ex: chatGpt).
+
+    Args:
+        module: Module qui a importé OpenAI / AsyncOpenAI
+        responses (dict): {texte du message: signal attendu ou None}
+        latency (float): Latence simulée de chaque réponse en secondes
+
+    Returns:
+        tuple: (client synchrone, client asynchrone) pour lire les compteurs d'appels
+    """
+    sync_client = FakeOpenAI(responses, latency)
+    async_client = FakeAsyncOpenAI(responses, latency)
+    module.OpenAI = sync_client
+    module.AsyncOpenAI = async_client
+    # Clients partagés déjà créés avec les vrais clients: les recréer au prochain appel
+    if hasattr(module, 'gpt_client'):
+        module.gpt_client.reset()
+        module._sync_client = None
+    return sync_client, async_client
@@ -0,0 +1,161 @@
+import threading
+import time
+from collections import deque
+import MetaTrader5 as mt5
+from config import config
+
+
+class ConversionEngine:
+    """
+    Taux de conversion vers EUR à partir des paires disponibles chez le courtier.
+    Le graphe des paires (directes et inverses) est construit une fois, les chemins
+    de conversion multi-sauts (ex: JPY → USD → EUR) sont résolus par plus court chemin
+    et les taux sont rafraîchis par un seul instantané groupé après expiration du TTL.
+    """
+
+    def __init__(self, target='EUR', rate_ttl=None):
+        self.target = target
+        self.rate_ttl = rate_ttl if rate_ttl is not None else config.FX_RATE_TTL
+        self._lock = threading.Lock()
+        self._graph = None          # devise → [(devise voisine, symbole, inverse)]
+        self._paths = {}            # devise → [(symbole, inverse)] ou None si introuvable
+        self._bids = {}             # symbole → bid du dernier instantané
+        self._rates = {}            # devise → taux calculé sur l'instantané courant
+        self._snapshot_at = 0.0
+
+    def rate_to_eur(self, currency):
+        """
+        Retourne le taux de conversion de currency vers la devise cible.
+
+        Args:
+            currency (str): Devise à convertir
+
+        Returns:
+            float: Taux de conversion ou None si aucun chemin n'existe chez le courtier
+        """
+        if currency == self.target:
+            return 1.0
+
+        with self._lock:
+            if time.monotonic() - self._snapshot_at > self.rate_ttl:
+                self._refresh_snapshot()
+
+            if currency in self._rates:
+                return self._rates[currency]
+
+            path = self._get_path(currency)
+            if path is None:
+                return None
+
+            rate = self._rate_along(path)
+            if rate is None:
+                # Symboles du chemin absents de l'instantané: les ajouter et réessayer
+                self._refresh_snapshot()
+                rate = self._rate_along(path)
+            if rate is not None:
+                self._rates[currency] = rate
+            return rate
+
+    def refresh(self):
+        """
+        Rafraîchit l'instantané par anticipation, à mi-TTL, et recalcule les taux de
+        toutes les devises connues (thread MT5, tâche de fond): le dimensionnement d'un
+        signal trouve toujours des taux frais sans appel au terminal.
+
+        Returns:
+            bool: True si l'instantané a été rafraîchi
+        """
+        with self._lock:
+            if not self._paths or time.monotonic() - self._snapshot_at <= self.rate_ttl / 2:
+                return False
+            self._refresh_snapshot()
+            for currency, path in self._paths.items():
+                rate = self._rate_along(path) if path else None
+                if rate is not None:
+                    self._rates[currency] = rate
+            return True
+
+    def warm_up(self, currencies):
+        """Résout les chemins et charge les taux pour une liste de devises."""
+        return {currency: self.rate_to_eur(currency) for currency in currencies}
+
+    def invalidate(self):
+        """Force la reconstruction du graphe et des taux (nouvelle liste de symboles)."""
+        with self._lock:
+            self._graph = None
+            self._paths.clear()
+            self._bids.clear()
+            self._rates.clear()
+            self._snapshot_at = 0.0
+
+    def _get_path(self, currency):
+        if currency not in self._paths:
+            if self._graph is None:
+                self._graph = self._build_graph()
+            self._paths[currency] = self._shortest_path(currency)
+            if self._paths[currency] is None:
+                print(f"❌ Aucune paire pour convertir {currency} → {self.target}")
+            else:
+                for symbol, _ in self._paths[currency]:
+                    mt5.symbol_select(symbol, True)
+        return self._paths[currency]
+
+    def _build_graph(self):
+        """Graphe des devises à partir de la liste des symboles du courtier."""
+        graph = {}
+        symbols = mt5.symbols_get() or ()
+        for info in symbols:
+            base = info.currency_base
+            profit = info.currency_profit
+            if not base or not profit or base == profit:
+                continue
+            graph.setdefault(base, []).append((profit, info.name, False))
+            graph.setdefault(profit, []).append((base, info.name, True))
+        return graph
+
+    def _shortest_path(self, currency):
+        """Parcours en largeur: nombre minimal de conversions jusqu'à la devise cible."""
+        previous = {currency: None}
+        queue = deque([currency])
+        while queue:
+            node = queue.popleft()
+            if node == self.target:
+                break
+            for neighbour, symbol, inverse in self._graph.get(node, ()):
+                if neighbour not in previous:
+                    previous[neighbour] = (node, symbol, inverse)
+                    queue.append(neighbour)
+
+        if self.target not in previous:
+            return None
+
+        path = []
+        node = self.target
+        while previous[node] is not None:
+            node, symbol, inverse = previous[node]
+            path.append((symbol, inverse))
+        path.reverse()
+        return path
+
+    def _refresh_snapshot(self):
+        """Un seul appel symbols_get pour tous les symboles utilisés par les chemins connus."""
+        needed = {symbol for path in self._paths.values() if path for symbol, _ in path}
+        self._rates.clear()
+        self._snapshot_at = time.monotonic()
+        if not needed:
+            return
+        infos = mt5.symbols_get(group=",".join(sorted(needed))) or ()
+        self._bids = {info.name: info.bid for info in infos}
+
+    def _rate_along(self, path):
+        rate = 1.0
+        for symbol, inverse in path:
+            bid = self._bids.get(symbol)
+            if not bid or bid <= 0:
+                return None
+            rate *= (1.0 / bid) if inverse else bid
+        return rate
+
+
+# Instance globale
+fx_converter = ConversionEngine()
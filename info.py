@@ -1,4 +1,5 @@
-import MetaTrader5 as mt5
+from symbolCache import symbol_cache
+from fxConverter import fx_converter
 
 class Infos:
     """
@@ -8,7 +9,7 @@ class Infos:
     @staticmethod
     def get_symbol_info(symbol):
         """
-        Récupère les informations d'un symbole via MT5.
+        Récupère les informations d'un symbole via le cache partagé.
         
         Args:
             symbol (str): Symbole de l'instrument
@@ -16,37 +17,7 @@ class Infos:
         Returns:
             dict: Informations du symbole ou None si erreur
         """
-        try:
-            # Sélectionner le symbole
-            if not mt5.symbol_select(symbol, True):
-                print(f"Impossible de sélectionner le symbole {symbol}")
-                return None
-            
-            # Obtenir les informations du symbole
-            symbol_info = mt5.symbol_info(symbol)
-            if not symbol_info:
-                print(f"Impossible d'obtenir les informations pour {symbol}")
-                return None
-            
-            return {
-                'symbol': symbol,
-                'digits': symbol_info.digits,
-                'point': symbol_info.point,
-                'pip_size': symbol_info.point * (10 if symbol_info.digits == 5 or symbol_info.digits == 3 else 1),
-                'tick_size': symbol_info.trade_tick_size,
-                'tick_value': symbol_info.trade_tick_value,
-                'contract_size': symbol_info.trade_contract_size,
-                'min_lot': symbol_info.volume_min,
-                'max_lot': symbol_info.volume_max,
-                'lot_step': symbol_info.volume_step,
-                'currency_base': symbol_info.currency_base,
-                'currency_profit': symbol_info.currency_profit,
-                'currency_margin': symbol_info.currency_margin
-            }
-            
-        except Exception as e:
-            print(f"Erreur lors de la récupération des informations du symbole {symbol}: {e}")
-            return None
+        return symbol_cache.get(symbol)
     
     @staticmethod
     def get_pip_value_eur(symbol, lot_size=1.0):
@@ -78,8 +49,10 @@ class Infos:
             if profit_currency != 'EUR':
                 # Obtenir le taux de change vers EUR
                 conversion_rate = Infos._get_conversion_rate_to_eur(profit_currency)
-                if conversion_rate:
-                    pip_value *= conversion_rate
+                if not conversion_rate:
+                    # Pas de taux fiable: mieux vaut ne pas dimensionner que mal dimensionner
+                    return None
+                pip_value *= conversion_rate
             
             return pip_value
             
@@ -87,48 +60,37 @@ class Infos:
             print(f"Erreur lors du calcul de la valeur du pip pour {symbol}: {e}")
             return None
     
+    @staticmethod
+    def get_point_value_eur(symbol, lot_size=1.0):
+        """
+        Valeur d'un point (plus petit pas de prix) en EUR: la distance SL est exprimée
+        en points, un pip vaut 10 points sur les symboles à 5/3 décimales.
+        
+        Returns:
+            float: Valeur du point en EUR ou None si erreur
+        """
+        pip_value_eur = Infos.get_pip_value_eur(symbol, lot_size)
+        symbol_info = Infos.get_symbol_info(symbol)
+        if not pip_value_eur or not symbol_info:
+            return None
+        return pip_value_eur * symbol_info['point'] / symbol_info['pip_size']
+    
     @staticmethod
     def _get_conversion_rate_to_eur(currency):
         """
-        Obtient le taux de conversion d'une devise vers EUR.
+        Obtient le taux de conversion d'une devise vers EUR (moteur de conversion partagé).
         
         Args:
             currency (str): Devise à convertir
         
         Returns:
-            float: Taux de conversion ou 1.0 si EUR ou erreur
+            float: Taux de conversion ou None si aucune paire ne permet la conversion
         """
-        if currency == 'EUR':
-            return 1.0
-        
         try:
-            # Essayer d'abord CURRENCY/EUR
-            symbol = f"{currency}EUR"
-            if mt5.symbol_select(symbol, True):
-                tick = mt5.symbol_info_tick(symbol)
-                if tick:
-                    return tick.bid
-            
-            # Essayer EUR/CURRENCY et inverser
-            symbol = f"EUR{currency}"
-            if mt5.symbol_select(symbol, True):
-                tick = mt5.symbol_info_tick(symbol)
-                if tick and tick.bid > 0:
-                    return 1.0 / tick.bid
-            
-            # Si USD, essayer EURUSD
-            if currency == 'USD':
-                if mt5.symbol_select('EURUSD', True):
-                    tick = mt5.symbol_info_tick('EURUSD')
-                    if tick and tick.bid > 0:
-                        return 1.0 / tick.bid
-            
-            print(f"Impossible de trouver le taux de conversion pour {currency}/EUR")
-            return 1.0  # Valeur par défaut
-            
+            return fx_converter.rate_to_eur(currency)
         except Exception as e:
             print(f"Erreur lors de la conversion {currency}/EUR: {e}")
-            return 1.0
+            return None
     
     @staticmethod
     def calculate_points_distance(symbol, price1, price2):
@@ -0,0 +1,239 @@
+import time
+from datetime import datetime, timedelta
+import MetaTrader5 as mt5
+from config import config
+from orderRegistry import decode_magic
+from symbolCache import symbol_cache
+
+# Les fuseaux des serveurs MT5 sont des multiples du quart d'heure (UTC+2, UTC+3...)
+SERVER_OFFSET_ROUNDING = 900
+# Au-delà, le dernier tick est trop ancien (marché fermé) pour mesurer le décalage
+SERVER_OFFSET_MAX = 14 * 3600
+SERVER_OFFSET_REFRESH = 3600
+
+
+class LifecycleManager:
+    """
+    Gestion des trades après placement. Une boucle de polling lit les nouveaux deals
+    (curseur sur history_deals_get) et l'état des positions/ordres, applique les règles
+    configurées aux jambes d'un même signal (regroupées par magic number) puis envoie
+    toutes les actions du cycle en un lot:
+      - TP1 touché → SL des jambes restantes au breakeven, jambes en attente annulées
+      - SL touché → jambes sœurs en attente annulées
+      - ordre en attente trop ancien → annulé
+      - trailing stop sur les positions en gain
+    """
+
+    def __init__(self, rules=None, order_registry=None):
+        """
+        Args:
+            rules (dict): Surcharge des règles (défaut: config LIFECYCLE_*)
+            order_registry (OrderRegistry): Registre mis à jour après chaque action
+        """
+        self.rules = {
+            'breakeven_after_tp1': config.LIFECYCLE_BREAKEVEN_AFTER_TP1,
+            'cancel_pending_on_tp1': config.LIFECYCLE_CANCEL_PENDING_ON_TP1,
+            'cancel_on_sl': config.LIFECYCLE_CANCEL_ON_SL,
+            'pending_expiry_minutes': config.LIFECYCLE_PENDING_EXPIRY_MINUTES,
+            'trailing_points': config.LIFECYCLE_TRAILING_POINTS,
+            'trailing_step_points': config.LIFECYCLE_TRAILING_STEP_POINTS,
+        }
+        self.rules.update(rules or {})
+        self.order_registry = order_registry
+
+        # Les temps MT5 (deals, ordres) sont en heure du serveur: décalage mesuré au premier cycle
+        self.server_offset = None
+        self.offset_measured_at = 0.0
+        # Curseur des deals: on ne rejoue pas l'historique antérieur au démarrage
+        self.started_at = time.time()
+        self.cursor_time = None
+        self.cursor_tickets = set()
+        self.cycles = 0
+        self.actions_sent = 0
+
+    # --- Cycle ---
+
+    def poll(self):
+        """
+        Un cycle de gestion (thread MT5).
+
+        Returns:
+            list: Actions appliquées {ticket, action, sl, reason}
+        """
+        self.cycles += 1
+        positions = mt5.positions_get() or ()
+        orders = mt5.orders_get() or ()
+        self._refresh_server_offset({item.symbol for item in positions + orders})
+        deals = self._new_deals()
+        groups = self._group(positions, orders)
+
+        actions = {}
+        for deal in deals:
+            tag = decode_magic(deal.magic)
+            if deal.entry != mt5.DEAL_ENTRY_OUT or not tag or not tag['channel_id']:
+                continue
+            group = groups.get((tag['channel_id'], tag['signal_id']))
+            if group is None:
+                continue
+
+            if deal.reason == mt5.DEAL_REASON_TP and tag['leg'] == 1:
+                print(f"🎯 TP1 touché (signal {tag['signal_id']}, canal {tag['channel_id']})")
+                if self.rules['breakeven_after_tp1']:
+                    for position in group['positions']:
+                        self._plan_sl(actions, position, position.price_open, 'breakeven')
+                if self.rules['cancel_pending_on_tp1']:
+                    for order in group['orders']:
+                        self._plan_remove(actions, order, 'tp1')
+            elif deal.reason == mt5.DEAL_REASON_SL and self.rules['cancel_on_sl']:
+                print(f"🛑 SL touché (signal {tag['signal_id']}, canal {tag['channel_id']})")
+                for order in group['orders']:
+                    self._plan_remove(actions, order, 'sl_hit')
+
+        expiry = self.rules['pending_expiry_minutes']
+        if expiry:
+            limit = self.server_now() - expiry * 60
+            for group in groups.values():
+                for order in group['orders']:
+                    if order.time_setup < limit:
+                        self._plan_remove(actions, order, 'expired')
+
+        if self.rules['trailing_points']:
+            self._plan_trailing(actions, groups)
+
+        return self._execute(actions)
+
+    def server_now(self):
+        """Heure actuelle du serveur MT5 (epoch décalé), comparable à time_setup et deal.time."""
+        return time.time() + (self.server_offset or 0)
+
+    def _refresh_server_offset(self, symbols):
+        """
+        Mesure le décalage horloge serveur - horloge locale sur le tick le plus récent
+        des symboles suivis, arrondi au quart d'heure (un tick peut dater de quelques
+        minutes). Remesuré toutes les heures (changement d'heure du serveur).
+        """
+        if self.server_offset is not None and time.time() - self.offset_measured_at < SERVER_OFFSET_REFRESH:
+            return
+        # symbol_cache.get sélectionne le symbole: sans cela le terminal ne renvoie pas de tick
+        ticks = [mt5.symbol_info_tick(symbol) for symbol in symbols if symbol_cache.get(symbol)]
+        latest = max((tick.time for tick in ticks if tick), default=None)
+        if latest is None:
+            return
+        offset = round((latest - time.time()) / SERVER_OFFSET_ROUNDING) * SERVER_OFFSET_ROUNDING
+        if abs(offset) > SERVER_OFFSET_MAX:
+            return
+        if offset != self.server_offset:
+            print(f"🕒 Décalage horloge serveur MT5: {offset / 3600:+.2f} h")
+        self.server_offset = offset
+        self.offset_measured_at = time.time()
+
+    def _new_deals(self):
+        """Deals postérieurs au curseur (temps, tickets déjà vus à la même seconde)."""
+        if self.cursor_time is None:
+            if self.server_offset is None:
+                # Ni position ni ordre suivi: aucun deal du bot à traiter pour l'instant
+                return []
+            self.cursor_time = int(self.started_at + self.server_offset)
+        deals = mt5.history_deals_get(datetime.fromtimestamp(self.cursor_time), datetime.now() + timedelta(days=1))
+        fresh = sorted((deal for deal in deals or () if deal.ticket not in self.cursor_tickets),
+                       key=lambda deal: (deal.time, deal.ticket))
+        for deal in fresh:
+            if deal.time > self.cursor_time:
+                self.cursor_time = deal.time
+                self.cursor_tickets = set()
+            self.cursor_tickets.add(deal.ticket)
+        return fresh
+
+    @staticmethod
+    def _group(positions, orders):
+        """Regroupe les positions et ordres du bot par signal: (canal, signal) → jambes."""
+        groups = {}
+        for kind, items in (('positions', positions), ('orders', orders)):
+            for item in items:
+                tag = decode_magic(item.magic)
+                if not tag or not tag['channel_id']:
+                    continue
+                group = groups.setdefault((tag['channel_id'], tag['signal_id']), {'positions': [], 'orders': []})
+                group[kind].append(item)
+        return groups
+
+    # --- Planification (une action par ticket et par cycle) ---
+
+    @staticmethod
+    def _plan_remove(actions, order, reason):
+        actions[order.ticket] = {'ticket': order.ticket, 'action': 'REMOVE', 'symbol': order.symbol, 'reason': reason}
+
+    @staticmethod
+    def _plan_sl(actions, position, new_sl, reason):
+        """Déplace le SL d'une position seulement s'il protège davantage."""
+        is_buy = position.type == mt5.POSITION_TYPE_BUY
+        current = actions.get(position.ticket, {}).get('sl', position.sl)
+        if current and (new_sl <= current if is_buy else new_sl >= current):
+            return
+        symbol_info = symbol_cache.get(position.symbol)
+        if symbol_info:
+            new_sl = round(new_sl, symbol_info['digits'])
+        actions[position.ticket] = {
+            'ticket': position.ticket, 'action': 'SLTP', 'symbol': position.symbol,
+            'sl': new_sl, 'tp': position.tp, 'reason': reason
+        }
+
+    def _plan_trailing(self, actions, groups):
+        ticks = {}
+        for group in groups.values():
+            for position in group['positions']:
+                symbol_info = symbol_cache.get(position.symbol)
+                if not symbol_info:
+                    continue
+                if position.symbol not in ticks:
+                    ticks[position.symbol] = mt5.symbol_info_tick(position.symbol)
+                tick = ticks[position.symbol]
+                if not tick:
+                    continue
+
+                point = symbol_info['point']
+                distance = self.rules['trailing_points'] * point
+                step = self.rules['trailing_step_points'] * point
+                direction = 1 if position.type == mt5.POSITION_TYPE_BUY else -1
+                price = tick.bid if direction == 1 else tick.ask
+                if direction * (price - position.price_open) < distance:
+                    continue
+                candidate = price - direction * distance
+                current = actions.get(position.ticket, {}).get('sl', position.sl)
+                if not current or direction * (candidate - current) >= step:
+                    self._plan_sl(actions, position, candidate, 'trailing')
+
+    # --- Exécution groupée ---
+
+    def _execute(self, actions):
+        applied = []
+        for action in actions.values():
+            if action['action'] == 'REMOVE':
+                request = {"action": mt5.TRADE_ACTION_REMOVE, "order": action['ticket']}
+            else:
+                request = {
+                    "action": mt5.TRADE_ACTION_SLTP,
+                    "position": action['ticket'],
+                    "symbol": action['symbol'],
+                    "sl": action['sl'],
+                    "tp": action['tp'],
+                }
+            result = mt5.order_send(request)
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                error = result.comment if result else mt5.last_error()
+                print(f"❌ Gestion {action['action']} ticket {action['ticket']} ({action['reason']}) échouée: {error}")
+                continue
+
+            if action['action'] == 'REMOVE':
+                print(f"🗑️ Ordre en attente {action['ticket']} annulé ({action['reason']})")
+                if self.order_registry:
+                    self.order_registry.remove_leg(action['ticket'])
+            else:
+                print(f"🛡️ SL position {action['ticket']} → {action['sl']} ({action['reason']})")
+                if self.order_registry:
+                    self.order_registry.update_leg(action['ticket'], sl=action['sl'])
+            applied.append({key: action.get(key) for key in ('ticket', 'action', 'sl', 'reason')})
+
+        self.actions_sent += len(applied)
+        return applied
+
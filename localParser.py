@@ -0,0 +1,191 @@
+import re
+from config import config
+
+# Normalisation des sens
+DIRECTIONS = {
+    'BUY': 'BUY', 'LONG': 'BUY', 'ACHAT': 'BUY',
+    'SELL': 'SELL', 'SHORT': 'SELL', 'VENTE': 'SELL'
+}
+
+PRICE = r'(\d+(?:\.\d+)?)'
+DIRECTION = r'(buy|sell|long|short|achat|vente)'
+
+# Canal 1: "XAUUSD BUY NOW @ 2329.79 / SL @ 2314.90 / TP1 @ 2350 ..."
+CH1_HEADER = re.compile(
+    r'\b([A-Z][A-Z0-9]{2,9}(?:/[A-Z]{3,4})?)\s+' + DIRECTION + r'\b(?:\s+now)?\s*(?:@|at|:)?\s*' + PRICE,
+    re.IGNORECASE
+)
+CH1_SL = re.compile(r'\b(?:sl|stop\s*loss)\b\s*(?:@|:|at)?\s*' + PRICE, re.IGNORECASE)
+CH1_TP = re.compile(r'\b(?:tp|take\s*profit)\s*([1-3])\b\s*(?:@|:|at)?\s*(\d+(?:\.\d+)?|open)', re.IGNORECASE)
+
+# Canal 2: "go sell 3349-52 / tp 3330 / sl 54.5"
+CH2_ENTRY = re.compile(r'\b' + DIRECTION + r'\b\s*(?:now\s*)?(?:@|at|:)?\s*(\d+(?:\.\d+)?)\s*(?:-|/|à|to)\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+CH2_SL = re.compile(r'\b(?:sl|stop\s*loss)\b\s*(?:@|:|at)?\s*' + PRICE, re.IGNORECASE)
+CH2_TP = re.compile(r'\b(?:tp|take\s*profit)\b\s*(?:@|:|at)?\s*' + PRICE, re.IGNORECASE)
+CH2_SYMBOL = re.compile(r'\b(XAU/?USD|GOLD|[A-Z]{3}/?(?:USDT|USD|EUR|JPY|GBP|CHF|CAD|AUD|NZD))\b')
+
+
+class LocalParser:
+    """
+    Extraction déterministe des signaux pour les formats connus des canaux 1 et 2.
+    Produit le même dictionnaire que chatGpt.signal_cleaner, avec un score de confiance.
+    """
+
+    def __init__(self, signal, channel_id=1):
+        self.signal = signal or ""
+        self.channel_id = channel_id
+        self.confidence = 0.0
+
+        if channel_id not in (1, 2):
+            raise ValueError(f"Canal {channel_id} non supporté")
+
+    def get_signal(self, min_confidence=None):
+        """
+        Extrait le signal si la confiance est suffisante.
+
+        Args:
+            min_confidence (float): Seuil de confiance (défaut: config)
+
+        Returns:
+            dict: {symbol, sens, sl, entry_prices, tps} ou None si confiance faible
+        """
+        if min_confidence is None:
+            min_confidence = config.LOCAL_PARSER_MIN_CONFIDENCE
+
+        signal = self.parse()
+        if signal and self.confidence >= min_confidence:
+            return signal
+        return None
+
+    def parse(self):
+        """Extrait le signal sans seuil et met à jour self.confidence."""
+        try:
+            if self.channel_id == 1:
+                signal = self._parse_channel_1()
+            else:
+                signal = self._parse_channel_2()
+        except (ValueError, IndexError):
+            signal = None
+
+        if not signal:
+            self.confidence = 0.0
+            return None
+
+        if not self._is_consistent(signal):
+            # Extraction incohérente: laisser ChatGPT trancher
+            self.confidence = min(self.confidence, 0.3)
+        return signal
+
+    def _parse_channel_1(self):
+        """Format standard: une entrée, un SL, trois TPs (TP3 peut valoir 'open')."""
+        header = CH1_HEADER.search(self.signal)
+        sl_match = CH1_SL.search(self.signal)
+        if not header or not sl_match:
+            return None
+
+        symbol = self._normalize_symbol(header.group(1))
+        sens = DIRECTIONS[header.group(2).upper()]
+        entry = float(header.group(3))
+        sl = float(sl_match.group(1))
+
+        tps = {}
+        for match in CH1_TP.finditer(self.signal):
+            index = int(match.group(1))
+            if index not in tps:
+                tps[index] = match.group(2)
+
+        if 1 not in tps or 2 not in tps:
+            return None
+
+        tp1 = float(tps[1])
+        tp2 = float(tps[2])
+        if 3 not in tps:
+            # TP3 absent: aucun niveau inventé, la jambe reprend le TP2 et ChatGPT tranche
+            tp3 = tp2
+            self.confidence = 0.5
+        elif tps[3].lower() == 'open':
+            # TP3 "open" annoncé: 2x la distance du TP2
+            tp3 = round(entry + 2 * (tp2 - entry), 5)
+            self.confidence = 1.0
+        else:
+            tp3 = float(tps[3])
+            self.confidence = 1.0
+
+        return {
+            'symbol': symbol,
+            'sens': sens,
+            'sl': sl,
+            'entry_prices': [entry, entry, entry],
+            'tps': [tp1, tp2, tp3]
+        }
+
+    def _parse_channel_2(self):
+        """Format fourchette: "go sell 3349-52", TP unique, SL éventuellement abrégé."""
+        entry_match = CH2_ENTRY.search(self.signal)
+        sl_match = CH2_SL.search(self.signal)
+        tp_match = CH2_TP.search(self.signal)
+        if not entry_match or not sl_match or not tp_match:
+            return None
+
+        sens = DIRECTIONS[entry_match.group(1).upper()]
+        low = float(entry_match.group(2))
+        high = self._expand_abbreviated(entry_match.group(3), entry_match.group(2))
+        if high < low:
+            low, high = high, low
+        middle = round((low + high) / 2, 5)
+
+        sl = self._expand_with_base(float(sl_match.group(1)), low)
+        tp = self._expand_with_base(float(tp_match.group(1)), low)
+
+        symbol_match = CH2_SYMBOL.search(self.signal.upper())
+        if symbol_match:
+            symbol = self._normalize_symbol(symbol_match.group(1))
+            self.confidence = 1.0
+        else:
+            # Le canal 2 ne publie généralement pas le symbole
+            symbol = config.CHANNEL_2_DEFAULT_SYMBOL
+            self.confidence = 0.9
+
+        return {
+            'symbol': symbol,
+            'sens': sens,
+            'sl': sl,
+            'entry_prices': [low, middle, high],
+            'tps': [tp, tp, tp]
+        }
+
+    @staticmethod
+    def _expand_abbreviated(short, full):
+        """"52" avec "3349" → 3352 (remplace les derniers chiffres de la partie entière)."""
+        short_int = short.split('.')[0]
+        full_int = full.split('.')[0]
+        if len(short_int) >= len(full_int):
+            return float(short)
+        prefix = full_int[:len(full_int) - len(short_int)]
+        return float(prefix + short)
+
+    @staticmethod
+    def _expand_with_base(value, reference):
+        """SL/TP abrégé: si < 100, on ajoute la base (centaines) du prix de référence."""
+        if value >= 100 or reference < 100:
+            return value
+        base = int(reference // 100) * 100
+        return round(base + value, 5)
+
+    @staticmethod
+    def _normalize_symbol(symbol):
+        symbol = symbol.upper().replace('/', '')
+        if symbol == 'GOLD':
+            return 'XAUUSD'
+        return symbol
+
+    @staticmethod
+    def _is_consistent(signal):
+        """Même contrôle que TradingBot.validate_signal."""
+        sl = signal['sl']
+        for entry, tp in zip(signal['entry_prices'], signal['tps']):
+            if signal['sens'] == 'BUY' and (sl >= entry or tp <= entry):
+                return False
+            if signal['sens'] == 'SELL' and (sl <= entry or tp >= entry):
+                return False
+        return True
@@ -0,0 +1,26 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# L'API MT5 n'est pas thread-safe: tous les appels passent par un thread unique
+MT5_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mt5")
+
+
+async def run_mt5(func, *args, **kwargs):
+    """
+    Exécute un appel MT5 bloquant dans le thread dédié sans bloquer la boucle asyncio.
+
+    Args:
+        func (callable): Fonction synchrone à exécuter
+        *args, **kwargs: Arguments de la fonction
+
+    Returns:
+        Le résultat de func
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(MT5_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+
+def shutdown_mt5_executor():
+    """Arrête le thread MT5 (à appeler à l'arrêt du bot)."""
+    MT5_EXECUTOR.shutdown(wait=True)
@@ -0,0 +1,291 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+import MetaTrader5 as mt5
+from config import config
+from mt5Executor import MT5_EXECUTOR
+
+
+class MT5Session:
+    """
+    Connexion persistante au terminal MT5, partagée par le bot et l'API.
+    Un heartbeat (account_info) détecte les pertes de connexion, la reconnexion
+    est automatique avec backoff exponentiel et les appels arrivant pendant
+    la reconnexion sont mis en file tant qu'ils ne sont pas périmés.
+    Tous les appels MT5 s'exécutent dans le thread dédié de mt5Executor.
+    """
+
+    def __init__(self, account_type='DEMO', credentials=None):
+        self.account_type = account_type.upper()
+        if credentials is None and self.account_type not in ['DID', 'DEMO', *config.MT5_FANOUT_ACCOUNTS]:
+            raise ValueError(f"Type de compte non supporté: {self.account_type}. Utilisez 'DID' ou 'DEMO'")
+        self.credentials = credentials
+
+        self.is_connected = False
+        self.current_login = None
+        self.heartbeat_interval = config.MT5_HEARTBEAT_INTERVAL
+        self.max_staleness = config.MT5_ORDER_MAX_STALENESS
+
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+
+        # Métriques
+        self.connected_since = None
+        self.disconnected_at = None
+        self.total_uptime = 0.0
+        self.reconnect_count = 0
+        self.reconnect_latencies = []
+        self.dropped_calls = 0
+
+    # --- Connexion ---
+
+    def connect(self):
+        """Établit la connexion (initialize + login + vérification) dans le thread MT5."""
+        return MT5_EXECUTOR.submit(self._connect).result()
+
+    def _connect(self):
+        try:
+            print(f"🔄 Connexion à MT5 ({self.account_type})...")
+
+            # Récupérer les identifiants
+            credentials = self._get_credentials()
+            if not credentials:
+                print(f"❌ Impossible de récupérer les identifiants pour {self.account_type}")
+                return False
+
+            # Initialiser MT5 (terminal dédié au compte si configuré)
+            initialized = mt5.initialize(path=credentials['path']) if credentials.get('path') else mt5.initialize()
+            if not initialized:
+                error = mt5.last_error()
+                print(f"❌ Échec initialisation MT5: {error}")
+                return False
+
+            # Se connecter au compte
+            success = mt5.login(
+                login=credentials['login'],
+                password=credentials['password'],
+                server=credentials['server']
+            )
+
+            if not success:
+                error = mt5.last_error()
+                print(f"❌ Échec connexion MT5: {error}")
+                mt5.shutdown()
+                return False
+
+            # Vérifier la connexion
+            if not self._verify_connection(credentials['login']):
+                print(f"❌ Vérification de connexion échouée")
+                mt5.shutdown()
+                return False
+
+            self.current_login = credentials['login']
+            self._mark_connected()
+            print(f"✅ Connexion MT5 établie sur {self.account_type}")
+            return True
+
+        except Exception as e:
+            print(f"❌ Erreur lors de la connexion MT5: {e}")
+            return False
+
+    def _get_credentials(self):
+        """Récupère les identifiants MT5 (fournis à la création ou depuis la configuration)."""
+        if self.credentials is not None:
+            return self.credentials
+        try:
+            return config.get_mt5_credentials(self.account_type)
+        except Exception as e:
+            print(f"❌ Erreur récupération identifiants: {e}")
+            return None
+
+    def _verify_connection(self, expected_login):
+        """Vérifie que la connexion est établie sur le bon compte."""
+        try:
+            account_info = mt5.account_info()
+            if not account_info:
+                print("❌ Impossible de récupérer les infos du compte")
+                return False
+
+            if account_info.login != expected_login:
+                print(f"❌ Connecté au mauvais compte: {account_info.login} != {expected_login}")
+                return False
+
+            # Afficher le type de compte
+            account_type_str = "DÉMO" if account_info.trade_mode == mt5.ACCOUNT_TRADE_MODE_DEMO else "RÉEL"
+            print(f"📊 Compte {account_type_str} - Balance: {account_info.balance} {account_info.currency}")
+
+            return True
+
+        except Exception as e:
+            print(f"❌ Erreur vérification connexion: {e}")
+            return False
+
+    def _mark_connected(self):
+        now = time.monotonic()
+        with self._lock:
+            if self.disconnected_at is not None:
+                latency = now - self.disconnected_at
+                self.reconnect_count += 1
+                self.reconnect_latencies.append(latency)
+                print(f"🔁 Reconnexion MT5 ({self.account_type}) en {latency:.2f}s")
+            self.is_connected = True
+            self.connected_since = now
+            self.disconnected_at = None
+
+    def _mark_disconnected(self):
+        now = time.monotonic()
+        with self._lock:
+            if self.is_connected and self.connected_since is not None:
+                self.total_uptime += now - self.connected_since
+            if self.disconnected_at is None:
+                self.disconnected_at = now
+            self.is_connected = False
+            self.connected_since = None
+
+    # --- Heartbeat et reconnexion ---
+
+    def check(self):
+        """
+        Heartbeat: vérifie la connexion et tente une reconnexion si elle est perdue.
+        Doit s'exécuter dans le thread MT5.
+
+        Returns:
+            bool: True si la connexion est active
+        """
+        try:
+            account_info = mt5.account_info()
+        except Exception:
+            account_info = None
+
+        if account_info and account_info.login == self.current_login:
+            if not self.is_connected:
+                self._mark_connected()
+            self._drain_pending()
+            return True
+
+        if self.is_connected:
+            print(f"⚠️ Connexion MT5 perdue ({self.account_type})")
+        self._mark_disconnected()
+
+        if self._connect():
+            self._drain_pending()
+            return True
+        return False
+
+    def start_heartbeat(self, interval=None):
+        """Lance le heartbeat en arrière-plan (backoff exponentiel pendant les reconnexions)."""
+        if self._heartbeat_thread and self._heartbeat_thread.is_alive():
+            return
+        if interval is not None:
+            self.heartbeat_interval = interval
+        self._stop.clear()
+        self._heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name="mt5-heartbeat", daemon=True)
+        self._heartbeat_thread.start()
+
+    def _heartbeat_loop(self):
+        delay = self.heartbeat_interval
+        while not self._stop.wait(delay):
+            try:
+                connected = MT5_EXECUTOR.submit(self.check).result()
+            except RuntimeError:
+                # Exécuteur arrêté: fin du processus
+                return
+            if connected:
+                delay = self.heartbeat_interval
+            else:
+                delay = min(max(delay * 2, config.MT5_RECONNECT_BASE_DELAY), config.MT5_RECONNECT_MAX_DELAY)
+                print(f"⏳ Nouvelle tentative de connexion MT5 dans {delay:.1f}s")
+
+    # --- Exécution des appels ---
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Exécute un appel MT5 dans le thread dédié, ou le met en file si la
+        connexion est en cours de rétablissement.
+
+        Returns:
+            concurrent.futures.Future: Résultat de l'appel (None si périmé)
+        """
+        if self.is_connected:
+            return MT5_EXECUTOR.submit(func, *args, **kwargs)
+
+        future = Future()
+        with self._lock:
+            self._pending.append((time.monotonic(), future, func, args, kwargs))
+        print(f"📥 Appel MT5 mis en file pendant la reconnexion ({len(self._pending)} en attente)")
+        return future
+
+    def _drain_pending(self):
+        """Exécute les appels en file qui ne sont pas périmés (thread MT5)."""
+        while True:
+            with self._lock:
+                if not self._pending:
+                    return
+                queued_at, future, func, args, kwargs = self._pending.popleft()
+
+            if not future.set_running_or_notify_cancel():
+                # Annulé par l'appelant (délai dépassé): ne surtout pas l'exécuter
+                continue
+            age = time.monotonic() - queued_at
+            if age > self.max_staleness:
+                self.dropped_calls += 1
+                print(f"⌛ Appel MT5 abandonné: en attente depuis {age:.1f}s (limite {self.max_staleness}s)")
+                future.set_result(None)
+                continue
+
+            try:
+                future.set_result(func(*args, **kwargs))
+            except Exception as e:
+                future.set_exception(e)
+
+    # --- Métriques et arrêt ---
+
+    def metrics(self):
+        """Métriques de disponibilité et de reconnexion."""
+        now = time.monotonic()
+        with self._lock:
+            uptime = self.total_uptime
+            if self.is_connected and self.connected_since is not None:
+                uptime += now - self.connected_since
+            latencies = list(self.reconnect_latencies)
+            return {
+                'account_type': self.account_type,
+                'connected': self.is_connected,
+                'uptime_seconds': round(uptime, 3),
+                'current_session_seconds': round(now - self.connected_since, 3) if self.connected_since else 0.0,
+                'reconnect_count': self.reconnect_count,
+                'last_reconnect_latency': round(latencies[-1], 3) if latencies else None,
+                'avg_reconnect_latency': round(sum(latencies) / len(latencies), 3) if latencies else None,
+                'pending_calls': len(self._pending),
+                'dropped_calls': self.dropped_calls
+            }
+
+    def close(self):
+        """Arrête le heartbeat et ferme la connexion MT5."""
+        self._stop.set()
+        if self._heartbeat_thread:
+            self._heartbeat_thread.join(timeout=self.heartbeat_interval + 1)
+        if self.is_connected:
+            MT5_EXECUTOR.submit(mt5.shutdown).result()
+            self._mark_disconnected()
+            self.disconnected_at = None
+            print(f"🔴 Connexion MT5 fermée ({self.account_type})")
+
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(account_type='DEMO', credentials=None):
+    """Retourne la session MT5 partagée du processus pour ce compte (connectée au premier appel)."""
+    account_type = account_type.upper()
+    with _sessions_lock:
+        session = _sessions.get(account_type)
+        if session is None:
+            session = MT5Session(account_type, credentials)
+            session.connect()
+            _sessions[account_type] = session
+        return session
@@ -1,7 +1,38 @@
 import MetaTrader5 as mt5
 from datetime import datetime
+import asyncio
 import time
-from config import config
+from mt5Session import get_session
+from orderRegistry import LEGACY_MAGIC_BASE, encode_magic
+from symbolCache import symbol_cache
+from tickRecorder import tick_recorder
+from tracing import traced, tracer
+
+def decide_order(sens, entry_price, current_price, point):
+    """
+    Choix marché / en attente d'une jambe (partagé avec le backtester).
+    
+    Args:
+        sens (str): 'BUY' ou 'SELL'
+        entry_price (float): Prix d'entrée du signal
+        current_price (float): Ask pour un achat, bid pour une vente
+        point (float): Point du symbole
+        
+    Returns:
+        tuple: (action, type d'ordre, prix de la requête)
+    """
+    if abs(entry_price - current_price) <= 5 * point:
+        # Ordre au marché
+        order_type = mt5.ORDER_TYPE_BUY if sens == 'BUY' else mt5.ORDER_TYPE_SELL
+        return mt5.TRADE_ACTION_DEAL, order_type, current_price
+    
+    # Ordre en attente
+    if sens == 'BUY':
+        order_type = mt5.ORDER_TYPE_BUY_LIMIT if entry_price < current_price else mt5.ORDER_TYPE_BUY_STOP
+    else:
+        order_type = mt5.ORDER_TYPE_SELL_LIMIT if entry_price > current_price else mt5.ORDER_TYPE_SELL_STOP
+    return mt5.TRADE_ACTION_PENDING, order_type, entry_price
+
 
 class SendOrder:
     def __init__(self, account_type='DEMO'):
@@ -12,92 +43,19 @@ class SendOrder:
             account_type (str): Type de compte ('DID' ou 'DEMO')
         """
         self.account_type = account_type.upper()
-        self.is_connected = False
-        self.current_login = None
         
         print(f"🔧 Initialisation SendOrder pour compte {self.account_type}")
         
-        # Vérifier que le type de compte est supporté
-        if self.account_type not in ['DID', 'DEMO']:
-            raise ValueError(f"Type de compte non supporté: {self.account_type}. Utilisez 'DID' ou 'DEMO'")
-        
-        # Initialiser la connexion MT5
-        self._connect_to_mt5()
-    
-    def _connect_to_mt5(self):
-        """Établit la connexion à MT5."""
-        try:
-            print(f"🔄 Connexion à MT5 ({self.account_type})...")
-            
-            # Initialiser MT5
-            if not mt5.initialize():
-                error = mt5.last_error()
-                print(f"❌ Échec initialisation MT5: {error}")
-                return
-            
-            # Récupérer les identifiants
-            credentials = self._get_credentials()
-            if not credentials:
-                print(f"❌ Impossible de récupérer les identifiants pour {self.account_type}")
-                mt5.shutdown()
-                return
-            
-            # Se connecter au compte
-            success = mt5.login(
-                login=credentials['login'],
-                password=credentials['password'],
-                server=credentials['server']
-            )
-            
-            if not success:
-                error = mt5.last_error()
-                print(f"❌ Échec connexion MT5: {error}")
-                mt5.shutdown()
-                return
-            
-            # Vérifier la connexion
-            if self._verify_connection(credentials['login']):
-                self.is_connected = True
-                self.current_login = credentials['login']
-                print(f"✅ Connexion MT5 établie sur {self.account_type}")
-            else:
-                print(f"❌ Vérification de connexion échouée")
-                mt5.shutdown()
-                
-        except Exception as e:
-            print(f"❌ Erreur lors de la connexion MT5: {e}")
-            if mt5.initialize():
-                mt5.shutdown()
+        # Session MT5 partagée (connexion, heartbeat et reconnexion)
+        self.session = get_session(self.account_type)
     
-    def _get_credentials(self):
-        """Récupère les identifiants MT5 depuis la configuration."""
-        try:
-            return config.get_mt5_credentials(self.account_type)
-        except Exception as e:
-            print(f"❌ Erreur récupération identifiants: {e}")
-            return None
+    @property
+    def is_connected(self):
+        return self.session.is_connected
     
-    def _verify_connection(self, expected_login):
-        """Vérifie que la connexion est établie sur le bon compte."""
-        try:
-            account_info = mt5.account_info()
-            if not account_info:
-                print("❌ Impossible de récupérer les infos du compte")
-                return False
-            
-            if account_info.login != expected_login:
-                print(f"❌ Connecté au mauvais compte: {account_info.login} != {expected_login}")
-                return False
-            
-            # Afficher le type de compte
-            account_type_str = "DÉMO" if account_info.trade_mode == mt5.ACCOUNT_TRADE_MODE_DEMO else "RÉEL"
-            print(f"📊 Compte {account_type_str} - Balance: {account_info.balance} {account_info.currency}")
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Erreur vérification connexion: {e}")
-            return False
+    @property
+    def current_login(self):
+        return self.session.current_login
     
     def get_account_info(self):
         """Retourne les informations du compte."""
@@ -124,11 +82,12 @@ class SendOrder:
     
     def place_orders(self, signals, lot_sizes):
         """
-        Place 3 ordres individuels sur MT5.
+        Place les ordres individuels d'un signal sur MT5 (appel bloquant: le lot est
+        exécuté dans le thread MT5 dédié, comme place_orders_async).
         
         Args:
-            signals (list): Liste de 3 signaux
-            lot_sizes (list): Liste de 3 tailles de lot
+            signals (list): Liste des signaux (un par jambe)
+            lot_sizes (list): Liste des tailles de lot
             
         Returns:
             list: Liste des résultats de placement
@@ -137,88 +96,184 @@ class SendOrder:
             print(f"🚫 Placement annulé - Compte {self.account_type} non connecté")
             return []
         
-        if len(signals) != 3 or len(lot_sizes) != 3:
-            print(f"❌ Erreur: Il faut exactement 3 signaux et 3 tailles de lot")
+        if not signals or len(signals) != len(lot_sizes):
+            print(f"❌ Erreur: Il faut autant de tailles de lot que de signaux")
             return []
         
-        results = []
+        return self.session.submit(self.place_orders_batch, signals, lot_sizes).result() or []
+    
+    async def place_orders_async(self, signals, lot_sizes):
+        """
+        Version asynchrone de place_orders: le lot complet est exécuté dans le thread
+        MT5 dédié (mis en file pendant une reconnexion) sans bloquer la boucle asyncio.
+        
+        Args:
+            signals (list): Liste des signaux (un par jambe)
+            lot_sizes (list): Liste des tailles de lot
+            
+        Returns:
+            list: Liste des résultats de placement
+        """
+        if not signals or len(signals) != len(lot_sizes):
+            print(f"❌ Erreur: Il faut autant de tailles de lot que de signaux")
+            return []
+        
+        results = await asyncio.wrap_future(self.session.submit(self.place_orders_batch, signals, lot_sizes))
+        return results or []
+    
+    def place_orders_batch(self, signals, lot_sizes, deadline=None):
+        """
+        Place toutes les jambes d'un signal à partir d'un seul instantané de prix:
+        les requêtes sont construites d'avance, pré-validées par order_check puis
+        envoyées à la suite, sans pause. Doit s'exécuter dans le thread MT5.
+        
+        Args:
+            signals (list): Liste des signaux (un par jambe)
+            lot_sizes (list): Liste des tailles de lot
+            deadline (float): time.monotonic() au-delà duquel plus aucune jambe n'est envoyée
+            
+        Returns:
+            list: Résultats de placement, avec la latence d'envoi de chaque jambe
+        """
+        batch_start = time.perf_counter()
+        legs = len(signals)
         
+        # 1. Un instantané (infos + tick) par symbole pour toutes les jambes
+        snapshots = {}
+        prepared = []
         for i, (signal, lot_size) in enumerate(zip(signals, lot_sizes)):
-            print(f"\n📈 Placement ordre {i+1}/3 sur {self.account_type}...")
-            result = self._place_single_order(signal, lot_size, i+1)
+            order_number = i + 1
+            symbol = signal['symbol']
+            if symbol not in snapshots:
+                snapshots[symbol] = self._get_market_snapshot(symbol)
+            symbol_info, tick = snapshots[symbol]
+            if not symbol_info or not tick:
+                continue
+            request = self._build_request(signal, lot_size, order_number, symbol_info, tick)
+            prepared.append((order_number, signal, request))
+        
+        # 2. Pré-validation de toutes les requêtes en une passe
+        checked = []
+        for order_number, signal, request in prepared:
+            try:
+                check = mt5.order_check(request)
+            except Exception as e:
+                print(f"❌ Ordre {order_number} - Erreur order_check: {e}")
+                continue
+            if check is None:
+                print(f"❌ Ordre {order_number} - order_check: {mt5.last_error()}")
+                continue
+            if check.retcode != 0:
+                print(f"❌ Ordre {order_number} refusé par order_check - Retcode: {check.retcode} - {check.comment}")
+                continue
+            checked.append((order_number, signal, request))
+        
+        # 3. Envoi sans pause artificielle
+        results = []
+        for order_number, signal, request in checked:
+            if deadline is not None and time.monotonic() > deadline:
+                print(f"⌛ Délai dépassé: ordres {order_number}+ non envoyés sur {self.account_type}")
+                break
+            print(f"\n📈 Placement ordre {order_number}/{legs} sur {self.account_type}...")
+            submit_time = time.time()
+            send_start = time.perf_counter()
+            result = self._send_request(request, signal['sens'], order_number)
+            latency_ms = (time.perf_counter() - send_start) * 1000
+            tracer.record('order_send', latency_ms)
             if result:
+                result['submit_latency_ms'] = round(latency_ms, 2)
+                result['submit_time'] = submit_time
+                result['ack_time'] = submit_time + latency_ms / 1000
+                result['filled'] = request['action'] == mt5.TRADE_ACTION_DEAL
                 results.append(result)
-            time.sleep(0.1)  # Pause entre ordres
         
-        print(f"✅ {len(results)}/3 ordres placés avec succès sur {self.account_type}")
+        total_ms = (time.perf_counter() - batch_start) * 1000
+        latencies = " | ".join(f"#{r['order_number']} {r['submit_latency_ms']:.0f} ms" for r in results)
+        print(f"✅ {len(results)}/{legs} ordres placés avec succès sur {self.account_type} en {total_ms:.0f} ms ({latencies})")
         return results
     
+    @traced('order_single')
     def _place_single_order(self, signal, lot_size, order_number):
         """Place un seul ordre sur MT5."""
         try:
-            symbol = signal['symbol']
-            sens = signal['sens']
-            entry_price = signal['entry_price']
-            sl_price = signal['sl']
-            tp_price = signal['tp']
-            
-            # Sélectionner le symbole
-            if not mt5.symbol_select(symbol, True):
-                print(f"❌ Impossible de sélectionner {symbol}")
+            symbol_info, tick = self._get_market_snapshot(signal['symbol'])
+            if not symbol_info or not tick:
                 return None
             
-            # Obtenir les infos du symbole
-            symbol_info = mt5.symbol_info(symbol)
+            request = self._build_request(signal, lot_size, order_number, symbol_info, tick)
+            return self._send_request(request, signal['sens'], order_number)
+            
+        except Exception as e:
+            print(f"❌ Erreur placement ordre {order_number}: {e}")
+            return None
+    
+    def _get_market_snapshot(self, symbol):
+        """Infos du symbole (cache partagé, sélection incluse) et prix actuel."""
+        try:
+            symbol_info = symbol_cache.get(symbol)
             if not symbol_info:
                 print(f"❌ Infos symbole {symbol} indisponibles")
-                return None
+                return None, None
             
-            # Obtenir le prix actuel
-            tick = mt5.symbol_info_tick(symbol)
+            # Dernier tick enregistré s'il est frais, sinon interrogation du terminal
+            tick = tick_recorder.latest(symbol) or mt5.symbol_info_tick(symbol)
             if not tick:
                 print(f"❌ Prix actuel {symbol} indisponible")
-                return None
-            
-            current_price = tick.ask if sens == 'BUY' else tick.bid
+                return symbol_info, None
             
-            # Déterminer le type d'ordre
-            if abs(entry_price - current_price) <= 5 * symbol_info.point:
-                # Ordre au marché
-                order_type = mt5.ORDER_TYPE_BUY if sens == 'BUY' else mt5.ORDER_TYPE_SELL
-                action = mt5.TRADE_ACTION_DEAL
-                price = current_price
-            else:
-                # Ordre en attente
-                if sens == 'BUY':
-                    order_type = mt5.ORDER_TYPE_BUY_LIMIT if entry_price < current_price else mt5.ORDER_TYPE_BUY_STOP
-                else:
-                    order_type = mt5.ORDER_TYPE_SELL_LIMIT if entry_price > current_price else mt5.ORDER_TYPE_SELL_STOP
-                action = mt5.TRADE_ACTION_PENDING
-                price = entry_price
-            
-            # Normaliser les prix
-            digits = symbol_info.digits
-            price = round(price, digits)
-            sl_price = round(sl_price, digits)
-            tp_price = round(tp_price, digits)
-            
-            # Préparer la requête
-            request = {
-                "action": action,
-                "symbol": symbol,
-                "volume": lot_size,
-                "type": order_type,
-                "price": price,
-                "sl": sl_price,
-                "tp": tp_price,
-                "deviation": 20,
-                "magic": 234000 + order_number,
-                "comment": f"Signal-{order_number}-{self.account_type}",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
-            }
+            return symbol_info, tick
             
-            print(f"📋 {sens} {symbol}: {lot_size} lots à {price} (SL: {sl_price}, TP: {tp_price})")
+        except Exception as e:
+            print(f"❌ Erreur récupération prix {symbol}: {e}")
+            return None, None
+    
+    def _build_request(self, signal, lot_size, order_number, symbol_info, tick):
+        """Construit la requête MT5 (marché ou en attente) à partir d'un instantané de prix."""
+        symbol = signal['symbol']
+        sens = signal['sens']
+        entry_price = signal['entry_price']
+        sl_price = signal['sl']
+        tp_price = signal['tp']
+        
+        current_price = tick.ask if sens == 'BUY' else tick.bid
+        action, order_type, price = decide_order(sens, entry_price, current_price, symbol_info['point'])
+        
+        # Normaliser les prix
+        digits = symbol_info['digits']
+        price = round(price, digits)
+        sl_price = round(sl_price, digits)
+        tp_price = round(tp_price, digits)
+        
+        # Attribution: canal/signal/jambe encodés dans le magic number
+        channel_id = signal.get('channel_id')
+        if channel_id and signal.get('signal_id') is not None:
+            magic = encode_magic(channel_id, signal['signal_id'], order_number)
+            comment = f"Canal-{channel_id}-{order_number}-{self.account_type}"
+        else:
+            magic = LEGACY_MAGIC_BASE + order_number
+            comment = f"Signal-{order_number}-{self.account_type}"
+        
+        # Préparer la requête
+        return {
+            "action": action,
+            "symbol": symbol,
+            "volume": lot_size,
+            "type": order_type,
+            "price": price,
+            "sl": sl_price,
+            "tp": tp_price,
+            "deviation": 20,
+            "magic": magic,
+            "comment": comment,
+            "type_time": mt5.ORDER_TIME_GTC,
+            "type_filling": mt5.ORDER_FILLING_IOC,
+        }
+    
+    def _send_request(self, request, sens, order_number):
+        """Envoie une requête préparée et retourne le résultat de placement."""
+        try:
+            print(f"📋 {sens} {request['symbol']}: {request['volume']} lots à {request['price']} "
+                  f"(SL: {request['sl']}, TP: {request['tp']})")
             
             # Envoyer l'ordre
             result = mt5.order_send(request)
@@ -236,13 +291,14 @@ class SendOrder:
             
             return {
                 'order_number': order_number,
-                'symbol': symbol,
+                'symbol': request['symbol'],
                 'type': sens,
-                'volume': lot_size,
-                'price': price,
-                'sl': sl_price,
-                'tp': tp_price,
+                'volume': request['volume'],
+                'price': request['price'],
+                'sl': request['sl'],
+                'tp': request['tp'],
                 'mt5_order_id': result.order,
+                'mt5_deal_id': result.deal,
                 'account_type': self.account_type,
                 'timestamp': datetime.now().isoformat()
             }
@@ -251,9 +307,100 @@ class SendOrder:
             print(f"❌ Erreur placement ordre {order_number}: {e}")
             return None
     
+    def update_orders(self, legs, new_signal):
+        """
+        Applique l'édition d'un signal aux jambes déjà placées, avec le minimum de requêtes:
+        TRADE_ACTION_SLTP sur les positions ouvertes, TRADE_ACTION_MODIFY sur les ordres
+        en attente (la position dans la file est conservée). Doit s'exécuter dans le thread MT5.
+        
+        Args:
+            legs (list): Jambes enregistrées (ticket, order_number, symbol, sens, entry, sl, tp)
+            new_signal (dict): Nouveau signal {symbol, sens, sl, entry_prices, tps}
+            
+        Returns:
+            list: Modifications appliquées {ticket, action, entry, sl, tp}
+        """
+        changes = []
+        
+        for leg in legs:
+            if new_signal['symbol'] != leg['symbol'] or new_signal['sens'] != leg['sens']:
+                # Symbole ou sens différent: ce n'est plus le même trade, on annule ce qui n'est pas exécuté
+                print(f"⚠️ Ordre {leg['ticket']}: symbole/sens modifié → annulation si encore en attente")
+                changes.extend(self.cancel_orders([leg]))
+                continue
+            
+            index = min(leg['order_number'], len(new_signal['tps'])) - 1
+            symbol_info = symbol_cache.get(leg['symbol'])
+            if not symbol_info:
+                continue
+            digits = symbol_info['digits']
+            new_sl = round(new_signal['sl'], digits)
+            new_tp = round(new_signal['tps'][index], digits)
+            new_entry = round(new_signal['entry_prices'][index], digits)
+            
+            pending = mt5.orders_get(ticket=leg['ticket'])
+            if pending:
+                order = pending[0]
+                if (round(order.price_open, digits), round(order.sl, digits), round(order.tp, digits)) == (new_entry, new_sl, new_tp):
+                    continue
+                request = {
+                    "action": mt5.TRADE_ACTION_MODIFY,
+                    "order": leg['ticket'],
+                    "price": new_entry,
+                    "sl": new_sl,
+                    "tp": new_tp,
+                    "type_time": mt5.ORDER_TIME_GTC,
+                }
+                change = {'ticket': leg['ticket'], 'action': 'MODIFY', 'entry': new_entry, 'sl': new_sl, 'tp': new_tp}
+            else:
+                positions = mt5.positions_get(ticket=leg['ticket'])
+                if not positions:
+                    # Jambe déjà clôturée: rien à modifier
+                    continue
+                position = positions[0]
+                if (round(position.sl, digits), round(position.tp, digits)) == (new_sl, new_tp):
+                    continue
+                request = {
+                    "action": mt5.TRADE_ACTION_SLTP,
+                    "position": leg['ticket'],
+                    "symbol": leg['symbol'],
+                    "sl": new_sl,
+                    "tp": new_tp,
+                }
+                change = {'ticket': leg['ticket'], 'action': 'SLTP', 'entry': leg['entry'], 'sl': new_sl, 'tp': new_tp}
+            
+            result = mt5.order_send(request)
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                error = result.comment if result else mt5.last_error()
+                print(f"❌ Modification {change['action']} ordre {leg['ticket']} échouée: {error}")
+                continue
+            
+            print(f"✏️ Ordre {leg['ticket']} {change['action']}: entrée {change['entry']} SL {new_sl} TP {new_tp}")
+            changes.append(change)
+        
+        return changes
+    
+    def cancel_orders(self, legs):
+        """
+        Annule les jambes encore en attente (les positions ouvertes sont conservées).
+        Doit s'exécuter dans le thread MT5.
+        
+        Returns:
+            list: Annulations appliquées {ticket, action}
+        """
+        changes = []
+        for leg in legs:
+            if not mt5.orders_get(ticket=leg['ticket']):
+                continue
+            result = mt5.order_send({"action": mt5.TRADE_ACTION_REMOVE, "order": leg['ticket']})
+            if result is None or result.retcode != mt5.TRADE_RETCODE_DONE:
+                error = result.comment if result else mt5.last_error()
+                print(f"❌ Annulation ordre {leg['ticket']} échouée: {error}")
+                continue
+            print(f"🗑️ Ordre en attente {leg['ticket']} annulé")
+            changes.append({'ticket': leg['ticket'], 'action': 'REMOVE'})
+        return changes
+    
     def close_connection(self):
         """Ferme la connexion MT5."""
-        if self.is_connected:
-            mt5.shutdown()
-            self.is_connected = False
-            print(f"🔴 Connexion MT5 fermée ({self.account_type})")
\ No newline at end of file
+        self.session.close()
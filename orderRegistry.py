@@ -0,0 +1,230 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from config import config
+
+# Magic number des ordres: BBB CC SSSSSSS L
+#   BBB     préfixe du bot (234, comme l'ancien 234000 + jambe)
+#   CC      canal Telegram (1-99)
+#   SSSSSSS identifiant du signal (registre local, modulo 10^7)
+#   L       numéro de jambe (1-9)
+MAGIC_PREFIX = 234
+LEGACY_MAGIC_BASE = 234000
+
+
+def encode_magic(channel_id, signal_id, leg):
+    """
+    Encode canal, signal et jambe dans le magic number d'un ordre.
+    
+    Args:
+        channel_id (int): Canal d'origine (1-99)
+        signal_id (int): Identifiant du signal dans le registre
+        leg (int): Numéro de jambe (1-9)
+        
+    Returns:
+        int: Magic number
+    """
+    return ((MAGIC_PREFIX * 100 + channel_id) * 10**7 + signal_id % 10**7) * 10 + leg
+
+
+def decode_magic(magic):
+    """
+    Décode un magic number du bot.
+    
+    Returns:
+        dict: {channel_id, signal_id, leg}; channel_id/signal_id à None pour l'ancien
+        format (234000 + jambe); None si l'ordre ne vient pas du bot
+    """
+    if not magic:
+        return None
+    if LEGACY_MAGIC_BASE < magic < LEGACY_MAGIC_BASE + 10:
+        return {'channel_id': None, 'signal_id': None, 'leg': magic - LEGACY_MAGIC_BASE}
+    leg = magic % 10
+    signal_id = (magic // 10) % 10**7
+    channel_id = (magic // 10**8) % 100
+    if magic // 10**10 != MAGIC_PREFIX or not channel_id:
+        return None
+    return {'channel_id': channel_id, 'signal_id': signal_id, 'leg': leg}
+
+
+class OrderRegistry:
+    """
+    Registre local des ordres placés: message Telegram → signal extrait → tickets MT5.
+    Permet d'appliquer les éditions/suppressions de messages aux ordres existants
+    et d'attribuer chaque position à son canal (historique, statistiques).
+    """
+
+    def __init__(self, path=None):
+        self.path = path if path is not None else config.ORDER_REGISTRY_PATH
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS signals (
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                signal TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (channel_id, message_id)
+            );
+            CREATE TABLE IF NOT EXISTS legs (
+                ticket INTEGER PRIMARY KEY,
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER,
+                order_number INTEGER NOT NULL,
+                symbol TEXT NOT NULL,
+                sens TEXT NOT NULL,
+                volume REAL NOT NULL,
+                entry REAL NOT NULL,
+                sl REAL NOT NULL,
+                tp REAL NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_legs_message ON legs (channel_id, message_id);
+            CREATE TABLE IF NOT EXISTS signal_ids (
+                signal_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                channel_id INTEGER NOT NULL,
+                message_id INTEGER,
+                created_at REAL NOT NULL
+            );
+        """)
+        # Registres créés avant l'encodage du magic number
+        columns = {row['name'] for row in self._db.execute("PRAGMA table_info(legs)")}
+        if 'signal_id' not in columns:
+            self._db.execute("ALTER TABLE legs ADD COLUMN signal_id INTEGER")
+        self._db.commit()
+
+    def next_signal_id(self, channel_id, message_id=None):
+        """
+        Réserve un identifiant de signal (encodé dans le magic number des jambes).
+        
+        Returns:
+            int: Identifiant unique et persistant
+        """
+        with self._lock:
+            cursor = self._db.execute(
+                "INSERT INTO signal_ids (channel_id, message_id, created_at) VALUES (?, ?, ?)",
+                (channel_id, message_id, time.time())
+            )
+            self._db.commit()
+            return cursor.lastrowid
+
+    def record_signal(self, channel_id, message_id, signal, results, signal_id=None):
+        """
+        Enregistre un signal et les tickets de ses jambes placées.
+
+        Args:
+            channel_id (int): Canal d'origine
+            message_id (int): ID du message Telegram (None si inconnu)
+            signal (dict): Signal extrait {symbol, sens, sl, entry_prices, tps}
+            results (list): Résultats de placement de SendOrder
+            signal_id (int): Identifiant réservé par next_signal_id
+        """
+        now = time.time()
+        with self._lock:
+            if message_id is not None:
+                self._db.execute("""
+                    INSERT INTO signals (channel_id, message_id, signal, created_at, updated_at) VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(channel_id, message_id) DO UPDATE SET signal = excluded.signal, updated_at = excluded.updated_at
+                """, (channel_id, message_id, json.dumps(signal), now, now))
+            self._db.executemany("""
+                INSERT OR REPLACE INTO legs
+                    (ticket, channel_id, message_id, signal_id, order_number, symbol, sens, volume, entry, sl, tp, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, [
+                (r['mt5_order_id'], channel_id, message_id, signal_id, r['order_number'], r['symbol'], r['type'],
+                 r['volume'], r['price'], r['sl'], r['tp'], now)
+                for r in results
+            ])
+            self._db.commit()
+
+    def get_signal(self, channel_id, message_id):
+        """
+        Retourne le signal enregistré pour un message et ses jambes.
+
+        Returns:
+            tuple: (signal, legs) ou None si le message n'a pas donné lieu à des ordres
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT signal FROM signals WHERE channel_id = ? AND message_id = ?",
+                (channel_id, message_id)
+            ).fetchone()
+            if row is None:
+                return None
+            legs = self._db.execute(
+                "SELECT * FROM legs WHERE channel_id = ? AND message_id = ? ORDER BY order_number",
+                (channel_id, message_id)
+            ).fetchall()
+        return json.loads(row['signal']), [dict(leg) for leg in legs]
+
+    def signal_history(self, since=None, until=None):
+        """
+        Signaux enregistrés avec leur date de réception (rejeu par le backtester).
+
+        Returns:
+            list: [{channel_id, message_id, time, symbol, sens, sl, entry_prices, tps}] par date croissante
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT channel_id, message_id, signal, created_at FROM signals "
+                "WHERE created_at >= ? AND created_at <= ? ORDER BY created_at",
+                (since or 0, until or float('inf'))
+            ).fetchall()
+        return [{'channel_id': row['channel_id'], 'message_id': row['message_id'], 'time': row['created_at'],
+                 **json.loads(row['signal'])} for row in rows]
+
+    def channel_for(self, magic=None, ticket=None):
+        """
+        Canal d'origine d'un ordre ou d'une position: magic number encodé, sinon
+        ticket enregistré (ordres placés avant l'encodage).
+        
+        Args:
+            magic (int): Magic number de l'ordre/deal
+            ticket (int): Ticket de l'ordre (= identifiant de position)
+            
+        Returns:
+            int: Numéro de canal ou None si inconnu
+        """
+        tag = decode_magic(magic)
+        if tag and tag['channel_id']:
+            return tag['channel_id']
+        if ticket is None:
+            return None
+        with self._lock:
+            row = self._db.execute("SELECT channel_id FROM legs WHERE ticket = ?", (ticket,)).fetchone()
+        return row['channel_id'] if row else None
+
+    def update_signal(self, channel_id, message_id, signal):
+        with self._lock:
+            self._db.execute(
+                "UPDATE signals SET signal = ?, updated_at = ? WHERE channel_id = ? AND message_id = ?",
+                (json.dumps(signal), time.time(), channel_id, message_id)
+            )
+            self._db.commit()
+
+    def update_leg(self, ticket, **fields):
+        """Met à jour les prix d'une jambe après modification (entry, sl, tp)."""
+        allowed = {key: value for key, value in fields.items() if key in ('entry', 'sl', 'tp', 'volume')}
+        if not allowed:
+            return
+        assignments = ", ".join(f"{key} = ?" for key in allowed)
+        with self._lock:
+            self._db.execute(f"UPDATE legs SET {assignments} WHERE ticket = ?", (*allowed.values(), ticket))
+            self._db.commit()
+
+    def remove_leg(self, ticket):
+        with self._lock:
+            self._db.execute("DELETE FROM legs WHERE ticket = ?", (ticket,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
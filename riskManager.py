@@ -1,75 +1,207 @@
 import math
+import numpy as np
 import MetaTrader5 as mt5
+from config import config
 from info import Infos
+from tracing import traced
+
+# Jambes d'un signal live (TradingBot.create_orders)
+LIVE_LEGS = 3
 
 class RiskManager:
-    def __init__(self, risk_per_signal_eur):
+    def __init__(self, risk_per_signal_eur, leg_weights=None):
+        """
+        Args:
+            risk_per_signal_eur (float): Risque total par signal en EUR
+            leg_weights (list): Poids de chaque jambe dans le risque (défaut: config.LEG_RISK_WEIGHTS)
+        """
         self.risk_per_signal_eur = risk_per_signal_eur
-        self.risk_per_position = risk_per_signal_eur / 3  # Répartition égale sur 3 positions
-        print(f"💰 Risque configuré: {risk_per_signal_eur}€ par signal ({self.risk_per_position:.2f}€ par position)")
+        self.leg_weights = list(leg_weights or config.LEG_RISK_WEIGHTS)
+        # Contrôle au lancement: un poids par jambe des signaux live (3 ordres par signal)
+        self.validate_leg_weights(self.leg_weights, LIVE_LEGS)
+        split = " / ".join(f"{risk:.2f}€" for risk in self.leg_budgets(risk_per_signal_eur, LIVE_LEGS, self.leg_weights))
+        print(f"💰 Risque configuré: {risk_per_signal_eur}€ par signal ({split} par position)")
+    
+    @staticmethod
+    def validate_leg_weights(weights, legs=None):
+        """
+        Vérifie LEG_RISK_WEIGHTS (au lancement, pas à chaque signal).
+        
+        Args:
+            weights (list): Poids des jambes
+            legs (int): Nombre de jambes attendu (None: nombre non contrôlé)
+        
+        Raises:
+            ValueError: Poids négatifs ou de somme nulle, ou nombre différent de legs
+        """
+        values = np.asarray(weights, dtype=float)
+        if not len(values) or values.sum() <= 0 or (values < 0).any():
+            raise ValueError(f"LEG_RISK_WEIGHTS: poids invalides ({list(weights)})")
+        if legs is not None and len(values) != legs:
+            raise ValueError(f"LEG_RISK_WEIGHTS: {len(values)} poids pour {legs} jambes ({list(weights)})")
+    
+    @staticmethod
+    def leg_budgets(budget, legs, weights):
+        """
+        Répartition du budget d'un signal entre ses jambes selon les poids
+        (parts égales si le nombre de poids ne correspond pas au nombre de jambes,
+        ex: échelle de 5 entrées avec 3 poids configurés).
+        
+        Returns:
+            np.ndarray: Risque visé par jambe en EUR
+        
+        Raises:
+            ValueError: Poids négatifs ou de somme nulle
+        """
+        RiskManager.validate_leg_weights(weights)
+        weights = np.asarray(weights, dtype=float) if len(weights) == legs else np.ones(legs)
+        return budget * weights / weights.sum()
     
-    def calculate_lot_sizes(self, signals):
-        """Calcule les tailles de lot pour 3 signaux individuels."""
-        lot_sizes = []
+    @traced('risk_calculation')
+    def calculate_lot_sizes(self, signals, risk_budget_eur=None):
+        """
+        Calcule les tailles de lot pour une liste de signaux individuels (3 ou plus).
         
-        for signal in signals:
+        Args:
+            signals (list): Jambes du signal
+            risk_budget_eur (float): Budget du signal (défaut: risque configuré), ex: réduit par la limite de compte
+        """
+        budget = risk_budget_eur if risk_budget_eur is not None else self.risk_per_signal_eur
+        budgets = self.leg_budgets(budget, len(signals), self.leg_weights)
+        lot_sizes = [0.01] * len(signals)
+        total_risk = 0.0
+        
+        # Regrouper les jambes par symbole: une seule récupération des infos par symbole
+        legs_by_symbol = {}
+        for i, signal in enumerate(signals):
+            legs_by_symbol.setdefault(signal.get('symbol'), []).append(i)
+        
+        for symbol, indexes in legs_by_symbol.items():
             try:
-                symbol = signal['symbol']
-                entry_price = signal['entry_price']
-                sl_price = signal['sl']
-                
-                # Obtenir les informations du symbole
-                symbol_info = Infos.get_symbol_info(symbol)
-                if not symbol_info:
-                    print(f"❌ Infos symbole {symbol} indisponibles")
-                    lot_sizes.append(0.01)
-                    continue
-                
-                # Calculer la distance SL en points
-                sl_distance_points = Infos.calculate_points_distance(symbol, entry_price, sl_price)
-                
-                if sl_distance_points <= 0:
-                    print(f"❌ Distance SL invalide: {sl_distance_points}")
-                    lot_sizes.append(0.01)
-                    continue
-                
-                # Obtenir la valeur du pip en EUR
-                pip_value_eur = Infos.get_pip_value_eur(symbol, 1.0)
-                if not pip_value_eur or pip_value_eur <= 0:
-                    print(f"❌ Valeur pip invalide pour {symbol}")
-                    lot_sizes.append(0.01)
-                    continue
-                
-                # Calculer la taille de lot théorique
-                # Risque = Distance_SL * Pip_Value * Lot_Size
-                # Donc: Lot_Size = Risque / (Distance_SL * Pip_Value)
-                theoretical_lot_size = self.risk_per_position / (sl_distance_points * pip_value_eur)
-                
-                # Arrondir à l'inférieur selon le lot_step
-                lot_step = symbol_info['lot_step']
-                lot_size = math.floor(theoretical_lot_size / lot_step) * lot_step
-                
-                # Respecter les limites min/max
-                min_lot = symbol_info['min_lot']
-                max_lot = symbol_info['max_lot']
-                lot_size = max(min_lot, min(lot_size, max_lot))
-                
-                # Vérifier que le risque réel ne dépasse pas le risque défini
-                real_risk = sl_distance_points * pip_value_eur * lot_size
-                if real_risk > self.risk_per_position:
-                    # Réduire encore si nécessaire
-                    lot_size = math.floor((self.risk_per_position / (sl_distance_points * pip_value_eur)) / lot_step) * lot_step
-                    lot_size = max(min_lot, lot_size)
-                    real_risk = sl_distance_points * pip_value_eur * lot_size
-                
-                lot_sizes.append(lot_size)
-                print(f"📊 {symbol}: Lot {lot_size} → Risque réel {real_risk:.2f}€")
-                
+                batch = self.calculate_lot_sizes_batch(
+                    symbol,
+                    [signals[i]['entry_price'] for i in indexes],
+                    [signals[i]['sl'] for i in indexes],
+                    risk_per_leg=budgets[indexes]
+                )
+                for i, lot_size in zip(indexes, batch['lot_sizes']):
+                    lot_sizes[i] = lot_size
+                total_risk += batch['total_risk']
             except Exception as e:
-                print(f"❌ Erreur calcul lot pour {signal.get('symbol', '?')}: {e}")
-                lot_sizes.append(0.01)
+                print(f"❌ Erreur calcul lot pour {symbol or '?'}: {e}")
+        
+        print(f"💰 Risque total calculé: {total_risk:.2f}€ (limite: {budget:.2f}€)")
+        
+        return lot_sizes
+    
+    @staticmethod
+    def leg_risk(symbol, sens, entry_price, sl_price, volume):
+        """
+        Risque jusqu'au SL d'une jambe en EUR (même formule que le dimensionnement).
+        Un SL absent ou déjà du bon côté de l'entrée (breakeven, trailing) ne risque rien.
+        """
+        if not sl_price or not volume:
+            return 0.0
+        symbol_info = Infos.get_symbol_info(symbol)
+        point_value_eur = Infos.get_point_value_eur(symbol, 1.0)
+        if not symbol_info or not point_value_eur:
+            return 0.0
+        direction = 1 if sens == 'BUY' else -1
+        sl_distance = max(0.0, direction * (entry_price - sl_price)) / symbol_info['point']
+        return sl_distance * point_value_eur * volume
+    
+    def calculate_lot_sizes_batch(self, symbol, entry_prices, sl_prices, risk_per_leg=None):
+        """
+        Calcule en une passe NumPy les tailles de lot de N jambes sur un même symbole.
+        
+        Args:
+            symbol (str): Symbole de l'instrument
+            entry_prices (list): Prix d'entrée de chaque jambe
+            sl_prices (list): SL de chaque jambe
+            risk_per_leg (float ou np.ndarray): Risque par jambe en EUR (défaut: risque signal / N)
+        
+        Returns:
+            dict: lot_sizes, risks et sl_distances par jambe, plus total_risk
+        """
+        entries = np.asarray(entry_prices, dtype=float)
+        sls = np.asarray(sl_prices, dtype=float)
+        legs = len(entries)
+        if risk_per_leg is None:
+            risk_per_leg = self.risk_per_signal_eur / max(legs, 1)
+        
+        fallback = {
+            'symbol': symbol,
+            'lot_sizes': [0.01] * legs,
+            'risks': [0.0] * legs,
+            'sl_distances': [0.0] * legs,
+            'total_risk': 0.0
+        }
+        
+        # Infos du symbole et valeur du pip: une seule fois pour toutes les jambes
+        symbol_info = Infos.get_symbol_info(symbol)
+        if not symbol_info:
+            print(f"❌ Infos symbole {symbol} indisponibles")
+            return fallback
+        
+        # Distance SL en points: valeur du point (et non du pip) pour 1 lot
+        point_value_eur = Infos.get_point_value_eur(symbol, 1.0)
+        if not point_value_eur or point_value_eur <= 0:
+            print(f"❌ Valeur pip invalide pour {symbol}")
+            return fallback
+        
+        # Distance SL en points
+        sl_distances = np.abs(entries - sls) / symbol_info['point']
+        valid = sl_distances > 0
+        if not valid.all():
+            print(f"❌ Distance SL invalide sur {int((~valid).sum())} jambe(s)")
+        
+        lot_sizes, real_risks = self.size_legs(sl_distances, risk_per_leg, point_value_eur, symbol_info)
+        
+        for lot_size, risk in zip(lot_sizes, real_risks):
+            print(f"📊 {symbol}: Lot {lot_size:g} → Risque réel {risk:.2f}€")
+        
+        return {
+            'symbol': symbol,
+            'lot_sizes': lot_sizes.tolist(),
+            'risks': real_risks.tolist(),
+            'sl_distances': sl_distances.tolist(),
+            'total_risk': float(real_risks.sum())
+        }
+    
+    @staticmethod
+    def size_legs(sl_distances, risk_per_leg, point_value_eur, symbol_info):
+        """
+        Tailles de lot et risques réels de N jambes, sans appel MT5 (partagé avec le backtester).
+        
+        Args:
+            sl_distances (np.ndarray): Distance SL de chaque jambe en points
+            risk_per_leg (float ou np.ndarray): Risque visé par jambe en EUR
+            point_value_eur (float): Valeur d'un point pour 1 lot en EUR
+            symbol_info (dict): Spécifications (lot_step, min_lot, max_lot)
+        
+        Returns:
+            tuple: (lot_sizes, real_risks) en np.ndarray
+        """
+        lot_step = symbol_info['lot_step']
+        min_lot = symbol_info['min_lot']
+        max_lot = symbol_info['max_lot']
+        step_decimals = max(0, -int(math.floor(math.log10(lot_step)))) if lot_step > 0 else 2
+        valid = sl_distances > 0
+        
+        # Lot_Size = Risque / (Distance_SL * Point_Value), arrondi à l'inférieur selon le lot_step
+        risk_per_lot = sl_distances * point_value_eur
+        with np.errstate(divide='ignore', invalid='ignore'):
+            theoretical = np.where(valid, risk_per_leg / risk_per_lot, 0.0)
+        floored = np.floor(theoretical / lot_step + 1e-9) * lot_step
+        
+        # Respecter les limites min/max
+        lot_sizes = np.clip(floored, min_lot, max_lot)
         
-        total_risk = sum([sl_distance_points * pip_value_eur * lot for lot in lot_sizes])
-        print(f"💰 Risque total calculé: {total_risk:.2f}€ (limite: {self.risk_per_signal_eur}€)")
+        # Vérifier que le risque réel ne dépasse pas le risque défini
+        real_risks = risk_per_lot * lot_sizes
+        over = real_risks > risk_per_leg
+        lot_sizes = np.where(over, np.maximum(min_lot, floored), lot_sizes)
         
-        return lot_sizes
\ No newline at end of file
+        lot_sizes = np.where(valid, np.round(lot_sizes, step_decimals), 0.01)
+        real_risks = np.where(valid, risk_per_lot * lot_sizes, 0.0)
+        return lot_sizes, real_risks
@@ -0,0 +1,152 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from config import config
+
+
+class SignalCache:
+    """
+    Cache des extractions de signaux, adressé par le contenu normalisé du message
+    et le canal. LRU en mémoire adossé à SQLite pour survivre aux redémarrages.
+    Sert aussi de contrôle anti-doublon avant le placement des ordres.
+    """
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = path if path is not None else config.SIGNAL_CACHE_PATH
+        self.ttl = ttl if ttl is not None else config.SIGNAL_CACHE_TTL
+        self.max_entries = max_entries if max_entries is not None else config.SIGNAL_CACHE_SIZE
+        self._memory = OrderedDict()   # clé → (stocké à, signal)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(self.path)
+        if directory and self.path != ':memory:':
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS signals (
+                key TEXT PRIMARY KEY,
+                channel_id INTEGER NOT NULL,
+                signal TEXT,
+                stored_at REAL NOT NULL,
+                placed_at REAL
+            )
+        """)
+        self._db.commit()
+
+    @staticmethod
+    def normalize(text):
+        """Minuscules, sans emojis ni ponctuation décorative, espaces compactés."""
+        text = unicodedata.normalize('NFKC', text or '').lower()
+        # Garder lettres, chiffres et séparateurs de prix; le reste devient un espace
+        text = ''.join(c if c.isalnum() or c in '.,@-/:' else ' ' for c in text)
+        return re.sub(r'\s+', ' ', text).strip()
+
+    def key(self, text, channel_id):
+        normalized = self.normalize(text)
+        return hashlib.sha256(f"{channel_id}:{normalized}".encode('utf-8')).hexdigest()
+
+    def get(self, text, channel_id):
+        """
+        Retourne l'extraction en cache pour ce message, si elle n'a pas expiré.
+
+        Returns:
+            dict: Signal extrait ou None si absent
+        """
+        key = self.key(text, channel_id)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                row = self._db.execute("SELECT signal, stored_at FROM signals WHERE key = ?", (key,)).fetchone()
+                if row and row[0] is not None:
+                    entry = (row[1], json.loads(row[0]))
+                    self._remember(key, entry)
+
+            if entry is None or now - entry[0] > self.ttl:
+                self.misses += 1
+                return None
+
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return dict(entry[1])
+
+    def put(self, text, channel_id, signal):
+        """Enregistre l'extraction d'un message."""
+        key = self.key(text, channel_id)
+        now = time.time()
+        with self._lock:
+            self._remember(key, (now, signal))
+            self._db.execute("""
+                INSERT INTO signals (key, channel_id, signal, stored_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET signal = excluded.signal, stored_at = excluded.stored_at
+            """, (key, channel_id, json.dumps(signal), now))
+            self._db.commit()
+
+    def claim(self, text, channel_id):
+        """
+        Contrôle anti-doublon: réserve le placement des ordres pour ce message.
+
+        Returns:
+            bool: True si le signal n'a pas déjà été exécuté dans la fenêtre TTL
+        """
+        key = self.key(text, channel_id)
+        now = time.time()
+        with self._lock:
+            cursor = self._db.execute("""
+                INSERT INTO signals (key, channel_id, stored_at, placed_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET placed_at = excluded.placed_at
+                WHERE signals.placed_at IS NULL OR signals.placed_at < ?
+            """, (key, channel_id, now, now, now - self.ttl))
+            self._db.commit()
+            return cursor.rowcount > 0
+
+    def release(self, text, channel_id):
+        """Libère la réservation d'un message dont aucun ordre n'a été placé (repost de nouveau exécutable)."""
+        key = self.key(text, channel_id)
+        with self._lock:
+            self._db.execute("UPDATE signals SET placed_at = NULL WHERE key = ?", (key,))
+            self._db.commit()
+
+    def purge(self):
+        """
+        Supprime les entrées expirées du stockage SQLite.
+
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        with self._lock:
+            limit = time.time() - self.ttl
+            cursor = self._db.execute(
+                "DELETE FROM signals WHERE stored_at < ? AND (placed_at IS NULL OR placed_at < ?)",
+                (limit, limit)
+            )
+            self._db.commit()
+            return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._memory),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _remember(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,255 @@
+"""
+Pré-filtre local avant extraction: un message est-il un signal de trading ?
+Caractéristiques lexicales sur frontières de mots (niveaux SL/TP chiffrés, sens
+avec prix d'entrée, symbole connu, fourchette d'entrée...) combinées par une
+petite régression logistique entraînée sur l'historique étiqueté.
+
+Usage:
+    python signalFilter.py                           # précision/rappel (entraînement et leave-one-out)
+    python signalFilter.py --train --output data/signal_filter.json
+"""
+
+import argparse
+import json
+import math
+import os
+import re
+import time
+from config import config
+from localParser import DIRECTIONS
+
+CURRENCIES = {'usd', 'eur', 'gbp', 'jpy', 'chf', 'cad', 'aud', 'nzd', 'xau', 'xag', 'btc', 'eth', 'usdt'}
+# Noms usuels des métaux, indices et pétrole (sans import MT5: utilisable hors terminal)
+SYMBOL_WORDS = {'gold', 'silver', 'us30', 'dj30', 'ws30', 'dow30', 'nas100', 'us100', 'ustec', 'nasdaq',
+                'spx500', 'us500', 'sp500', 'ger40', 'de40', 'dax', 'uk100', 'ftse100', 'usoil', 'ukoil',
+                'wti', 'brent', 'crude'}
+DIRECTION_WORDS = {direction.lower() for direction in DIRECTIONS}
+SL_WORDS = {'sl'}
+TP_WORDS = {'tp', 'tp1', 'tp2', 'tp3'}
+# Mots tolérés entre un mot-clé et son prix ("SL @ 2314.90", "BUY NOW @ 2329.79")
+FILLERS = {'@', ':', '=', 'at', 'now'}
+# Messages de suivi: résultats, "TP1 hit", "+200 pips"
+RESULT_WORDS = {'hit', 'pip', 'pips', 'closed', 'secured', 'running', 'booked'}
+
+# Un seul passage sur le texte en minuscules: mots, nombres, séparateurs utiles
+TOKEN = re.compile(r'[a-z]+\d*|\+?\d+(?:\.\d+)?|[@:=\-\n]')
+
+FEATURES = ('bias', 'sl_level', 'tp_level', 'sl_word', 'tp_word', 'direction', 'entry',
+            'entry_range', 'symbol', 'prices', 'result', 'url')
+
+# Poids entraînés sur data/signals_corpus.jsonl (python signalFilter.py --train)
+DEFAULT_WEIGHTS = {
+    'bias': -4.159, 'sl_level': 0.708, 'tp_level': 0.708, 'sl_word': 0.157, 'tp_word': 0.496, 'direction': 0.708,
+    'entry': 2.397, 'entry_range': 1.013, 'symbol': 1.032, 'prices': 1.382, 'result': -0.374, 'url': -0.163
+}
+
+
+def features(text):
+    """
+    Vecteur de caractéristiques d'un message (ordre de FEATURES, valeurs dans [0, 1]).
+    Mots-clés sur frontières de mots: "slow" ne contient pas de SL, "http" pas de TP.
+
+    Args:
+        text (str): Texte du message
+
+    Returns:
+        list: Valeurs des caractéristiques
+    """
+    lower = (text or '').lower()
+    url = 'http://' in lower or 'https://' in lower or 't.me/' in lower
+    sl_word = tp_word = sl_level = tp_level = direction = entry = entry_range = symbol = result = False
+    numbers = 0
+    pending, budget = None, 0          # mot-clé en attente de son prix ('sl', 'tp', 'entry')
+    previous = before = None
+    # "XAU/USD" → "XAUUSD"
+    for token in TOKEN.findall(lower.replace('/', '')):
+        if token[0].isdigit():
+            numbers += 1
+            if pending == 'sl':
+                sl_level = True
+            elif pending == 'tp':
+                tp_level = True
+            elif pending == 'entry':
+                entry = True
+            if previous == '-' and before is not None and before[0].isdigit():
+                entry_range = True
+            pending = None
+        elif token[0] == '+':
+            result = True
+            pending = None
+        elif token in SL_WORDS or (token == 'loss' and previous == 'stop'):
+            sl_word = True
+            pending, budget = 'sl', 0
+        elif token in TP_WORDS or (token == 'profit' and previous == 'take'):
+            tp_word = True
+            pending, budget = 'tp', 0
+        elif token in DIRECTION_WORDS:
+            direction = True
+            pending, budget = 'entry', 2
+        elif token in FILLERS:
+            pass
+        else:
+            if token in RESULT_WORDS:
+                result = True
+            elif token in SYMBOL_WORDS or (len(token) in (6, 7) and token[:3] in CURRENCIES and token[3:] in CURRENCIES):
+                symbol = True
+            if token == '\n' or budget == 0:
+                pending = None
+            else:
+                budget -= 1
+        before, previous = previous, token
+    return [1.0, float(sl_level), float(tp_level), float(sl_word), float(tp_word), float(direction), float(entry),
+            float(entry_range), float(symbol), min(numbers, 5) / 5, float(result), float(url)]
+
+
+class SignalFilter:
+    """Classifieur logistique: score de probabilité qu'un message soit un signal exploitable."""
+
+    def __init__(self, weights=None, threshold=None):
+        """
+        Args:
+            weights (dict): {caractéristique: poids} (défaut: modèle de config.SIGNAL_FILTER_MODEL ou DEFAULT_WEIGHTS)
+            threshold (float): Seuil de décision (défaut: config.SIGNAL_FILTER_THRESHOLD)
+        """
+        if weights is None:
+            weights = self.load_weights(config.SIGNAL_FILTER_MODEL)
+        self.weights = [weights.get(name, 0.0) for name in FEATURES]
+        self.threshold = threshold if threshold is not None else config.SIGNAL_FILTER_THRESHOLD
+
+    @staticmethod
+    def load_weights(path):
+        """Poids d'un modèle entraîné, ou DEFAULT_WEIGHTS si le fichier est absent."""
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)['weights']
+        return DEFAULT_WEIGHTS
+
+    def score(self, text):
+        """Probabilité (0-1) que le message soit un signal."""
+        z = sum(w * x for w, x in zip(self.weights, features(text)))
+        return 1.0 / (1.0 + math.exp(-z))
+
+    def is_signal(self, text):
+        return self.score(text) >= self.threshold
+
+    def train(self, corpus, epochs=2000, learning_rate=0.5, l2=0.01):
+        """
+        Descente de gradient sur la log-vraisemblance (régularisation L2 hors biais).
+
+        Args:
+            corpus (list): [{text, expected}] - un signal si expected n'est pas None
+
+        Returns:
+            dict: Poids appris {caractéristique: poids}
+        """
+        samples = [(features(item['text']), 1.0 if item.get('expected') else 0.0) for item in corpus]
+        weights = [0.0] * len(FEATURES)
+        for _ in range(epochs):
+            gradient = [0.0] * len(weights)
+            for x, y in samples:
+                error = 1.0 / (1.0 + math.exp(-sum(w * v for w, v in zip(weights, x)))) - y
+                for i, value in enumerate(x):
+                    gradient[i] += error * value
+            for i in range(len(weights)):
+                penalty = l2 * weights[i] if i else 0.0
+                weights[i] -= learning_rate * (gradient[i] / len(samples) + penalty)
+        self.weights = weights
+        return {name: round(weight, 3) for name, weight in zip(FEATURES, weights)}
+
+    def evaluate(self, corpus):
+        """
+        Précision et rappel sur un corpus étiqueté (mesurés sur les données
+        d'entraînement si le modèle en est issu: voir cross_validate).
+
+        Returns:
+            dict: {precision, recall, tp, fp, fn, tn, false_positives, false_negatives, latency_us}
+        """
+        start = time.perf_counter()
+        predictions = [self.is_signal(item['text']) for item in corpus]
+        elapsed = time.perf_counter() - start
+        report = confusion(corpus, predictions)
+        report['latency_us'] = elapsed / max(len(corpus), 1) * 1e6
+        return report
+
+    def cross_validate(self, corpus, **train_options):
+        """
+        Validation croisée leave-one-out: chaque message est classé par un modèle
+        entraîné sur tous les autres (estimation honnête sur un petit corpus).
+
+        Args:
+            corpus (list): [{text, expected}]
+            **train_options: Paramètres de train (epochs, learning_rate, l2)
+
+        Returns:
+            dict: {precision, recall, tp, fp, fn, tn, false_positives, false_negatives}
+        """
+        predictions = []
+        for i, item in enumerate(corpus):
+            held_out = SignalFilter(weights={}, threshold=self.threshold)
+            held_out.train(corpus[:i] + corpus[i + 1:], **train_options)
+            predictions.append(held_out.is_signal(item['text']))
+        return confusion(corpus, predictions)
+
+
+def confusion(corpus, predictions):
+    """Matrice de confusion, précision et rappel de prédictions sur un corpus étiqueté."""
+    counts = {'tp': 0, 'fp': 0, 'fn': 0, 'tn': 0}
+    false_positives, false_negatives = [], []
+    for item, predicted in zip(corpus, predictions):
+        actual = item.get('expected') is not None
+        if predicted and actual:
+            counts['tp'] += 1
+        elif predicted:
+            counts['fp'] += 1
+            false_positives.append(item['text'])
+        elif actual:
+            counts['fn'] += 1
+            false_negatives.append(item['text'])
+        else:
+            counts['tn'] += 1
+    return {
+        'precision': counts['tp'] / max(counts['tp'] + counts['fp'], 1),
+        'recall': counts['tp'] / max(counts['tp'] + counts['fn'], 1),
+        **counts,
+        'false_positives': false_positives,
+        'false_negatives': false_negatives,
+    }
+
+
+def main():
+    from benchmark_parser import DEFAULT_CORPUS, load_corpus
+
+    parser = argparse.ArgumentParser(description="Pré-filtre des signaux: entraînement et évaluation")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS)
+    parser.add_argument('--train', action='store_true', help="Entraîner sur le corpus")
+    parser.add_argument('--output', default=config.SIGNAL_FILTER_MODEL, help="Fichier du modèle entraîné")
+    parser.add_argument('--threshold', type=float, help="Seuil de décision")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    signal_filter = SignalFilter(threshold=args.threshold)
+    if args.train:
+        weights = signal_filter.train(corpus)
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'features': FEATURES, 'weights': weights}, file, indent=2)
+        print(f"💾 Modèle: {args.output} {weights}")
+
+    report = signal_filter.evaluate(corpus)
+    print(f"🎯 Entraînement: précision {report['precision']:.2f} | Rappel {report['recall']:.2f} | "
+          f"{report['latency_us']:.1f} µs/message ({len(corpus)} messages)")
+    # Estimation hors échantillon: chaque message classé par un modèle qui ne l'a pas vu
+    report = signal_filter.cross_validate(corpus)
+    print(f"🧪 Leave-one-out: précision {report['precision']:.2f} | Rappel {report['recall']:.2f}")
+    for text in report['false_positives']:
+        print(f"⚠️ Faux positif: {text[:60]!r}")
+    for text in report['false_negatives']:
+        print(f"❌ Signal manqué: {text[:60]!r}")
+
+
+# Instance globale
+signal_filter = SignalFilter()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,5 @@
-import re
 from chatGpt import chatGpt
+from signalFilter import signal_filter
 
 class SignalProcessor:
     def __init__(self, signal, channel_id=1):
@@ -7,11 +7,8 @@ class SignalProcessor:
         self.channel_id = channel_id
 
     def is_signal(self):
-        """Vérifie si le texte contient un signal de trading valide."""
-        sl = r'.*(sl|stop\s*loss|stop).*'
-        tp = r'.*(tp|take\s*profit|take|profit).*'
-        return bool(re.search(sl, self.signal_text, re.IGNORECASE) and 
-                   re.search(tp, self.signal_text, re.IGNORECASE))
+        """Vérifie si le texte contient un signal de trading valide (pré-filtre local)."""
+        return signal_filter.is_signal(self.signal_text)
     
     def get_signal(self):
         """Extrait le signal via ChatGPT et le transforme en 3 signaux individuels."""
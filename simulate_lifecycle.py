@@ -0,0 +1,52 @@
+"""
+Simulation hors terminal de la gestion des trades (LifecycleManager) sur un faux
+MT5 qui déclenche ordres en attente, SL et TP au fil des prix.
+
+Usage:
+    python simulate_lifecycle.py
+    python simulate_lifecycle.py --trailing 150
+"""
+
+import argparse
+
+import fakeMt5
+
+fakeMt5.install(fakeMt5.FakeTerminal(simulate_fills=True))
+
+import MetaTrader5 as mt5  # noqa: E402
+from lifecycleManager import LifecycleManager  # noqa: E402
+from orderRegistry import encode_magic  # noqa: E402
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Simulation de la gestion des trades sur un faux MT5")
+    arg_parser.add_argument("--trailing", type=float, default=0, help="Distance du trailing stop (points)")
+    args = arg_parser.parse_args()
+
+    terminal = mt5.terminal
+    mt5.initialize()
+    manager = LifecycleManager(rules={'trailing_points': args.trailing})
+
+    # Canal 1: 3 jambes au marché, SL commun, TP échelonnés, plus une jambe en attente plus bas
+    bid = terminal.symbols['EURUSD']['bid']
+    ask = terminal.symbols['EURUSD']['ask']
+    print(f"🧪 BUY EURUSD à {ask} - SL -50 pips - TP +20/+40/+60 pips")
+    for leg, tp_pips in enumerate((20, 40, 60), start=1):
+        mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                        'type': mt5.ORDER_TYPE_BUY, 'sl': round(ask - 0.0050, 5),
+                        'tp': round(ask + tp_pips * 0.0001, 5), 'magic': encode_magic(1, 1, leg)})
+    mt5.order_send({'action': mt5.TRADE_ACTION_PENDING, 'symbol': 'EURUSD', 'volume': 0.1,
+                    'type': mt5.ORDER_TYPE_BUY_LIMIT, 'price': round(ask - 0.0030, 5),
+                    'sl': round(ask - 0.0050, 5), 'tp': round(ask + 0.0060, 5), 'magic': encode_magic(1, 1, 4)})
+
+    for pips in (10, 25, 45, 30, 0, -5):
+        terminal.set_price('EURUSD', round(bid + pips * 0.0001, 5))
+        actions = manager.poll()
+        positions = ", ".join(f"#{p.ticket} SL {p.sl}" for p in mt5.positions_get()) or "aucune"
+        print(f"💹 {pips:+d} pips → {len(actions)} action(s) | positions: {positions} | en attente: {len(mt5.orders_get())}")
+
+    print(f"\n📊 {manager.cycles} cycles, {manager.actions_sent} actions, solde {terminal.balance:.2f} {terminal.currency}")
+
+
+if __name__ == "__main__":
+    main()
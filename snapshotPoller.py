@@ -0,0 +1,158 @@
+import hashlib
+import json
+import queue
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from config import config
+
+
+class SnapshotPoller:
+    """
+    Instantané partagé du compte, des positions et des ordres en attente pour l'API.
+    Un seul thread interroge le terminal à cadence fixe; toutes les requêtes HTTP
+    sont servies depuis la mémoire (avec ETag) et les changements de positions
+    sont diffusés aux abonnés du flux SSE.
+    """
+
+    def __init__(self, trading_api, interval=None):
+        self.trading_api = trading_api
+        self.interval = interval if interval is not None else config.API_SNAPSHOT_INTERVAL
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._subscribers = set()
+
+        self.version = 0
+        self.updated_at = None
+        self.account = None
+        self.orders = {}            # id → ordre (format API)
+        self.etags = {'account': None, 'orders': None}
+
+    def start(self):
+        """Premier instantané synchrone puis rafraîchissement en arrière-plan."""
+        self.refresh()
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="api-snapshot", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=self.interval + 1)
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"❌ Erreur instantané API: {e}")
+
+    def refresh(self):
+        """
+        Interroge le terminal (thread MT5) et publie les changements.
+        Terminal déconnecté ou muet: le dernier instantané reste servi tel quel,
+        sans événement, pour qu'une reconnexion ne passe pas pour un changement.
+        """
+        session = self.trading_api.session
+        if not session.is_connected:
+            return
+        account_future = session.submit(self.trading_api.get_account_info)
+        orders_future = session.submit(self.trading_api.get_open_orders)
+        try:
+            account = account_future.result(timeout=config.API_MT5_TIMEOUT)
+            orders = orders_future.result(timeout=config.API_MT5_TIMEOUT)
+        except FutureTimeoutError:
+            account_future.cancel()
+            orders_future.cancel()
+            print(f"⌛ Instantané API non rafraîchi: pas de réponse MT5 en {config.API_MT5_TIMEOUT:.0f} s")
+            return
+        if account is None or orders is None:
+            return
+        new_orders = {order['id']: order for order in orders}
+
+        with self._lock:
+            changed = [order for order_id, order in new_orders.items() if self.orders.get(order_id) != order]
+            removed = [order_id for order_id in self.orders if order_id not in new_orders]
+            account_changed = account != self.account
+
+            if not (changed or removed or account_changed) and self.updated_at is not None:
+                self.updated_at = time.time()
+                return
+
+            self.version += 1
+            self.updated_at = time.time()
+            self.account = account
+            self.orders = new_orders
+            self.etags['account'] = self._etag(account)
+            self.etags['orders'] = self._etag(list(new_orders.values()))
+            event = {
+                'version': self.version,
+                'account': account if account_changed else None,
+                'changed': changed,
+                'removed': removed
+            }
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                # Client trop lent: il recevra un instantané complet à la reconnexion
+                pass
+
+    def get_account(self):
+        with self._lock:
+            return self.account, self.etags['account']
+
+    def get_orders(self):
+        with self._lock:
+            return list(self.orders.values()), self.etags['orders']
+
+    def subscribe(self, maxsize=100):
+        """Abonne un client SSE; retourne une file d'événements."""
+        subscriber = queue.Queue(maxsize=maxsize)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def stream(self, heartbeat=15.0):
+        """
+        Générateur Server-Sent Events: instantané complet puis uniquement les changements.
+
+        Args:
+            heartbeat (float): Intervalle des commentaires keep-alive en secondes
+        """
+        subscriber = self.subscribe()
+        try:
+            with self._lock:
+                initial = {
+                    'version': self.version,
+                    'account': self.account,
+                    'changed': list(self.orders.values()),
+                    'removed': []
+                }
+            yield self._sse('snapshot', initial)
+            while True:
+                try:
+                    event = subscriber.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield self._sse('update', event)
+        finally:
+            self.unsubscribe(subscriber)
+
+    @staticmethod
+    def _sse(event_type, data):
+        return f"event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+    @staticmethod
+    def _etag(data):
+        return hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
@@ -0,0 +1,186 @@
+import threading
+import time
+from collections import deque
+
+
+class _Bucket:
+    """
+    Compteurs d'une fenêtre (global, canal ou symbole): mis à jour à chaque position
+    fermée et diminués quand une position sort de la fenêtre glissante.
+    """
+
+    def __init__(self, span=None):
+        self.span = span                  # durée de la fenêtre en secondes (None = tout)
+        self._reset()
+
+    def _reset(self, entries=()):
+        self.trades = deque()             # (close_time, position_id, pnl, r) par date de clôture
+        self._best = deque()              # candidats max (décroissants)
+        self._worst = deque()             # candidats min (croissants)
+        self.count = 0
+        self.wins = 0
+        self.pnl = 0.0
+        self.r_sum = 0.0
+        self.r_count = 0
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        if self.trades and entry[0] < self.trades[-1][0]:
+            # Clôture hors ordre (rare): réinsertion triée puis recalcul des extrêmes
+            self._reset(sorted([*self.trades, entry], key=lambda item: (item[0], item[1])))
+            return
+
+        close_time, _, pnl, r = entry
+        self.trades.append(entry)
+        self.count += 1
+        self.wins += pnl > 0
+        self.pnl += pnl
+        if r is not None:
+            self.r_sum += r
+            self.r_count += 1
+        while self._best and self._best[-1][2] <= pnl:
+            self._best.pop()
+        self._best.append(entry)
+        while self._worst and self._worst[-1][2] >= pnl:
+            self._worst.pop()
+        self._worst.append(entry)
+
+    def remove(self, position_id):
+        """Retire une position (re-clôture partielle): recalcul complet du bucket."""
+        entries = [entry for entry in self.trades if entry[1] != position_id]
+        if len(entries) == len(self.trades):
+            return
+        self._reset(entries)
+
+    def expire(self, now):
+        if self.span is None:
+            return
+        cutoff = now - self.span
+        while self.trades and self.trades[0][0] < cutoff:
+            close_time, _, pnl, r = entry = self.trades.popleft()
+            self.count -= 1
+            self.wins -= pnl > 0
+            self.pnl -= pnl
+            if r is not None:
+                self.r_sum -= r
+                self.r_count -= 1
+            if self._best and self._best[0] is entry:
+                self._best.popleft()
+            if self._worst and self._worst[0] is entry:
+                self._worst.popleft()
+
+    def snapshot(self):
+        return {
+            'totalSignals': self.count,
+            'winRate': round(self.wins / self.count * 100) if self.count else 0,
+            'avgRR': round(self.r_sum / self.r_count, 2) if self.r_count else 0,
+            'totalPnl': round(self.pnl, 2),
+            'bestTrade': self._best[0][2] if self._best else 0,
+            'worstTrade': self._worst[0][2] if self._worst else 0
+        }
+
+
+class StatsEngine:
+    """
+    Statistiques de trading pré-calculées par fenêtre glissante (1j/7j/30j/tout),
+    globalement, par canal et par symbole. Chaque position fermée met à jour les
+    compteurs; la lecture ne fait qu'expirer les positions sorties de la fenêtre.
+    """
+
+    WINDOWS = {'1d': 86400, '7d': 7 * 86400, '30d': 30 * 86400, 'all': None}
+    CHANNELS = (1, 2)
+
+    def __init__(self, account_type='DEMO'):
+        self.account_type = account_type
+        self._lock = threading.Lock()
+        self._positions = {}      # position_id → clés de buckets alimentés
+        self._buckets = {}        # (fenêtre, portée, clé) → _Bucket
+        self._cache = {}          # fenêtre → réponse API déjà assemblée
+        for window in self.WINDOWS:
+            self._bucket(window, 'global', None)
+            for channel in self.CHANNELS:
+                self._bucket(window, 'channel', channel)
+
+    def _bucket(self, window, scope, key):
+        bucket = self._buckets.get((window, scope, key))
+        if bucket is None:
+            bucket = self._buckets[(window, scope, key)] = _Bucket(self.WINDOWS[window])
+        return bucket
+
+    def ingest(self, trade):
+        """
+        Ajoute une position fermée (ligne de DealStore.trades).
+
+        Args:
+            trade (dict): {position_id, channel_id, symbol, pnl, close_time, r_multiple}
+        """
+        entry = (trade['close_time'], trade['position_id'], trade['pnl'], trade.get('r_multiple'))
+        with self._lock:
+            if trade['position_id'] in self._positions:
+                for key in self._positions.pop(trade['position_id']):
+                    self._buckets[key].remove(trade['position_id'])
+
+            keys = []
+            for window in self.WINDOWS:
+                for scope, key in (('global', None), ('channel', trade['channel_id']), ('symbol', trade['symbol'])):
+                    self._bucket(window, scope, key).add(entry)
+                    keys.append((window, scope, key))
+            self._positions[trade['position_id']] = keys
+            self._cache.clear()
+
+    def snapshot(self, window='30d', now=None):
+        """
+        Statistiques au format de /api/statistics.
+
+        Args:
+            window (str): '1d', '7d', '30d' ou 'all'
+            now (float): Horodatage de référence (tests)
+
+        Returns:
+            dict: {global, channels, symbols, accountType, window}
+        """
+        if window not in self.WINDOWS:
+            raise ValueError(f"Fenêtre inconnue: {window}")
+        now = now if now is not None else time.time()
+
+        with self._lock:
+            buckets = {key: bucket for key, bucket in self._buckets.items() if key[0] == window}
+            expired = False
+            for bucket in buckets.values():
+                before = bucket.count
+                bucket.expire(now)
+                expired = expired or bucket.count != before
+            if not expired and window in self._cache:
+                return self._cache[window]
+
+            global_stats = buckets[(window, 'global', None)].snapshot()
+            symbols = []
+            for (_, scope, key), bucket in sorted(buckets.items(), key=lambda item: str(item[0][2])):
+                if scope != 'symbol' or not bucket.count:
+                    continue
+                stats = bucket.snapshot()
+                symbols.append({
+                    'symbol': key,
+                    'totalTrades': stats['totalSignals'],
+                    'winRate': stats['winRate'],
+                    'avgRR': stats['avgRR'],
+                    'totalPnl': stats['totalPnl']
+                })
+
+            result = {
+                'global': {
+                    'winRate': global_stats['winRate'],
+                    'avgRR': global_stats['avgRR'],
+                    'totalSignals': global_stats['totalSignals']
+                },
+                'channels': {
+                    f'channel{channel}': buckets[(window, 'channel', channel)].snapshot()
+                    for channel in self.CHANNELS
+                },
+                'symbols': symbols,
+                'accountType': self.account_type,
+                'window': window
+            }
+            self._cache[window] = result
+            return result
@@ -0,0 +1,202 @@
+"""
+Recherche de paramètres sur le backtester: chaque combinaison de la grille
+(risque par signal, poids des jambes, échelle d'entrées du canal 2, breakeven,
+expiration des ordres en attente...) est rejouée sur tous les signaux historiques
+dans un pool de processus. Les ticks sont écrits une fois en .npy puis mappés
+en mémoire par chaque worker (pages partagées, rien n'est sérialisé par tâche).
+
+Usage:
+    python sweep.py --grid grid.json --registry --from 20260101 --to 20260331 --specs cache/specs.json
+    python sweep.py --grid grid.json --signals signals.jsonl --from 20260101 --to 20260331 --output sweep.parquet
+
+Exemple de grille:
+    {"risk_per_signal_eur": [100, 300], "leg_weights": [[1, 1, 1], [2, 1, 1]],
+     "channel2_ladder": [[0, 0.5, 1], [0, 0.25, 0.5]], "breakeven_after_tp1": [true, false],
+     "pending_expiry_minutes": [60, 240]}
+"""
+
+import argparse
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+from config import config
+
+# Configurations par tâche: amortit l'aller-retour entre processus
+BATCH_SIZE = 16
+
+# État du processus worker
+_worker = {}
+
+
+def expand_grid(grid):
+    """
+    Produit cartésien d'une grille {paramètre: [valeurs]}.
+
+    Returns:
+        list: Une surcharge de règles (dict) par combinaison
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def share_ticks(ticks, folder):
+    """
+    Écrit les ticks (et leurs horodatages contigus) de chaque symbole en .npy.
+
+    Returns:
+        dict: {symbole: (chemin des ticks, chemin des horodatages)}
+    """
+    os.makedirs(folder, exist_ok=True)
+    paths = {}
+    for symbol, array in ticks.items():
+        ticks_path = os.path.join(folder, f"{symbol}.npy")
+        times_path = os.path.join(folder, f"{symbol}.times.npy")
+        np.save(ticks_path, array)
+        np.save(times_path, np.ascontiguousarray(array['time_msc']))
+        paths[symbol] = (ticks_path, times_path)
+    return paths
+
+
+def _init_worker(paths, specs, signals, time_offset, fake_mt5=False):
+    """Mappe les ticks partagés et garde signaux et spécifications pour toutes les tâches."""
+    if fake_mt5:
+        import fakeMt5
+        fakeMt5.install()
+
+    # Import après l'installation éventuelle du faux module (constantes MT5)
+    from backtester import Backtester
+
+    ticks = {symbol: np.load(ticks_path, mmap_mode='r') for symbol, (ticks_path, _) in paths.items()}
+    times = {symbol: np.load(times_path, mmap_mode='r') for symbol, (_, times_path) in paths.items()}
+    _worker.update(backtester_class=Backtester, ticks=ticks, times=times, specs=specs,
+                   signals=signals, time_offset=time_offset)
+
+
+def _worker_run(batch):
+    """Backteste un lot de configurations; une ligne de résultats par configuration."""
+    from backtester import summarize
+    rows = []
+    for number, rules in batch:
+        start = time.perf_counter()
+        backtester = _worker['backtester_class'](_worker['ticks'], _worker['specs'], rules,
+                                                 _worker['time_offset'], times=_worker['times'])
+        summary = summarize(backtester.run(_worker['signals']))
+        row = {'config': number}
+        row.update({name: json.dumps(value) if isinstance(value, (list, tuple)) else value
+                    for name, value in rules.items()})
+        for scope, stats in summary.items():
+            for metric, value in stats.items():
+                row[metric if scope == 'global' else f"{scope}_{metric}"] = value
+        row['duration_ms'] = round((time.perf_counter() - start) * 1000, 2)
+        rows.append(row)
+    return rows
+
+
+def run_sweep(grid, ticks, specs, signals, workers=None, time_offset=0.0, folder=None, fake_mt5=False):
+    """
+    Lance toutes les combinaisons de la grille dans un pool de processus.
+
+    Args:
+        grid (dict): {paramètre de Backtester: [valeurs]}
+        ticks (dict): {symbole: ticks TICK_DTYPE}
+        specs (dict): Spécifications (backtester.symbol_specs)
+        signals (list): Signaux horodatés
+        workers (int): Nombre de processus (défaut: nombre de cœurs)
+        time_offset (float): Décalage horloge signaux → ticks en secondes
+        folder (str): Dossier des ticks partagés (défaut: TICK_DATA_DIR/sweep)
+        fake_mt5 (bool): Faux module MetaTrader5 dans les workers (tests hors Windows)
+
+    Returns:
+        list: Lignes de résultats triées par P&L décroissant
+    """
+    configs = expand_grid(grid)
+    paths = share_ticks(ticks, folder or os.path.join(config.TICK_DATA_DIR, 'sweep'))
+    batches = [list(enumerate(configs))[i:i + BATCH_SIZE] for i in range(0, len(configs), BATCH_SIZE)]
+    print(f"🧪 {len(configs)} configuration(s) × {len(signals)} signaux sur {workers or os.cpu_count()} processus")
+
+    start = time.perf_counter()
+    rows = []
+    # spawn: même comportement sous Windows et pas de fork d'un processus qui a des threads MT5
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(paths, specs, signals, time_offset, fake_mt5)) as executor:
+        futures = [executor.submit(_worker_run, batch) for batch in batches]
+        for done, future in enumerate(as_completed(futures), start=1):
+            rows.extend(future.result())
+            if done % 10 == 0 or done == len(futures):
+                print(f"⏳ {len(rows)}/{len(configs)} configurations en {time.perf_counter() - start:.1f} s")
+
+    rows.sort(key=lambda row: row['pnl_eur'], reverse=True)
+    return rows
+
+
+def write_results(rows, path):
+    """Écrit la table de résultats en CSV, ou en Parquet si l'extension le demande (pandas + pyarrow)."""
+    if not rows:
+        return path
+    if path.endswith('.parquet'):
+        try:
+            import pandas as pd
+            pd.DataFrame(rows).to_parquet(path, index=False)
+            return path
+        except ImportError:
+            path = path[:-len('.parquet')] + '.csv'
+            print(f"❌ pandas/pyarrow requis pour Parquet - écriture en CSV: {path}")
+
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    with open(path, 'w', newline='', encoding='utf-8') as file:
+        writer = csv.DictWriter(file, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+    return path
+
+
+def main():
+    from backtester import load_signals, load_tick_range, symbol_specs
+
+    parser = argparse.ArgumentParser(description="Recherche de paramètres sur le backtester")
+    parser.add_argument('--grid', required=True, help="Grille JSON {paramètre: [valeurs]}")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--signals', help="Fichier JSONL de signaux horodatés")
+    source.add_argument('--registry', action='store_true', help="Signaux du registre des ordres")
+    parser.add_argument('--from', dest='first_day', required=True, help="Premier jour (AAAAMMJJ)")
+    parser.add_argument('--to', dest='last_day', required=True, help="Dernier jour (AAAAMMJJ)")
+    parser.add_argument('--specs', help="Spécifications JSON (sinon lues sur le terminal)")
+    parser.add_argument('--account', default='DEMO', help="Compte MT5 pour lire les spécifications")
+    parser.add_argument('--server-offset', type=float, default=0.0, help="Décalage horaire du serveur (heures)")
+    parser.add_argument('--workers', type=int, help="Nombre de processus (défaut: nombre de cœurs)")
+    parser.add_argument('--output', default='sweep_results.csv', help="Table de résultats (.csv ou .parquet)")
+    args = parser.parse_args()
+
+    with open(args.grid, encoding='utf-8') as file:
+        grid = json.load(file)
+    if args.registry:
+        from orderRegistry import OrderRegistry
+        signals = OrderRegistry().signal_history()
+    else:
+        signals = load_signals(args.signals)
+    symbols = sorted({signal['symbol'] for signal in signals})
+
+    if args.specs:
+        with open(args.specs, encoding='utf-8') as file:
+            specs = json.load(file)
+    else:
+        from mt5Session import get_session
+        specs = get_session(args.account).submit(symbol_specs, symbols).result()
+
+    ticks = {symbol: load_tick_range(symbol, args.first_day, args.last_day) for symbol in symbols}
+    rows = run_sweep(grid, ticks, specs, signals, workers=args.workers, time_offset=args.server_offset * 3600)
+
+    for row in rows[:5]:
+        params = {name: row[name] for name in grid}
+        print(f"🏆 {row['pnl_eur']:.2f}€ | win {row['win_rate']}% | R {row['avg_r']} | DD {row['max_drawdown_eur']}€ | {params}")
+    print(f"💾 Résultats: {write_results(rows, args.output)}")
+
+
+if __name__ == '__main__':
+    main()
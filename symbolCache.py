@@ -0,0 +1,164 @@
+import threading
+import time
+import MetaTrader5 as mt5
+from config import config
+
+
+class SymbolSpecCache:
+    """
+    Cache des spécifications de symboles MT5 partagé par Infos, RiskManager et SendOrder.
+    Les champs statiques (digits, point, volume_step...) sont gardés pour la session,
+    les champs dynamiques (tick_value) sont rafraîchis selon leur TTL.
+    """
+
+    def __init__(self, field_ttls=None):
+        # TTL par champ en secondes (None = valable pour toute la session)
+        self.field_ttls = field_ttls if field_ttls is not None else {
+            'tick_value': config.SYMBOL_TICK_VALUE_TTL
+        }
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+
+    def get(self, symbol):
+        """
+        Retourne les spécifications du symbole, depuis le cache si possible.
+
+        Args:
+            symbol (str): Symbole de l'instrument
+
+        Returns:
+            dict: Spécifications du symbole ou None si erreur
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(symbol)
+
+        if entry is None:
+            spec = self._load(symbol)
+            if spec is None:
+                return None
+            with self._lock:
+                self.misses += 1
+                self._entries[symbol] = {'spec': spec, 'loaded_at': {field: now for field in spec}}
+            return dict(spec)
+
+        stale = [
+            field for field, ttl in self.field_ttls.items()
+            if ttl is not None and now - entry['loaded_at'].get(field, 0) > ttl
+        ]
+        if stale:
+            self._refresh(symbol, entry, stale, now)
+        else:
+            with self._lock:
+                self.hits += 1
+
+        return dict(entry['spec'])
+
+    def refresh(self):
+        """
+        Rafraîchit par anticipation, à mi-TTL, les champs dynamiques des symboles en
+        cache (thread MT5, tâche de fond): un signal n'attend jamais un symbol_info.
+
+        Returns:
+            int: Nombre de symboles rafraîchis
+        """
+        now = time.monotonic()
+        with self._lock:
+            entries = list(self._entries.items())
+
+        refreshed = 0
+        for symbol, entry in entries:
+            stale = [
+                field for field, ttl in self.field_ttls.items()
+                if ttl is not None and now - entry['loaded_at'].get(field, 0) > ttl / 2
+            ]
+            if stale:
+                self._refresh(symbol, entry, stale, now)
+                refreshed += 1
+        return refreshed
+
+    def invalidate(self, symbol=None):
+        """Invalide un symbole (ou tout le cache si symbol est None)."""
+        with self._lock:
+            if symbol is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(symbol, None)
+
+    def stats(self):
+        """Compteurs de hits/misses du cache."""
+        with self._lock:
+            total = self.hits + self.misses + self.refreshes
+            return {
+                'symbols': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'hit_rate': round(self.hits / total, 4) if total else 0.0
+            }
+
+    def _refresh(self, symbol, entry, fields, now):
+        """Rafraîchit uniquement les champs périmés (le symbole est déjà sélectionné)."""
+        try:
+            symbol_info = mt5.symbol_info(symbol)
+        except Exception as e:
+            print(f"Erreur lors du rafraîchissement de {symbol}: {e}")
+            symbol_info = None
+
+        if not symbol_info:
+            # On garde l'ancienne valeur plutôt que d'échouer
+            with self._lock:
+                self.hits += 1
+            return
+
+        fresh = self._to_spec(symbol, symbol_info)
+        with self._lock:
+            self.refreshes += 1
+            for field in fields:
+                entry['spec'][field] = fresh[field]
+                entry['loaded_at'][field] = now
+
+    def _load(self, symbol):
+        """Charge les spécifications complètes d'un symbole depuis MT5."""
+        try:
+            # Sélectionner le symbole
+            if not mt5.symbol_select(symbol, True):
+                print(f"Impossible de sélectionner le symbole {symbol}")
+                return None
+
+            # Obtenir les informations du symbole
+            symbol_info = mt5.symbol_info(symbol)
+            if not symbol_info:
+                print(f"Impossible d'obtenir les informations pour {symbol}")
+                return None
+
+            return self._to_spec(symbol, symbol_info)
+
+        except Exception as e:
+            print(f"Erreur lors de la récupération des informations du symbole {symbol}: {e}")
+            return None
+
+    @staticmethod
+    def _to_spec(symbol, symbol_info):
+        return {
+            'symbol': symbol,
+            'digits': symbol_info.digits,
+            'point': symbol_info.point,
+            'pip_size': symbol_info.point * (10 if symbol_info.digits == 5 or symbol_info.digits == 3 else 1),
+            'tick_size': symbol_info.trade_tick_size,
+            'tick_value': symbol_info.trade_tick_value,
+            'contract_size': symbol_info.trade_contract_size,
+            'min_lot': symbol_info.volume_min,
+            'max_lot': symbol_info.volume_max,
+            'lot_step': symbol_info.volume_step,
+            'currency_base': symbol_info.currency_base,
+            'currency_profit': symbol_info.currency_profit,
+            'currency_margin': symbol_info.currency_margin
+        }
+
+
+# Instance globale
+symbol_cache = SymbolSpecCache()
@@ -0,0 +1,144 @@
+import re
+import threading
+import MetaTrader5 as mt5
+from config import config
+from fxConverter import fx_converter
+
+# Alias usuels: le premier nom de chaque groupe est la forme canonique (celle du prompt GPT)
+ALIAS_GROUPS = (
+    ('XAUUSD', 'GOLD'),
+    ('XAGUSD', 'SILVER'),
+    ('US30', 'DJ30', 'WS30', 'DJI30', 'USA30', 'DOW30', 'DOWJONES'),
+    ('NAS100', 'US100', 'USTEC', 'NDX100', 'NASDAQ'),
+    ('SPX500', 'US500', 'SP500', 'USA500'),
+    ('GER40', 'DE40', 'DAX40', 'GER30', 'DE30', 'DAX'),
+    ('UK100', 'FTSE100'),
+    ('USOIL', 'WTI', 'XTIUSD', 'CRUDE'),
+    ('UKOIL', 'BRENT', 'XBRUSD'),
+)
+
+
+def normalize(name):
+    """
+    Clé de recherche d'un nom de symbole: majuscules, sans séparateurs de paire
+    ni suffixe de courtier (XAU/USD, XAUUSD.m, BTCUSD#, EURUSDm → XAUUSD, BTCUSD, EURUSD).
+
+    Args:
+        name (str): Nom de symbole (signal ou courtier)
+
+    Returns:
+        str: Clé normalisée
+    """
+    joined = re.sub(r'[/\s]', '', name or '')
+    head = re.split(r'[^A-Za-z0-9]', joined, maxsplit=1)[0] or joined
+    # Suffixe en minuscules (EURUSDm, XAUUSDpro) seulement derrière un nom en majuscules
+    stripped = head.rstrip('abcdefghijklmnopqrstuvwxyz')
+    if len(stripped) >= 3 and stripped.isupper():
+        head = stripped
+    return head.upper()
+
+
+class SymbolResolver:
+    """
+    Résolution des symboles des signaux vers les noms du courtier (XAUUSD → XAUUSD.m,
+    GOLD...). L'index est construit une fois depuis symbols_get (clés normalisées,
+    paires base/profit, alias et surcharges utilisateur), puis chaque recherche est
+    O(1) et mise en cache. L'index est reconstruit quand la liste du courtier change.
+    """
+
+    def __init__(self, overrides=None):
+        """
+        Args:
+            overrides (dict): {symbole du signal: symbole du courtier} (défaut: config.SYMBOL_OVERRIDES)
+        """
+        overrides = overrides if overrides is not None else config.SYMBOL_OVERRIDES
+        self.overrides = {normalize(alias): symbol for alias, symbol in overrides.items()}
+        self._lock = threading.Lock()
+        self._index = None          # clé normalisée → symbole du courtier
+        self._resolved = {}         # nom demandé → symbole du courtier (ou None)
+        self._symbols_total = None
+        self.builds = 0
+
+    def resolve(self, symbol):
+        """
+        Retourne le nom du symbole chez le courtier (thread MT5 au premier appel).
+
+        Args:
+            symbol (str): Symbole du signal (ex: XAUUSD, XAU/USD, GOLD)
+
+        Returns:
+            str: Symbole du courtier ou None si introuvable
+        """
+        if symbol in self._resolved:
+            return self._resolved[symbol]
+
+        with self._lock:
+            if self._index is None:
+                self._build()
+            key = normalize(symbol)
+            resolved = self.overrides.get(key) or self._index.get(key)
+            self._resolved[symbol] = resolved
+        if resolved is None:
+            print(f"❌ Symbole {symbol} introuvable chez le courtier")
+        elif resolved != symbol:
+            print(f"🔤 Symbole {symbol} → {resolved}")
+        return resolved
+
+    def refresh_if_changed(self):
+        """
+        Reconstruit l'index si le nombre de symboles du courtier a changé (thread MT5).
+
+        Returns:
+            bool: True si l'index a été reconstruit
+        """
+        total = mt5.symbols_total()
+        if not total or total == self._symbols_total:
+            return False
+        with self._lock:
+            self._build()
+        # Le graphe de conversion repose sur la même liste de symboles
+        fx_converter.invalidate()
+        print(f"🔤 Liste des symboles modifiée: index reconstruit ({total} symboles)")
+        return True
+
+    def invalidate(self):
+        with self._lock:
+            self._index = None
+            self._resolved = {}
+            self._symbols_total = None
+
+    def _build(self):
+        symbols = mt5.symbols_get() or ()
+        candidates = {}
+        for info in symbols:
+            name = info.name
+            keys = {name.upper(), normalize(name)}
+            base, profit = getattr(info, 'currency_base', ''), getattr(info, 'currency_profit', '')
+            if base and profit and base != profit:
+                keys.add(f"{base}{profit}".upper())
+            for key in keys:
+                # Nom exact, puis nom normalisé, puis symbole visible, puis nom le plus court
+                rank = (name.upper() != key, normalize(name) != key, not getattr(info, 'visible', False), len(name))
+                if key not in candidates or rank < candidates[key][0]:
+                    candidates[key] = (rank, name)
+
+        index = {key: name for key, (_, name) in candidates.items()}
+        for group in ALIAS_GROUPS:
+            target = next((index[alias] for alias in group if alias in index), None)
+            if target is None:
+                continue
+            for alias in group:
+                index.setdefault(alias, target)
+        # Crypto cotée en USDT dans les signaux (BTCUSDT), en USD chez le courtier (BTCUSD)
+        for key, name in list(index.items()):
+            if len(key) > 3 and key.endswith('USD'):
+                index.setdefault(f"{key}T", name)
+
+        self._index = index
+        self._resolved = {}
+        self._symbols_total = len(symbols)
+        self.builds += 1
+
+
+# Instance globale
+symbol_resolver = SymbolResolver()
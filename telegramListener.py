@@ -2,9 +2,20 @@ import asyncio
 from telethon import TelegramClient, events
 from config import config
 from chatGpt import chatGpt
+from localParser import LocalParser
+from signalFilter import signal_filter
+from signalCache import SignalCache
+from orderRegistry import OrderRegistry
 from order import SendOrder
-from riskManager import RiskManager
-import re
+from accountFanout import AccountFanout
+from riskManager import LIVE_LEGS, RiskManager
+from exposureBook import ExposureBook
+from lifecycleManager import LifecycleManager
+from symbolResolver import symbol_resolver
+from tickRecorder import tick_recorder
+from warmUp import keep_warm, warm_up_symbols
+from mt5Executor import run_mt5, shutdown_mt5_executor
+from tracing import SignalTrace, tracer
 
 class TradingBot:
     def __init__(self, risk_per_signal_eur, account_type):
@@ -28,9 +39,18 @@ class TradingBot:
         
         # Composants
         self.client = None
+        self.pending_tasks = set()
+        # Messages en cours de traitement: (canal, message) → événement de fin
+        self.in_flight = {}
         print(f"🔧 DEBUG TradingBot: Création SendOrder avec account_type='{self.account_type}'")
         self.order_sender = SendOrder(self.account_type)
         self.risk_manager = RiskManager(risk_per_signal_eur)
+        self.signal_cache = SignalCache()
+        self.order_registry = OrderRegistry()
+        self.exposure_book = ExposureBook()
+        self.lifecycle = LifecycleManager(order_registry=self.order_registry)
+        # Comptes supplémentaires: même signal, un processus MT5 par compte
+        self.fanout = AccountFanout(config.MT5_FANOUT_ACCOUNTS, risk_per_signal_eur) if config.MT5_FANOUT_ACCOUNTS else None
         
     async def start(self):
         """Démarre le bot."""
@@ -53,6 +73,27 @@ class TradingBot:
         if not self.order_sender.is_connected:
             print(f"❌ MT5 non connecté sur le compte {self.account_type}")
             return False
+        self.order_sender.session.start_heartbeat()
+        
+        # Symboles, spécifications et taux chargés avant le premier signal
+        warm_up = await run_mt5(warm_up_symbols)
+        tick_recorder.add_symbols(warm_up['ready'])
+        
+        # Exposition actuelle du compte (limite MAX_RISK_PERCENTAGE)
+        open_risk = await run_mt5(self.exposure_book.sync)
+        summary = self.exposure_book.summary()
+        print(f"🛡️ Risque ouvert: {open_risk:.2f}€ / {summary['cap_eur']}€ ({self.exposure_book.max_risk_percentage}%)")
+        self.run_in_background(self.exposure_sync_loop())
+        self.run_in_background(self.signal_cache_purge_loop())
+        self.run_in_background(self.lifecycle_loop())
+        self.run_in_background(self.symbol_refresh_loop())
+        self.run_in_background(self.tick_record_loop())
+        
+        # Démarrer les terminaux des comptes fan-out avant le premier signal
+        if self.fanout:
+            status = await asyncio.to_thread(self.fanout.warm_up)
+            for account, connected in status.items():
+                print(f"{'✅' if connected else '❌'} Fan-out {account}: {'connecté' if connected else 'non connecté'}")
         
         # Vérifier canaux
         try:
@@ -67,42 +108,102 @@ class TradingBot:
         @self.client.on(events.NewMessage(chats=[self.channel_1_id, self.channel_2_id]))
         async def handle_message(event):
             message_text = event.message.text
-            chat_id = event.chat_id
-            
-            # Identifier le canal
-            if chat_id == self.channel_1_id:
-                channel_id = 1
-            elif chat_id == self.channel_2_id:
-                channel_id = 2
-            else:
+            channel_id = self.get_channel_number(event.chat_id)
+            if channel_id is None:
                 return
             
             print(f"\n📨 Message Canal {channel_id}: {message_text[:50]}...")
-            await self.process_message(message_text, channel_id)
+            # Traitement en tâche de fond: le handler rend la main immédiatement
+            self.run_in_background(self.process_message(message_text, channel_id, event.message.date, event.message.id))
+        
+        # Éditions: mise à jour incrémentale des ordres déjà placés
+        @self.client.on(events.MessageEdited(chats=[self.channel_1_id, self.channel_2_id]))
+        async def handle_edit(event):
+            message_text = event.message.text
+            channel_id = self.get_channel_number(event.chat_id)
+            if channel_id is None:
+                return
+            
+            print(f"\n✏️ Message édité Canal {channel_id}: {message_text[:50]}...")
+            self.run_in_background(self.process_edit(message_text, channel_id, event.message.id, event.message.date))
+        
+        # Suppressions: annulation des ordres encore en attente
+        @self.client.on(events.MessageDeleted(chats=[self.channel_1_id, self.channel_2_id]))
+        async def handle_deletion(event):
+            channel_id = self.get_channel_number(event.chat_id)
+            if channel_id is None:
+                return
+            
+            for message_id in event.deleted_ids:
+                print(f"\n🗑️ Message supprimé Canal {channel_id}: #{message_id}")
+                self.run_in_background(self.process_deletion(channel_id, message_id))
         
         print(f"🎧 Écoute active sur DID → {self.account_type}...")
         return True
     
-    async def process_message(self, message_text, channel_id):
-        """Traite un message."""
+    def get_channel_number(self, chat_id):
+        """Identifie le canal (1 ou 2) à partir de l'ID du chat."""
+        if chat_id == self.channel_1_id:
+            return 1
+        if chat_id == self.channel_2_id:
+            return 2
+        return None
+    
+    def run_in_background(self, coroutine):
+        """Lance une tâche en gardant une référence jusqu'à sa fin."""
+        task = asyncio.create_task(coroutine)
+        self.pending_tasks.add(task)
+        task.add_done_callback(self.pending_tasks.discard)
+        return task
+    
+    async def extract_signal(self, message_text, channel_id):
+        """Extraction: cache, puis parser local, ChatGPT seulement si confiance insuffisante."""
+        signal_data = self.signal_cache.get(message_text, channel_id)
+        if signal_data:
+            print("🗃️ Signal déjà extrait (cache)")
+            return signal_data
+        
+        parser = LocalParser(message_text, channel_id)
+        signal_data = parser.get_signal()
+        
+        if signal_data:
+            print(f"⚡ Signal extrait localement (confiance {parser.confidence:.2f})")
+        else:
+            print(f"🤖 Confiance locale faible ({parser.confidence:.2f}) → ChatGPT")
+            gpt = chatGpt(message_text, channel_id)
+            signal_data = await gpt.get_signal_async()
+        
+        if signal_data:
+            self.signal_cache.put(message_text, channel_id, signal_data)
+        return signal_data
+    
+    async def process_message(self, message_text, channel_id, message_date=None, message_id=None):
+        """Traite un message. Retourne le signal extrait et validé, ou None."""
+        trace = SignalTrace(channel_id, message_date)
+        key = (channel_id, message_id)
+        done = None
+        if message_id is not None and key not in self.in_flight:
+            done = self.in_flight[key] = asyncio.Event()
+        # Réservation anti-doublon libérée si aucun ordre n'est placé (rejet, échec, exception)
+        claimed = placed = False
         try:
-            # 1. Vérifier si signal (has tp + has sl)
-            if not self.has_tp_sl(message_text):
+            # 1. Pré-filtre local: les messages de discussion n'atteignent pas l'extraction
+            with trace.span('filter'):
+                is_signal = signal_filter.is_signal(message_text)
+            if not is_signal:
                 print("ℹ️ Pas un signal")
                 return
             
             print("✅ Signal détecté!")
             
-            # 2. Envoyer à ChatGPT
-            gpt = chatGpt(message_text, channel_id)
-            signal_data = gpt.get_signal()
+            # 2. Extraction
+            with trace.span('extraction'):
+                signal_data = await self.extract_signal(message_text, channel_id)
             
             if not signal_data:
                 print("❌ ChatGPT n'a pas pu extraire le signal")
                 return
             
-            print("✅ Signal extrait par ChatGPT")
-            
             # 3. Vérifier cohérence
             if not self.validate_signal(signal_data):
                 print("❌ Signal incohérent")
@@ -110,29 +211,214 @@ class TradingBot:
             
             print("✅ Signal validé")
             
-            # 4. Créer 3 ordres individuels
-            orders = self.create_orders(signal_data)
+            # Nom du symbole chez le courtier, avant dimensionnement et placement
+            signal_data = await self.resolve_symbol(signal_data)
+            if not signal_data:
+                return
             
-            # 5. Calculer les tailles de lot
-            lot_sizes = self.risk_manager.calculate_lot_sizes(orders)
+            # 4. Anti-doublon: reposts et copies transférées ne sont exécutés qu'une fois
+            if not self.signal_cache.claim(message_text, channel_id):
+                print("🔁 Signal déjà exécuté - ordres non replacés")
+                return signal_data
+            claimed = True
             
-            # 6. Placer les ordres sur le compte spécifié
-            print(f"📈 Placement des ordres sur le compte {self.account_type}...")
-            results = self.order_sender.place_orders(orders, lot_sizes)
+            # 5. Créer 3 ordres individuels (canal et signal encodés dans le magic number)
+            signal_id = self.order_registry.next_signal_id(channel_id, message_id)
+            orders = self.create_orders(signal_data, channel_id, signal_id)
+            
+            # 6. Calculer les tailles de lot (appels MT5 → thread dédié)
+            with trace.span('sizing'):
+                lot_sizes = await run_mt5(self.risk_manager.calculate_lot_sizes, orders)
+            
+            # 7. Limite de risque du compte puis placement, sérialisés entre signaux
+            async with self.exposure_book.gate:
+                lot_sizes = await self.apply_risk_limit(orders, lot_sizes)
+                if lot_sizes is None:
+                    return signal_data
+                
+                if self.fanout:
+                    # Comptes fan-out en tâche de fond (dimensionnés avec leur propre budget):
+                    # un compte lent ou bloqué ne retarde ni ce signal ni les suivants
+                    self.run_in_background(self.fanout.execute(orders))
+                
+                print(f"📈 Placement des ordres sur le compte {self.account_type}...")
+                with trace.span('placement'):
+                    results = await self.order_sender.place_orders_async(orders, lot_sizes)
+                placed = bool(results)
+                
+                if results:
+                    await run_mt5(self.exposure_book.record_results, results)
+            
+            for result in results:
+                trace.add_leg(result['order_number'], result['submit_time'], result['ack_time'], result['filled'])
             
             if results:
+                self.order_registry.record_signal(channel_id, message_id, signal_data, results, signal_id)
                 print(f"🎉 {len(results)} ordres placés sur {self.account_type}!")
             else:
                 print(f"❌ Échec placement ordres sur {self.account_type}")
+            
+            return signal_data
                 
         except Exception as e:
             print(f"❌ Erreur: {e}")
+        finally:
+            if claimed and not placed:
+                # Rien n'a été placé: un repost ultérieur pourra être exécuté
+                self.signal_cache.release(message_text, channel_id)
+            if done is not None:
+                del self.in_flight[key]
+                done.set()
+            tracer.finish(trace)
+            if 'extraction' in trace.durations:
+                details = " | ".join(f"{stage} {duration:.0f} ms" for stage, duration in trace.durations.items())
+                print(f"⏱️ Canal {channel_id} - {details}")
     
-    def has_tp_sl(self, text):
-        """Vérifie si le message contient TP et SL."""
-        has_tp = bool(re.search(r'(tp|take.?profit)', text, re.IGNORECASE))
-        has_sl = bool(re.search(r'(sl|stop.?loss)', text, re.IGNORECASE))
-        return has_tp and has_sl
+    async def apply_risk_limit(self, orders, lot_sizes):
+        """
+        Contrôle un signal dimensionné contre MAX_RISK_PERCENTAGE du solde.
+        
+        Returns:
+            list: Tailles de lot (inchangées ou réduites), None si le signal est rejeté
+        """
+        return await run_mt5(self.exposure_book.fit, orders, lot_sizes, self.risk_manager)
+    
+    async def resolve_symbol(self, signal_data):
+        """Remplace le symbole du signal par celui du courtier (None si introuvable)."""
+        symbol = await run_mt5(symbol_resolver.resolve, signal_data['symbol'])
+        if not symbol:
+            return None
+        tick_recorder.add_symbols([symbol])
+        return signal_data if symbol == signal_data['symbol'] else {**signal_data, 'symbol': symbol}
+    
+    async def symbol_refresh_loop(self):
+        """Reconstruit l'index des symboles quand la liste du courtier change."""
+        while True:
+            await asyncio.sleep(config.SYMBOL_RESOLVER_REFRESH_INTERVAL)
+            try:
+                await run_mt5(symbol_resolver.refresh_if_changed)
+            except Exception as e:
+                print(f"❌ Erreur rafraîchissement des symboles: {e}")
+    
+    async def tick_record_loop(self):
+        """
+        Enregistre les ticks de l'univers actif et les écrit périodiquement sur disque.
+        Garde aussi tick_value et taux de conversion chauds pour le prochain signal.
+        """
+        last_flush = asyncio.get_running_loop().time()
+        while True:
+            await asyncio.sleep(config.TICK_RECORDER_INTERVAL)
+            try:
+                await run_mt5(tick_recorder.poll)
+                await run_mt5(keep_warm)
+                if asyncio.get_running_loop().time() - last_flush >= config.TICK_RECORDER_FLUSH_INTERVAL:
+                    last_flush = asyncio.get_running_loop().time()
+                    await asyncio.to_thread(tick_recorder.flush)
+            except Exception as e:
+                print(f"❌ Erreur enregistrement des ticks: {e}")
+    
+    async def signal_cache_purge_loop(self):
+        """Purge le cache des signaux au démarrage puis à chaque TTL (la base SQLite ne grossit pas sans fin)."""
+        while True:
+            try:
+                purged = await asyncio.to_thread(self.signal_cache.purge)
+                if purged:
+                    print(f"🧹 Cache des signaux: {purged} entrée(s) expirée(s) supprimée(s)")
+            except Exception as e:
+                print(f"❌ Erreur purge du cache des signaux: {e}")
+            await asyncio.sleep(max(self.signal_cache.ttl, 60))
+    
+    async def exposure_sync_loop(self):
+        """Rapproche périodiquement le livre d'exposition des positions/ordres du terminal."""
+        while True:
+            await asyncio.sleep(config.EXPOSURE_SYNC_INTERVAL)
+            try:
+                await run_mt5(self.exposure_book.sync)
+            except Exception as e:
+                print(f"❌ Erreur synchronisation exposition: {e}")
+    
+    async def lifecycle_loop(self):
+        """Gestion des trades ouverts: breakeven, trailing, expiration et annulation des jambes."""
+        while True:
+            await asyncio.sleep(config.LIFECYCLE_POLL_INTERVAL)
+            try:
+                await asyncio.wrap_future(self.order_sender.session.submit(self.lifecycle.poll))
+            except Exception as e:
+                print(f"❌ Erreur gestion des trades: {e}")
+    
+    async def process_edit(self, message_text, channel_id, message_id, message_date=None):
+        """
+        Traite l'édition d'un message: diff entre le nouveau signal et celui enregistré,
+        puis modifications minimales des ordres déjà placés (pas d'annuler-remplacer).
+        """
+        try:
+            await self.wait_in_flight(channel_id, message_id)
+            record = self.order_registry.get_signal(channel_id, message_id)
+            if record is None:
+                # Aucun ordre pour ce message: l'édition peut en faire un nouveau signal
+                return await self.process_message(message_text, channel_id, message_date, message_id)
+            
+            old_signal, legs = record
+            if not signal_filter.is_signal(message_text):
+                print("ℹ️ Édition sans signal - ordres inchangés")
+                return None
+            
+            new_signal = await self.extract_signal(message_text, channel_id)
+            if not new_signal or not self.validate_signal(new_signal):
+                print("❌ Signal édité incohérent - ordres inchangés")
+                return None
+            
+            new_signal = await self.resolve_symbol(new_signal)
+            if not new_signal:
+                return None
+            
+            if new_signal == old_signal:
+                print("ℹ️ Édition sans changement de niveaux")
+                return new_signal
+            
+            changes = await asyncio.wrap_future(
+                self.order_sender.session.submit(self.order_sender.update_orders, legs, new_signal)
+            )
+            for change in changes or []:
+                if change['action'] == 'REMOVE':
+                    self.order_registry.remove_leg(change['ticket'])
+                else:
+                    self.order_registry.update_leg(change['ticket'], entry=change['entry'], sl=change['sl'], tp=change['tp'])
+            self.order_registry.update_signal(channel_id, message_id, new_signal)
+            
+            print(f"✏️ {len(changes or [])} modification(s) appliquée(s) sur {self.account_type}")
+            return new_signal
+            
+        except Exception as e:
+            print(f"❌ Erreur édition: {e}")
+            return None
+    
+    async def wait_in_flight(self, channel_id, message_id):
+        """Attend la fin du traitement du message d'origine (édition/suppression reçue pendant l'extraction)."""
+        # Boucle: une autre édition du même message peut avoir repris le traitement entre-temps
+        while (channel_id, message_id) in self.in_flight:
+            print(f"⏳ Message {message_id} encore en traitement - modification différée")
+            await self.in_flight[(channel_id, message_id)].wait()
+    
+    async def process_deletion(self, channel_id, message_id):
+        """Traite la suppression d'un message: annule les ordres encore en attente."""
+        try:
+            await self.wait_in_flight(channel_id, message_id)
+            record = self.order_registry.get_signal(channel_id, message_id)
+            if record is None:
+                return []
+            
+            _, legs = record
+            changes = await asyncio.wrap_future(self.order_sender.session.submit(self.order_sender.cancel_orders, legs))
+            for change in changes or []:
+                self.order_registry.remove_leg(change['ticket'])
+            
+            print(f"🗑️ {len(changes or [])} ordre(s) en attente annulé(s), positions ouvertes conservées")
+            return changes or []
+            
+        except Exception as e:
+            print(f"❌ Erreur suppression: {e}")
+            return []
     
     def validate_signal(self, signal_data):
         """Valide la cohérence du signal."""
@@ -170,7 +456,7 @@ class TradingBot:
         except Exception:
             return False
     
-    def create_orders(self, signal_data):
+    def create_orders(self, signal_data, channel_id=None, signal_id=None):
         """Crée 3 ordres individuels."""
         orders = []
         
@@ -180,7 +466,9 @@ class TradingBot:
                 'sens': signal_data['sens'],
                 'entry_price': signal_data['entry_prices'][i],
                 'sl': signal_data['sl'],
-                'tp': signal_data['tps'][i]
+                'tp': signal_data['tps'][i],
+                'channel_id': channel_id,
+                'signal_id': signal_id
             }
             orders.append(order)
         
@@ -195,7 +483,13 @@ class TradingBot:
             except KeyboardInterrupt:
                 print("\n⏹️ Arrêt du bot")
             finally:
+                tick_recorder.flush()
                 self.order_sender.close_connection()
+                self.signal_cache.close()
+                self.order_registry.close()
+                if self.fanout:
+                    self.fanout.close()
+                shutdown_mt5_executor()
 
 def get_account_selection():
     """Demande le choix du compte MT5 à l'utilisateur."""
@@ -258,8 +552,16 @@ async def main():
     print(f"\n✅ Configuration:")
     print(f"📱 Telegram: DID (fixe)")
     print(f"📈 MT5: {mt5_account}")
+    if config.MT5_FANOUT_ACCOUNTS:
+        print(f"🔀 Fan-out: {', '.join(config.MT5_FANOUT_ACCOUNTS)}")
     print(f"💰 Risque: {risk_per_signal}€ par signal")
-    print(f"📊 Répartition: {risk_per_signal/3:.2f}€ par position")
+    try:
+        RiskManager.validate_leg_weights(config.LEG_RISK_WEIGHTS, LIVE_LEGS)
+    except ValueError as e:
+        print(f"❌ Configuration invalide: {e}")
+        return
+    split = " / ".join(f"{risk:.2f}€" for risk in RiskManager.leg_budgets(risk_per_signal, LIVE_LEGS, config.LEG_RISK_WEIGHTS))
+    print(f"📊 Répartition: {split} par position")
     print("🔄 Arrondi: Toujours à l'inférieur")
     print("🛡️ Garantie: Risque jamais dépassé")
     
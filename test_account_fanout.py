@@ -0,0 +1,81 @@
+"""
+Tests du fan-out multi-comptes: un processus worker par faux terminal MT5.
+"""
+
+import asyncio
+import fakeMt5
+
+fakeMt5.install()
+
+from accountFanout import AccountFanout  # noqa: E402
+
+ORDERS = [
+    {'symbol': 'EURUSD', 'sens': 'BUY', 'entry_price': 1.0800, 'sl': 1.0750, 'tp': 1.0850,
+     'channel_id': 1, 'signal_id': 1},
+    {'symbol': 'EURUSD', 'sens': 'BUY', 'entry_price': 1.0800, 'sl': 1.0750, 'tp': 1.0900,
+     'channel_id': 1, 'signal_id': 1},
+    {'symbol': 'EURUSD', 'sens': 'BUY', 'entry_price': 1.0800, 'sl': 1.0750, 'tp': 1.0950,
+     'channel_id': 1, 'signal_id': 1},
+]
+
+
+def test_fanout_sizes_and_places_per_account():
+    fanout = AccountFanout(
+        ['ALPHA', 'BETA'], risk_per_signal_eur=30.0,
+        fake_terminals={'ALPHA': {'login': 111}, 'BETA': {'login': 222, 'order_latency': 0.05}}
+    )
+    try:
+        assert fanout.warm_up() == {'ALPHA': True, 'BETA': True}
+        reports = asyncio.run(fanout.execute(ORDERS))
+    finally:
+        fanout.close()
+
+    assert set(reports) == {'ALPHA', 'BETA'}
+    for report in reports.values():
+        assert report['error'] is None
+        assert len(report['results']) == 3
+        assert report['latency_ms'] >= report['execution_ms']
+    # Latence d'envoi simulée sur BETA uniquement
+    assert reports['BETA']['execution_ms'] > reports['ALPHA']['execution_ms']
+
+
+def test_account_risk_budget(monkeypatch):
+    monkeypatch.setenv('MT5_GAMMA_RISK_EUR', '900')
+    fanout = AccountFanout(['GAMMA', 'DELTA'], risk_per_signal_eur=300.0,
+                           fake_terminals={'GAMMA': {'login': 333}, 'DELTA': {'login': 444}})
+    try:
+        reports = asyncio.run(fanout.execute(ORDERS))
+    finally:
+        fanout.close()
+
+    assert fanout.risks == {'GAMMA': 900.0, 'DELTA': 300.0}
+    assert sum(reports['GAMMA']['lot_sizes']) > sum(reports['DELTA']['lot_sizes'])
+
+
+def test_disconnected_account_fails_fast():
+    # Connexion refusée: erreur immédiate au lieu d'un appel en file jamais rejoué
+    fanout = AccountFanout(['ALPHA', 'OMEGA'], risk_per_signal_eur=30.0,
+                           fake_terminals={'ALPHA': {'login': 111}, 'OMEGA': {'login': 555, 'reject_login': True}})
+    try:
+        assert fanout.warm_up() == {'ALPHA': True, 'OMEGA': False}
+        reports = asyncio.run(fanout.execute(ORDERS))
+    finally:
+        fanout.close()
+
+    assert reports['ALPHA']['error'] is None and len(reports['ALPHA']['results']) == 3
+    assert reports['OMEGA']['error'] == "terminal MT5 déconnecté"
+    assert reports['OMEGA']['results'] == []
+
+
+def test_fanout_account_risk_cap():
+    # Solde de 100€: limite de 7€, en dessous des 3 lots minimum du signal
+    fanout = AccountFanout(['ALPHA', 'SMALL'], risk_per_signal_eur=30.0,
+                           fake_terminals={'ALPHA': {'login': 111}, 'SMALL': {'login': 666, 'balance': 100.0}})
+    try:
+        reports = asyncio.run(fanout.execute(ORDERS))
+    finally:
+        fanout.close()
+
+    assert len(reports['ALPHA']['results']) == 3
+    assert reports['SMALL']['error'] == "limite de risque du compte atteinte"
+    assert reports['SMALL']['results'] == []
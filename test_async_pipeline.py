@@ -0,0 +1,77 @@
+"""
+Tests du pipeline asynchrone: signaux des deux canaux traités en parallèle,
+appels MT5 dans le thread dédié sans bloquer la boucle asyncio.
+"""
+
+import asyncio
+import threading
+import time
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+
+
+CHANNEL_1 = "EURUSD BUY NOW @ 1.0800\nSL @ 1.0750\nTP1 @ 1.0900\nTP2 @ 1.0950\nTP3 @ 1.1000"
+CHANNEL_2 = "XAUUSD sell 2335-38\ntp 2320\nsl 2345"
+
+
+def make_bot(**terminal_options):
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal(**terminal_options))
+    from fxConverter import fx_converter
+    from symbolCache import symbol_cache
+    from symbolResolver import symbol_resolver
+    from telegramListener import TradingBot
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    symbol_resolver.invalidate()
+    return terminal, TradingBot(30.0, 'DEMO')
+
+
+def test_channels_processed_concurrently():
+    terminal, bot = make_bot()
+    extract_signal = bot.extract_signal
+
+    async def slow_extract(message_text, channel_id):
+        # Extraction lente (ex: ChatGPT): les deux messages attendent en même temps
+        await asyncio.sleep(0.3)
+        return await extract_signal(message_text, channel_id)
+
+    bot.extract_signal = slow_extract
+
+    async def run():
+        return await asyncio.gather(bot.process_message(CHANNEL_1, 1, message_id=1),
+                                    bot.process_message(CHANNEL_2, 2, message_id=2))
+
+    start = time.perf_counter()
+    signals = asyncio.run(run())
+    assert time.perf_counter() - start < 0.55
+    assert [signal['symbol'] for signal in signals] == ['EURUSD', 'XAUUSD']
+    assert len(terminal.orders) + len(terminal.positions) == 6
+
+
+def test_mt5_calls_do_not_block_event_loop():
+    terminal, bot = make_bot(order_latency=0.05)
+    threads = []
+    order_send = terminal.order_send
+
+    def recording_send(request):
+        threads.append(threading.current_thread().name)
+        return order_send(request)
+
+    mt5.order_send = recording_send
+
+    async def run():
+        ticks = 0
+        task = asyncio.create_task(bot.process_message(CHANNEL_1, 1, message_id=3))
+        # Pendant les 3 envois (150 ms), la boucle continue de servir les autres tâches
+        while not task.done():
+            await asyncio.sleep(0.01)
+            ticks += 1
+        await task
+        return ticks
+
+    ticks = asyncio.run(run())
+    assert len(threads) == 3 and all(name.startswith('mt5') for name in threads)
+    assert ticks >= 10
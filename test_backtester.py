@@ -0,0 +1,110 @@
+"""
+Tests du backtester: décision marché / en attente, SL/TP, breakeven et annulations.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import numpy as np
+import fakeMt5
+
+fakeMt5.install()
+
+from backtester import Backtester, bars_to_ticks, first_hit, main, summarize, symbol_specs  # noqa: E402
+from fxConverter import fx_converter  # noqa: E402
+from symbolCache import symbol_cache  # noqa: E402
+from tickRecorder import TICK_DTYPE  # noqa: E402
+
+T0 = 1_800_000_000
+RULES = {'risk_per_signal_eur': 300, 'breakeven_after_tp1': True, 'cancel_pending_on_tp1': True,
+         'cancel_on_sl': True, 'pending_expiry_minutes': 240, 'reaction_seconds': 1}
+
+
+def path(bids, spread=0.20, step_ms=10_000):
+    """Ticks XAUUSD: un bid toutes les step_ms millisecondes à partir de T0."""
+    ticks = np.zeros(len(bids), dtype=TICK_DTYPE)
+    ticks['time_msc'] = T0 * 1000 + np.arange(len(bids)) * step_ms
+    ticks['bid'] = bids
+    ticks['ask'] = np.asarray(bids) + spread
+    return ticks
+
+
+def specs():
+    fakeMt5.install(fakeMt5.FakeTerminal())
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    return symbol_specs(['XAUUSD'])
+
+
+def signal(**fields):
+    return {'time': T0 + 5, 'channel_id': 1, 'symbol': 'XAUUSD', 'sens': 'BUY', 'sl': 2320.0,
+            'entry_prices': [2330.0, 2330.0, 2330.0], 'tps': [2335.0, 2340.0, 2345.0], **fields}
+
+
+def test_first_hit_spans_chunks():
+    ticks = path(np.full(20000, 2330.0))
+    ticks['bid'][15000] = 2300.0
+    assert first_hit(ticks, 0, len(ticks), [('bid', '>=', 2400.0), ('bid', '<=', 2310.0)]) == (15000, 1)
+    assert first_hit(ticks, 0, 15000, [('bid', '<=', 2310.0)]) == (None, None)
+
+
+def test_tp1_moves_remaining_legs_to_breakeven():
+    bids = [2329.80, 2329.80, 2333.0, 2335.2, 2336.0, 2338.0, 2331.0, 2329.0, 2325.0]
+    trades = Backtester({'XAUUSD': path(bids)}, specs(), RULES).run([signal()])
+    assert [trade['order'] for trade in trades] == ['market'] * 3
+    assert [trade['status'] for trade in trades] == ['tp', 'breakeven', 'breakeven']
+    assert trades[0]['open_price'] == 2330.0 and trades[0]['close_price'] == 2335.0
+    assert trades[0]['pnl_eur'] > 0 and abs(trades[0]['r_multiple'] - 0.5) < 1e-3
+    # Sortie au breakeven: au prix d'entrée (ou pire en cas de gap)
+    assert trades[1]['close_price'] == 2329.0 and trades[1]['pnl_eur'] < 0
+
+
+def test_ladder_pending_leg_cancelled_on_tp1():
+    # Canal 2: vente en fourchette 2330-2336 — la jambe basse part au marché, les autres en limite
+    bids = [2330.0, 2330.0, 2333.5, 2325.0, 2319.0, 2318.0, 2337.0]
+    sell = signal(channel_id=2, sens='SELL', sl=2340.0, entry_prices=[2330.0, 2333.0, 2336.0],
+                  tps=[2320.0, 2320.0, 2320.0])
+    trades = Backtester({'XAUUSD': path(bids, spread=0.0)}, specs(), RULES).run([sell])
+    assert [trade['order'] for trade in trades] == ['market', 'limit', 'limit']
+    assert [trade['status'] for trade in trades] == ['tp', 'tp', 'cancelled']
+    assert trades[1]['open_price'] == 2333.0
+
+    stats = summarize(trades)
+    assert stats['channel2']['legs'] == 2 and stats['channel2']['wins'] == 2
+
+
+def test_sl_gap_fills_at_market():
+    bids = [2330.0, 2330.0, 2341.0, 2342.0]
+    sell = signal(sens='SELL', sl=2340.0, tps=[2320.0, 2315.0, 2310.0])
+    trades = Backtester({'XAUUSD': path(bids, spread=0.0)}, specs(), RULES).run([sell])
+    assert [trade['status'] for trade in trades] == ['sl'] * 3
+    assert trades[0]['close_price'] == 2341.0
+    assert trades[0]['r_multiple'] < -1
+    stats = summarize(trades)
+    assert stats['global']['max_drawdown_eur'] == -stats['global']['pnl_eur']
+
+
+def test_pending_expires_and_bars_replay():
+    rates = np.zeros(3, dtype=[('time', 'i8'), ('open', 'f8'), ('high', 'f8'), ('low', 'f8'),
+                               ('close', 'f8'), ('spread', 'i8')])
+    rates['time'] = T0 + np.arange(3) * 60
+    rates['open'], rates['high'], rates['low'], rates['close'] = 2340.0, 2341.0, 2339.0, 2340.5
+    rules = {**RULES, 'pending_expiry_minutes': 1}
+    limit = signal(entry_prices=[2330.0, 2330.0, 2330.0])
+    trades = Backtester({'XAUUSD': bars_to_ticks(rates, 0.01)}, specs(), rules).run([limit])
+    assert [trade['status'] for trade in trades] == ['expired'] * 3
+    assert all(trade['pnl_eur'] == 0.0 for trade in trades)
+
+
+def test_main_without_trades_writes_no_csv(monkeypatch):
+    # Aucun signal sur la période: pas d'IndexError sur l'en-tête du CSV
+    with tempfile.TemporaryDirectory() as directory:
+        signals, spec_file, output = (os.path.join(directory, name) for name in ('signals.jsonl', 'specs.json', 'legs.csv'))
+        open(signals, 'w').close()
+        with open(spec_file, 'w') as file:
+            json.dump({}, file)
+        monkeypatch.setattr(sys, 'argv', ['backtester.py', '--signals', signals, '--specs', spec_file,
+                                          '--from', '20270101', '--to', '20270102', '--output', output])
+        main()
+        assert not os.path.exists(output)
@@ -0,0 +1,85 @@
+"""
+Tests de l'historique local incrémental contre un faux terminal MT5.
+"""
+
+from datetime import datetime, timedelta
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+from dealStore import DealStore  # noqa: E402
+from orderRegistry import OrderRegistry, decode_magic, encode_magic  # noqa: E402
+
+
+def round_trip(symbol, comment='', magic=0):
+    """Ouvre puis ferme une position au marché."""
+    opened = mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': symbol, 'volume': 0.1,
+                             'type': mt5.ORDER_TYPE_BUY, 'comment': comment, 'magic': magic})
+    mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': symbol, 'volume': 0.1,
+                    'type': mt5.ORDER_TYPE_SELL, 'position': opened.order})
+    return opened.order
+
+
+def make_store():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    store = DealStore(terminal.login_id, ':memory:',
+                      channel_resolver=lambda deal: 2 if 'Canal-2' in deal['comment'] else 1)
+    return terminal, store
+
+
+def test_sync_is_incremental():
+    terminal, store = make_store()
+    round_trip('EURUSD')
+    assert store.sync(min_interval=0) == 2
+    assert store.sync(min_interval=0) == 0
+
+    round_trip('XAUUSD')
+    assert store.sync(min_interval=0) == 2
+    assert store.stats() == {'deals': 4, 'trades': 2, 'last_sync': store.last_sync}
+
+
+def test_open_position_is_not_a_trade():
+    terminal, store = make_store()
+    mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                    'type': mt5.ORDER_TYPE_BUY})
+    store.sync(min_interval=0)
+    assert store.trades() == []
+
+
+def test_indexed_filters():
+    terminal, store = make_store()
+    round_trip('EURUSD', comment='Canal-2 Ordre 1')
+    round_trip('XAUUSD')
+    store.sync(min_interval=0)
+
+    assert [t['symbol'] for t in store.trades(channel_id=2)] == ['EURUSD']
+    assert [t['channel_id'] for t in store.trades(symbol='XAUUSD')] == [1]
+    assert store.trades(since=datetime.now() + timedelta(days=1)) == []
+
+
+def test_magic_round_trip():
+    magic = encode_magic(2, 12345678, 3)
+    assert decode_magic(magic) == {'channel_id': 2, 'signal_id': 2345678, 'leg': 3}
+    assert decode_magic(234002) == {'channel_id': None, 'signal_id': None, 'leg': 2}
+    assert decode_magic(0) is None and decode_magic(42) is None
+
+
+def test_attribution_and_backfill():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    registry = OrderRegistry(':memory:')
+    encoded = round_trip('EURUSD', comment='Signal-1-DEMO', magic=encode_magic(2, 7, 1))
+    legacy = round_trip('XAUUSD', comment='Signal-1-DEMO', magic=234001)
+
+    # Sans registre: tout est attribué au canal 1 (ancien comportement)
+    store = DealStore(terminal.login_id, ':memory:')
+    store.sync(min_interval=0)
+    assert {t['channel_id'] for t in store.trades()} == {1}
+
+    # Ticket de l'ancien format connu du registre, puis backfill
+    registry.record_signal(2, 99, {}, [{'mt5_order_id': legacy, 'order_number': 1, 'symbol': 'XAUUSD',
+                                        'type': 'BUY', 'volume': 0.1, 'price': 0, 'sl': 0, 'tp': 0}])
+    store.channel_resolver = lambda deal: registry.channel_for(deal['magic'], deal['position_id']) or 1
+    assert store.reattribute() == 2
+    assert {t['position_id']: t['channel_id'] for t in store.trades()} == {encoded: 2, legacy: 2}
+    assert store.reattribute() == 0
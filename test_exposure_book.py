@@ -0,0 +1,109 @@
+"""
+Tests du livre d'exposition et de la limite MAX_RISK_PERCENTAGE.
+"""
+
+import asyncio
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+from exposureBook import ExposureBook  # noqa: E402
+
+
+def leg(ticket, sl, volume=0.1, price=1.1000, sens='BUY'):
+    return {'mt5_order_id': ticket, 'symbol': 'EURUSD', 'type': sens, 'price': price, 'sl': sl, 'volume': volume}
+
+
+def test_check_scales_and_rejects():
+    book = ExposureBook(max_risk_percentage=5)
+    book.balance = 1000.0      # limite: 50€
+    book.total_risk = 20.0
+    assert book.check(30.0) == 1.0
+    assert book.check(60.0) == 0.5
+    book.total_risk = 50.0
+    assert book.check(1.0) == 0.0
+    # Solde inconnu: limite invérifiable, le signal est rejeté
+    book.balance = None
+    assert book.check(1.0) == 0.0
+
+
+def test_incremental_sync():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    book = ExposureBook()
+    opened = mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                             'type': mt5.ORDER_TYPE_BUY, 'sl': 1.0800})
+    position = mt5.positions_get(ticket=opened.order)[0]
+    book.record_results([leg(opened.order, 1.0800, price=position.price_open)])
+    risk = book.total_risk
+    assert risk > 0
+
+    # Instantané identique: aucun recalcul
+    calls = terminal.calls['symbol_info']
+    book.sync()
+    assert book.total_risk == risk and terminal.calls['symbol_info'] == calls
+
+    # SL au breakeven: plus de risque; position fermée: retirée du livre
+    mt5.order_send({'action': mt5.TRADE_ACTION_SLTP, 'position': opened.order, 'sl': position.price_open})
+    book.sync()
+    assert book.total_risk == 0.0 and len(book.entries) == 1
+    mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                    'type': mt5.ORDER_TYPE_SELL, 'position': opened.order})
+    book.sync()
+    assert book.entries == {}
+    assert book.balance == terminal.balance
+
+
+def test_fx_risk_uses_point_value():
+    # 50 pips sur EURUSD (5 décimales = 500 points): risque = 50 × valeur du pip, pas 500 ×
+    fakeMt5.install(fakeMt5.FakeTerminal())
+    from fxConverter import fx_converter
+    from info import Infos
+    from riskManager import RiskManager
+    from symbolCache import symbol_cache
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    risk = RiskManager.leg_risk('EURUSD', 'BUY', 1.0850, 1.0800, 1.0)
+    assert abs(risk - 50 * Infos.get_pip_value_eur('EURUSD')) < 1e-6
+
+    lot_sizes = RiskManager(300.0).calculate_lot_sizes(
+        [{'symbol': 'EURUSD', 'sens': 'BUY', 'entry_price': 1.0850, 'sl': 1.0800}] * 3)
+    assert ExposureBook.signal_risk(
+        [{'symbol': 'EURUSD', 'sens': 'BUY', 'entry_price': 1.0850, 'sl': 1.0800}] * 3, lot_sizes) <= 300.0
+    assert lot_sizes[0] > 0.1
+
+
+def test_leg_weights_split_and_mismatch():
+    from riskManager import RiskManager
+    assert list(RiskManager.leg_budgets(100.0, 3, [2, 1, 1])) == [50.0, 25.0, 25.0]
+    # Signal à 4 jambes avec 3 poids: parts égales, pas d'erreur
+    assert list(RiskManager.leg_budgets(100.0, 4, [2, 1, 1])) == [25.0] * 4
+    # Au lancement: un poids par jambe live, poids valides
+    for weights in ([1, 1], [1, 1, 1, 1], [0, 0, 0], [2, -1, 1]):
+        try:
+            RiskManager(100.0, leg_weights=weights)
+        except ValueError:
+            continue
+        raise AssertionError(f"poids {weights} acceptés")
+
+
+def test_concurrent_signals_cannot_both_pass():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal(balance=1500.0))   # limite 7%: 105€
+    from fxConverter import fx_converter
+    from symbolCache import symbol_cache
+    from telegramListener import TradingBot
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    bot = TradingBot(100.0, 'DEMO')
+    texts = [
+        "EURUSD BUY NOW @ 1.0852\nSL 1.0800\nTP1 1.0900\nTP2 1.0950\nTP3 1.1000",
+        "GBPUSD BUY NOW @ 1.2702\nSL 1.2650\nTP1 1.2750\nTP2 1.2800\nTP3 1.2850",
+    ]
+
+    async def run():
+        return await asyncio.gather(*(bot.process_message(text, 1) for text in texts))
+
+    asyncio.run(run())
+    # Chaque signal risque ~100€: le second ne tient pas dans le reste (3 lots minimum ≈ 13€)
+    assert len(terminal.positions) + len(terminal.orders) == 3
+    assert bot.exposure_book.total_risk <= bot.exposure_book.cap
@@ -0,0 +1,66 @@
+"""
+Tests du moteur de conversion FX contre un faux module MT5 (univers synthétique).
+"""
+
+import fakeMt5
+
+fakeMt5.install()
+
+from fxConverter import ConversionEngine  # noqa: E402
+
+
+def make_engine(universe=None, rate_ttl=60.0):
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal(universe=universe))
+    return terminal, ConversionEngine(rate_ttl=rate_ttl)
+
+
+def test_direct_and_inverse_pairs():
+    terminal, engine = make_engine()
+    # EURUSD existe: USD → EUR = 1 / bid
+    assert abs(engine.rate_to_eur('USD') - 1 / 1.085) < 1e-12
+    # EURGBP existe: GBP → EUR = 1 / bid
+    assert abs(engine.rate_to_eur('GBP') - 1 / 0.8543) < 1e-12
+    assert engine.rate_to_eur('EUR') == 1.0
+
+
+def test_multi_hop_cross_rate():
+    terminal, engine = make_engine()
+    # Pas de paire JPY/EUR: JPY → USD → EUR
+    expected = (1 / 151.2) * (1 / 1.085)
+    assert abs(engine.rate_to_eur('JPY') - expected) < 1e-12
+    # BTC → USD → EUR
+    assert abs(engine.rate_to_eur('BTC') - 64000 / 1.085) < 1e-6
+
+
+def test_missing_currency_returns_none():
+    terminal, engine = make_engine()
+    assert engine.rate_to_eur('ZAR') is None
+
+
+def test_lookups_are_cached_after_warm_up():
+    terminal, engine = make_engine()
+    engine.warm_up(['USD', 'JPY', 'CHF'])
+    calls = dict(terminal.calls)
+    for _ in range(1000):
+        engine.rate_to_eur('JPY')
+        engine.rate_to_eur('CHF')
+    assert dict(terminal.calls) == calls
+
+
+def test_single_batched_snapshot_on_expiry():
+    terminal, engine = make_engine(rate_ttl=0.0)
+    engine.warm_up(['USD', 'JPY'])
+    terminal.set_price('USDJPY', 160.0)
+    before = terminal.calls['symbols_get']
+    rate = engine.rate_to_eur('JPY')
+    assert terminal.calls['symbols_get'] == before + 1
+    assert terminal.calls['symbol_info_tick'] == 0
+    assert abs(rate - (1 / 160.0) * (1 / 1.085)) < 1e-12
+
+
+def test_invalidate_rebuilds_graph():
+    terminal, engine = make_engine()
+    assert engine.rate_to_eur('ZAR') is None
+    terminal.add_symbol('USDZAR', 'USD', 'ZAR', 18.5, digits=5)
+    engine.invalidate()
+    assert abs(engine.rate_to_eur('ZAR') - (1 / 18.5) * (1 / 1.085)) < 1e-12
@@ -0,0 +1,210 @@
+"""
+Tests du client d'extraction GPT contre un faux serveur HTTP local
+(réutilisation des connexions, 429 + Retry-After, hedging, limite de concurrence, mode JSON).
+"""
+
+import fakeMt5
+
+fakeMt5.install()
+
+import asyncio  # noqa: E402
+import json  # noqa: E402
+import threading  # noqa: E402
+import time  # noqa: E402
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # noqa: E402
+from chatGpt import GptClient  # noqa: E402
+from config import config  # noqa: E402
+
+SIGNAL = {"symbol": "XAUUSD", "sens": "BUY", "sl": 2314.9, "entry_prices": [2320, 2320, 2320], "tps": [2330, 2340, 2350]}
+
+
+class StubServer:
+    """
+    Faux /v1/chat/completions: chaque requête consomme le prochain scénario
+    (statut, délai, contenu, en-têtes); le dernier est répété.
+    """
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server.server_port}/v1"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _next(self, body):
+        with self._lock:
+            self.requests.append(body)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self.script.pop(0) if len(self.script) > 1 else self.script[0]
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # keep-alive
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                stub.connections.add(self.client_address)
+                status, delay, content, headers = stub._next(body)
+                time.sleep(delay)
+                if status == 200:
+                    payload = {
+                        'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()),
+                        'model': body['model'],
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': content}}],
+                        'usage': {'prompt_tokens': 1, 'completion_tokens': 1, 'total_tokens': 2}
+                    }
+                else:
+                    payload = {'error': {'message': content, 'type': 'rate_limit', 'code': None}}
+                data = json.dumps(payload).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header('Content-Type', 'application/json')
+                    self.send_header('Content-Length', str(len(data)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except OSError:
+                    pass    # requête annulée par le client (hedging)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+def _client(stub, **kwargs):
+    options = {'api_key': 'test', 'base_url': stub.base_url, 'model': 'stub-model', 'max_concurrency': 4,
+               'max_retries': 3, 'timeout': 5.0, 'hedge_delay': 0, 'json_mode': True}
+    options.update(kwargs)
+    return GptClient(**options)
+
+
+def test_json_mode_and_connection_reuse():
+    stub = StubServer([(200, 0.0, json.dumps(SIGNAL), {})])
+    try:
+        client = _client(stub)
+
+        async def run():
+            return [await client.extract("signal") for _ in range(5)]
+
+        assert asyncio.run(run()) == [SIGNAL] * 5
+        assert stub.requests[0]['response_format'] == {'type': 'json_object'}
+        assert stub.requests[0]['model'] == 'stub-model'
+        # Requêtes successives sur la même connexion keep-alive
+        assert len(stub.connections) == 1
+    finally:
+        stub.close()
+
+
+def test_rate_limit_retry_after():
+    stub = StubServer([(429, 0.0, "slow down", {'Retry-After': '0'}),
+                       (429, 0.0, "slow down", {'Retry-After': '0'}),
+                       (200, 0.0, json.dumps(SIGNAL), {})])
+    try:
+        client = _client(stub)
+        assert asyncio.run(client.extract("signal")) == SIGNAL
+        assert len(stub.requests) == 3
+        assert client.stats['retries'] == 2
+    finally:
+        stub.close()
+
+
+def test_retries_exhausted_returns_none():
+    stub = StubServer([(429, 0.0, "slow down", {'Retry-After': '0'})])
+    try:
+        client = _client(stub, max_retries=1)
+        assert asyncio.run(client.extract("signal")) is None
+        assert len(stub.requests) == 2
+        assert client.stats['failures'] == 1
+    finally:
+        stub.close()
+
+
+def test_retry_after_beyond_timeout_fails_fast():
+    stub = StubServer([(429, 0.0, "slow down", {'Retry-After': '120'}),
+                       (200, 0.0, json.dumps(SIGNAL), {})])
+    try:
+        client = _client(stub)
+        start = time.perf_counter()
+        assert asyncio.run(client.extract("signal")) is None
+        assert time.perf_counter() - start < 1.0
+        assert len(stub.requests) == 1
+        assert client.stats['failures'] == 1 and client.stats['retries'] == 0
+    finally:
+        stub.close()
+
+
+def test_sync_client_uses_base_url(monkeypatch):
+    import chatGpt as module
+    monkeypatch.setattr(config, 'GPT_KEY', "test")
+    monkeypatch.setattr(config, 'GPT_BASE_URL', "http://127.0.0.1:9/v1")
+    monkeypatch.setattr(module, '_sync_client', None)
+    assert str(module.chatGpt("signal").client.base_url).startswith("http://127.0.0.1:9/v1")
+
+
+def test_hedged_request_wins():
+    # Première requête bloquée: la requête doublée répond avant
+    stub = StubServer([(200, 1.0, json.dumps({"slow": True}), {}),
+                       (200, 0.0, json.dumps(SIGNAL), {})])
+    try:
+        client = _client(stub, hedge_delay=0.1)
+        start = time.perf_counter()
+        assert asyncio.run(client.extract("signal")) == SIGNAL
+        assert time.perf_counter() - start < 0.8
+        assert client.stats['hedged'] == 1
+        assert client.stats['hedge_wins'] == 1
+    finally:
+        stub.close()
+
+
+def test_hedge_delay_follows_p95():
+    client = GptClient(api_key='test', hedge_delay=4.0)
+    assert client.current_hedge_delay() == 4.0
+    client.latencies.extend([0.1] * 95 + [2.0] * 5)
+    assert client.current_hedge_delay() == 0.1
+    assert GptClient(api_key='test', hedge_delay=0).current_hedge_delay() is None
+
+
+def test_concurrency_limit():
+    stub = StubServer([(200, 0.2, json.dumps(SIGNAL), {})])
+    try:
+        client = _client(stub, max_concurrency=2)
+
+        async def run():
+            return await asyncio.gather(*(client.extract(f"signal {i}") for i in range(6)))
+
+        assert asyncio.run(run()) == [SIGNAL] * 6
+        assert stub.max_in_flight == 2
+    finally:
+        stub.close()
+
+
+def test_plain_text_fallback():
+    # Modèle sans mode JSON: l'objet est extrait du texte
+    stub = StubServer([(200, 0.0, f"Voici le signal: {json.dumps(SIGNAL)}", {})])
+    try:
+        client = _client(stub, json_mode=False)
+        assert asyncio.run(client.extract("signal")) == SIGNAL
+        assert 'response_format' not in stub.requests[0]
+    finally:
+        stub.close()
@@ -0,0 +1,93 @@
+"""
+Tests de la gestion des trades après placement, sur un faux MT5 qui déclenche SL/TP.
+"""
+
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+from lifecycleManager import LifecycleManager  # noqa: E402
+from orderRegistry import encode_magic  # noqa: E402
+from symbolCache import symbol_cache  # noqa: E402
+
+NO_RULES = {'breakeven_after_tp1': False, 'cancel_pending_on_tp1': False, 'cancel_on_sl': False,
+            'pending_expiry_minutes': 0, 'trailing_points': 0}
+
+
+def setup_signal(rules, **terminal_options):
+    """3 jambes BUY EURUSD au marché (TP +20/+40/+60 pips) et une jambe en attente."""
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal(simulate_fills=True, **terminal_options))
+    symbol_cache.invalidate()
+    manager = LifecycleManager(rules=dict(NO_RULES, **rules))
+    ask = terminal.symbols['EURUSD']['ask']
+    tickets = []
+    for leg, tp_pips in enumerate((20, 40, 60), start=1):
+        result = mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                                 'type': mt5.ORDER_TYPE_BUY, 'sl': round(ask - 0.0050, 5),
+                                 'tp': round(ask + tp_pips * 0.0001, 5), 'magic': encode_magic(1, 7, leg)})
+        tickets.append(result.order)
+    pending = mt5.order_send({'action': mt5.TRADE_ACTION_PENDING, 'symbol': 'EURUSD', 'volume': 0.1,
+                              'type': mt5.ORDER_TYPE_BUY_LIMIT, 'price': round(ask - 0.0030, 5),
+                              'sl': round(ask - 0.0060, 5), 'tp': round(ask + 0.0060, 5),
+                              'magic': encode_magic(1, 7, 4)})
+    return terminal, manager, ask, tickets, pending.order
+
+
+def move(terminal, bid):
+    terminal.set_price('EURUSD', round(bid, 5))
+
+
+def test_tp1_moves_siblings_to_breakeven_and_cancels_pending():
+    terminal, manager, ask, tickets, pending = setup_signal(
+        {'breakeven_after_tp1': True, 'cancel_pending_on_tp1': True})
+    move(terminal, ask + 0.0025)
+    actions = manager.poll()
+
+    assert {(a['ticket'], a['action']) for a in actions} == {
+        (tickets[1], 'SLTP'), (tickets[2], 'SLTP'), (pending, 'REMOVE')}
+    assert all(p.sl == p.price_open for p in mt5.positions_get())
+    assert mt5.orders_get() == ()
+    # Les deals déjà traités ne redéclenchent rien
+    assert manager.poll() == []
+
+
+def test_sl_hit_cancels_pending_siblings():
+    terminal, manager, ask, tickets, pending = setup_signal({'cancel_on_sl': True})
+    move(terminal, ask - 0.0020)     # au-dessus de la jambe en attente
+    assert manager.poll() == []
+    terminal.orders[pending]['price'] = round(ask - 0.0070, 5)   # jambe en attente hors d'atteinte
+    move(terminal, ask - 0.0060)
+    actions = manager.poll()
+    assert actions == [{'ticket': pending, 'action': 'REMOVE', 'sl': None, 'reason': 'sl_hit'}]
+
+
+def test_pending_expiry():
+    terminal, manager, ask, tickets, pending = setup_signal({'pending_expiry_minutes': 60})
+    assert manager.poll() == []
+    terminal.orders[pending]['time_setup'] -= 2 * 3600
+    assert [a['reason'] for a in manager.poll()] == ['expired']
+
+
+def test_server_time_offset():
+    # Serveur en UTC+3: deals et ordres horodatés 3 h en avance sur l'horloge locale
+    terminal, _, ask, tickets, pending = setup_signal({}, server_offset=3 * 3600)
+    move(terminal, ask + 0.0025)
+    for deal in terminal.deals:
+        deal['time'] -= 60           # TP1 touché une minute avant le démarrage du gestionnaire
+    manager = LifecycleManager(rules=dict(NO_RULES, breakeven_after_tp1=True, pending_expiry_minutes=60))
+
+    # Le deal antérieur au démarrage n'est pas rejoué, l'ordre récent n'expire pas
+    assert manager.poll() == []
+    assert manager.server_offset == 3 * 3600
+    terminal.orders[pending]['time_setup'] -= 2 * 3600
+    assert [a['reason'] for a in manager.poll()] == ['expired']
+
+
+def test_trailing_only_moves_in_profit_direction():
+    terminal, manager, ask, tickets, pending = setup_signal({'trailing_points': 100, 'trailing_step_points': 10})
+    move(terminal, ask + 0.0015)
+    actions = manager.poll()
+    assert {a['sl'] for a in actions} == {round(ask + 0.0005, 5)}
+    move(terminal, ask + 0.0012)      # recul: le SL ne redescend pas
+    assert manager.poll() == []
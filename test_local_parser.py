@@ -0,0 +1,33 @@
+"""
+Tests du parseur local du canal 1 (TP3 "open" ou absent, seuil de confiance).
+"""
+
+import fakeMt5
+
+fakeMt5.install()
+
+from config import config  # noqa: E402
+from localParser import LocalParser  # noqa: E402
+
+HEADER = "XAUUSD BUY NOW @ 2330.00\nSL @ 2315.00\nTP1 @ 2340.00\nTP2 @ 2350.00"
+
+
+def test_explicit_tp3():
+    parser = LocalParser(HEADER + "\nTP3 @ 2380.00", 1)
+    assert parser.get_signal()['tps'] == [2340.0, 2350.0, 2380.0]
+    assert parser.confidence == 1.0
+
+
+def test_open_tp3_is_extrapolated():
+    parser = LocalParser(HEADER + "\nTP3 @ open", 1)
+    assert parser.get_signal()['tps'] == [2340.0, 2350.0, 2370.0]
+    assert parser.confidence == 1.0
+
+
+def test_missing_tp3_falls_back_to_gpt():
+    parser = LocalParser(HEADER, 1)
+    signal = parser.parse()
+    # Aucun TP3 inventé, confiance sous le seuil par défaut
+    assert signal['tps'] == [2340.0, 2350.0, 2350.0]
+    assert parser.confidence < config.LOCAL_PARSER_MIN_CONFIDENCE
+    assert LocalParser(HEADER, 1).get_signal() is None
@@ -0,0 +1,79 @@
+"""
+Tests des éditions et suppressions de messages (ordres modifiés ou annulés, jamais replacés).
+"""
+
+import asyncio
+import fakeMt5
+
+fakeMt5.install()
+
+# Achat sous le prix (EURUSD à 1.08500): trois ordres limites en attente
+SIGNAL = "EURUSD BUY NOW @ 1.0800\nSL @ 1.0750\nTP1 @ 1.0900\nTP2 @ 1.0950\nTP3 @ 1.1000"
+EDITED = "EURUSD BUY NOW @ 1.0800\nSL @ 1.0760\nTP1 @ 1.0900\nTP2 @ 1.0950\nTP3 @ 1.1000"
+
+
+def make_bot():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    from fxConverter import fx_converter
+    from symbolCache import symbol_cache
+    from symbolResolver import symbol_resolver
+    from telegramListener import TradingBot
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    symbol_resolver.invalidate()
+    bot = TradingBot(30.0, 'DEMO')
+    return terminal, bot
+
+
+def test_edit_modifies_pending_orders():
+    terminal, bot = make_bot()
+
+    async def run():
+        await bot.process_message(SIGNAL, 1, message_id=10)
+        tickets = set(terminal.orders)
+        edited = await bot.process_edit(EDITED, 1, message_id=10)
+        return tickets, edited
+
+    tickets, edited = asyncio.run(run())
+    assert len(tickets) == 3
+    assert edited['sl'] == 1.0760
+    # Mêmes tickets (TRADE_ACTION_MODIFY), nouveau SL
+    assert set(terminal.orders) == tickets
+    assert all(order['sl'] == 1.0760 for order in terminal.orders.values())
+
+
+def test_deletion_cancels_pending_orders():
+    terminal, bot = make_bot()
+
+    async def run():
+        await bot.process_message(SIGNAL, 1, message_id=11)
+        return await bot.process_deletion(1, 11)
+
+    changes = asyncio.run(run())
+    assert len(changes) == 3 and all(change['action'] == 'REMOVE' for change in changes)
+    assert terminal.orders == {}
+
+
+def test_edit_during_extraction_is_deferred():
+    terminal, bot = make_bot()
+    extract_signal = bot.extract_signal
+
+    async def slow_extract(message_text, channel_id):
+        # Extraction lente (ex: ChatGPT): l'édition arrive avant le placement
+        await asyncio.sleep(0.1)
+        return await extract_signal(message_text, channel_id)
+
+    bot.extract_signal = slow_extract
+
+    async def run():
+        original = asyncio.create_task(bot.process_message(SIGNAL, 1, message_id=12))
+        await asyncio.sleep(0.01)
+        edited = await bot.process_edit(EDITED, 1, message_id=12)
+        await original
+        return edited
+
+    asyncio.run(run())
+    # Un seul jeu d'ordres, modifié par l'édition
+    assert len(terminal.orders) == 3
+    assert all(order['sl'] == 1.0760 for order in terminal.orders.values())
+    assert bot.in_flight == {}
@@ -0,0 +1,81 @@
+"""
+Tests du gestionnaire de session MT5 contre un faux module MT5.
+"""
+
+import time
+import fakeMt5
+
+fakeMt5.install()
+
+from mt5Session import MT5Session  # noqa: E402
+
+
+def make_session(max_staleness=10.0):
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    terminal.connected = False
+    session = MT5Session('DEMO')
+    session.max_staleness = max_staleness
+    assert session.connect()
+    return terminal, session
+
+
+def test_connect_and_metrics():
+    terminal, session = make_session()
+    assert session.is_connected
+    metrics = session.metrics()
+    assert metrics['connected'] and metrics['reconnect_count'] == 0
+
+
+def test_heartbeat_detects_drop_and_reconnects():
+    terminal, session = make_session()
+    terminal.drop_connection()
+    # account_info échoue → reconnexion dans le même check
+    assert session.check()
+    assert session.is_connected
+    metrics = session.metrics()
+    assert metrics['reconnect_count'] == 1
+    assert metrics['last_reconnect_latency'] is not None
+
+
+def test_calls_are_queued_during_reconnect():
+    terminal, session = make_session()
+    terminal.drop_connection()
+    session._mark_disconnected()
+    future = session.submit(lambda: 'placed')
+    assert not future.done()
+    assert session.check()
+    assert future.result(timeout=1) == 'placed'
+
+
+def test_stale_calls_are_dropped():
+    terminal, session = make_session(max_staleness=0.01)
+    terminal.drop_connection()
+    session._mark_disconnected()
+    future = session.submit(lambda: 'placed')
+    time.sleep(0.05)
+    assert session.check()
+    assert future.result(timeout=1) is None
+    assert session.metrics()['dropped_calls'] == 1
+
+
+def test_cancelled_calls_are_not_replayed():
+    terminal, session = make_session()
+    terminal.drop_connection()
+    session._mark_disconnected()
+    calls = []
+    future = session.submit(lambda: calls.append('placed'))
+    # L'appelant abandonne (délai dépassé) avant la reconnexion
+    assert future.cancel()
+    assert session.check()
+    assert calls == []
+
+
+def test_background_heartbeat():
+    terminal, session = make_session()
+    session.start_heartbeat(interval=0.01)
+    terminal.drop_connection()
+    deadline = time.time() + 2
+    while time.time() < deadline and session.metrics()['reconnect_count'] == 0:
+        time.sleep(0.01)
+    session.close()
+    assert session.metrics()['reconnect_count'] >= 1
@@ -0,0 +1,68 @@
+"""
+Tests du dimensionnement groupé des jambes (arrondi au lot_step, bornes min/max, SL invalide).
+"""
+
+import numpy as np
+import fakeMt5
+
+fakeMt5.install()
+
+from riskManager import RiskManager  # noqa: E402
+
+SPEC = {'lot_step': 0.01, 'min_lot': 0.01, 'max_lot': 5.0}
+
+
+def test_lots_floored_to_step():
+    # 100€ sur 350 points à 1€/point/lot: 0.2857 → 0.28, jamais arrondi au-dessus
+    lot_sizes, risks = RiskManager.size_legs(np.array([350.0]), 100.0, 1.0, SPEC)
+    assert lot_sizes.tolist() == [0.28]
+    assert abs(risks[0] - 98.0) < 1e-9
+
+    lot_sizes, _ = RiskManager.size_legs(np.array([350.0]), 100.0, 1.0, dict(SPEC, lot_step=0.1, min_lot=0.1))
+    assert lot_sizes.tolist() == [0.2]
+
+
+def test_lots_clipped_to_min_and_max():
+    lot_sizes, risks = RiskManager.size_legs(np.array([1000.0, 10.0]), np.array([1.0, 1000.0]), 1.0, SPEC)
+    # Budget sous le lot minimum: lot minimum; budget énorme: lot maximum
+    assert lot_sizes.tolist() == [0.01, 5.0]
+    assert risks.tolist() == [10.0, 50.0]
+
+
+def test_invalid_sl_leg():
+    lot_sizes, risks = RiskManager.size_legs(np.array([0.0, 200.0]), 50.0, 1.0, SPEC)
+    assert lot_sizes.tolist() == [0.01, 0.25]
+    assert risks.tolist() == [0.0, 50.0]
+
+
+def test_batch_legs_share_one_lookup():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    from fxConverter import fx_converter
+    from info import Infos
+    from symbolCache import symbol_cache
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    manager = RiskManager(100.0)
+
+    # Échelle de 5 entrées (canal 2), même SL: une seule lecture du symbole pour toutes les jambes
+    entries = [2330.0, 2331.0, 2332.0, 2333.0, 2334.0]
+    batch = manager.calculate_lot_sizes_batch('XAUUSD', entries, [2320.0] * 5, risk_per_leg=20.0)
+    assert terminal.calls['symbol_info'] == 1
+    assert batch['sl_distances'] == [1000.0, 1100.0, 1200.0, 1300.0, 1400.0]
+    assert abs(batch['total_risk'] - sum(batch['risks'])) < 1e-9
+    assert all(risk <= 20.0 for risk in batch['risks'])
+
+    point_value = Infos.get_point_value_eur('XAUUSD')
+    for lot_size, distance in zip(batch['lot_sizes'], batch['sl_distances']):
+        assert lot_size == np.floor(20.0 / (distance * point_value) * 100 + 1e-9) / 100
+
+
+def test_four_leg_signal_sized():
+    fakeMt5.install(fakeMt5.FakeTerminal())
+    from fxConverter import fx_converter
+    from symbolCache import symbol_cache
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    legs = [{'symbol': 'XAUUSD', 'sens': 'BUY', 'entry_price': 2330.0 + i, 'sl': 2320.0} for i in range(4)]
+    lot_sizes = RiskManager(100.0, leg_weights=[1, 1, 1]).calculate_lot_sizes(legs)
+    assert len(lot_sizes) == 4 and all(lot_size > 0.01 for lot_size in lot_sizes)
@@ -0,0 +1,76 @@
+"""
+Tests du placement groupé des jambes (order_check, choix marché / en attente, thread MT5).
+"""
+
+import threading
+import time
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+from order import SendOrder  # noqa: E402
+from symbolCache import symbol_cache  # noqa: E402
+
+
+def leg(entry_price, tp, sl=1.0750):
+    return {'symbol': 'EURUSD', 'sens': 'BUY', 'entry_price': entry_price, 'sl': sl, 'tp': tp,
+            'channel_id': 1, 'signal_id': 1}
+
+
+def make_sender():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    symbol_cache.invalidate()
+    sender = SendOrder('DEMO')
+    assert sender.session.connect()
+    return terminal, sender
+
+
+def test_market_vs_pending():
+    terminal, sender = make_sender()
+    # Ask EURUSD à 1.08520: entrée à 2 points du prix → marché, 50 pips dessous → limite
+    results = sender.place_orders([leg(1.08518, 1.0900), leg(1.0800, 1.0950)], [0.1, 0.1])
+
+    assert [result['filled'] for result in results] == [True, False]
+    assert len(terminal.positions) == 1
+    (pending,) = terminal.orders.values()
+    assert pending['type'] == mt5.ORDER_TYPE_BUY_LIMIT and pending['price'] == 1.08
+
+
+def test_order_check_rejection_skips_leg():
+    terminal, sender = make_sender()
+    # Volume hors bornes (volume_max 100): seule la jambe rejetée par order_check est écartée
+    results = sender.place_orders([leg(1.0800, 1.0900), leg(1.0800, 1.0950), leg(1.0800, 1.1000)],
+                                  [0.1, 500.0, 0.1])
+
+    assert [result['order_number'] for result in results] == [1, 3]
+    assert terminal.calls['order_check'] == 3
+    assert terminal.calls['order_send'] == 2
+
+
+def test_expired_deadline_sends_nothing():
+    terminal, sender = make_sender()
+    results = sender.place_orders_batch([leg(1.0800, 1.0900)], [0.1], deadline=time.monotonic() - 1)
+    assert results == []
+    assert terminal.calls['order_send'] == 0
+
+
+def test_place_orders_runs_on_mt5_thread():
+    terminal, sender = make_sender()
+    threads = []
+    order_send = terminal.order_send
+
+    def recording_send(request):
+        threads.append(threading.current_thread().name)
+        return order_send(request)
+
+    mt5.order_send = recording_send
+    results = sender.place_orders([leg(1.0800, 1.0900)], [0.1])
+    assert len(results) == 1
+    assert threads and all(name.startswith('mt5') for name in threads)
+
+
+def test_length_mismatch_places_nothing():
+    terminal, sender = make_sender()
+    assert sender.place_orders([leg(1.0800, 1.0900)], [0.1, 0.1]) == []
+    assert terminal.calls['order_send'] == 0
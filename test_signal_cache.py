@@ -0,0 +1,77 @@
+"""
+Tests du cache des signaux: anti-doublon, libération après un échec de placement, purge.
+"""
+
+import asyncio
+import time
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+from signalCache import SignalCache  # noqa: E402
+
+SIGNAL = "EURUSD BUY NOW @ 1.0800\nSL @ 1.0750\nTP1 @ 1.0900\nTP2 @ 1.0950\nTP3 @ 1.1000"
+
+
+def test_claim_and_release():
+    cache = SignalCache(path=':memory:', ttl=3600)
+    assert cache.claim(SIGNAL, 1)
+    assert not cache.claim(SIGNAL, 1)
+    cache.release(SIGNAL, 1)
+    assert cache.claim(SIGNAL, 1)
+
+
+def test_purge_removes_expired_entries():
+    cache = SignalCache(path=':memory:', ttl=60)
+    cache.put("ancien", 1, {'symbol': 'EURUSD'})
+    cache.claim("ancien placé", 1)
+    cache._db.execute("UPDATE signals SET stored_at = ?, placed_at = placed_at - 120", (time.time() - 120,))
+    cache.put("récent", 1, {'symbol': 'EURUSD'})
+    assert cache.purge() == 2
+    assert cache._db.execute("SELECT COUNT(*) FROM signals").fetchone()[0] == 1
+
+
+def test_failed_placement_releases_claim():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    from fxConverter import fx_converter
+    from symbolCache import symbol_cache
+    from symbolResolver import symbol_resolver
+    from telegramListener import TradingBot
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    symbol_resolver.invalidate()
+    bot = TradingBot(30.0, 'DEMO')
+    order_send = terminal.order_send
+
+    async def run():
+        # Terminal qui refuse tous les envois: aucun ordre, la réservation est libérée
+        mt5.order_send = lambda request: None
+        await bot.process_message(SIGNAL, 1, message_id=20)
+        mt5.order_send = order_send
+        # Le repost du même signal est exécuté
+        await bot.process_message(SIGNAL, 1, message_id=21)
+
+    asyncio.run(run())
+    assert len(terminal.orders) == 3
+
+
+def test_exception_after_claim_releases_it():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    from symbolCache import symbol_cache
+    from telegramListener import TradingBot
+    symbol_cache.invalidate()
+    bot = TradingBot(30.0, 'DEMO')
+    create_orders = bot.create_orders
+
+    def failing_create_orders(*args):
+        raise RuntimeError("registre indisponible")
+
+    async def run():
+        bot.create_orders = failing_create_orders
+        await bot.process_message(SIGNAL, 1, message_id=30)
+        bot.create_orders = create_orders
+        await bot.process_message(SIGNAL, 1, message_id=31)
+
+    asyncio.run(run())
+    assert len(terminal.orders) == 3
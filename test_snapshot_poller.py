@@ -0,0 +1,142 @@
+"""
+Tests de l'instantané partagé de l'API (diff, ETag/304) et de la fermeture via le thread MT5.
+"""
+
+import threading
+import time
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+from config import config  # noqa: E402
+from mt5Executor import MT5_EXECUTOR  # noqa: E402
+from api_server import TradingAPI, app, conditional_json  # noqa: E402
+from snapshotPoller import SnapshotPoller  # noqa: E402
+
+
+def make_api():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    api = TradingAPI('DEMO')
+    assert api.session.connect()
+    return terminal, api
+
+
+def open_position():
+    return mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                           'type': mt5.ORDER_TYPE_BUY, 'sl': 1.0800}).order
+
+
+def test_refresh_publishes_changed_and_removed():
+    terminal, api = make_api()
+    poller = SnapshotPoller(api, interval=60)
+    poller.refresh()
+    subscriber = poller.subscribe()
+    version, etag = poller.version, poller.etags['orders']
+
+    ticket = open_position()
+    poller.refresh()
+    event = subscriber.get_nowait()
+    assert [order['id'] for order in event['changed']] == [str(ticket)]
+    assert event['removed'] == []
+    assert poller.version == version + 1 and poller.etags['orders'] != etag
+
+    # Rien n'a changé: ni nouvelle version, ni événement, même ETag
+    etag = poller.etags['orders']
+    poller.refresh()
+    assert subscriber.empty() and poller.etags['orders'] == etag
+
+    assert api.close_order(str(ticket))['success']
+    poller.refresh()
+    event = subscriber.get_nowait()
+    assert event['removed'] == [str(ticket)] and event['changed'] == []
+    assert poller.get_orders()[0] == []
+
+
+def test_etag_not_modified():
+    terminal, api = make_api()
+    open_position()
+    poller = SnapshotPoller(api, interval=60)
+    poller.refresh()
+    orders, etag = poller.get_orders()
+
+    with app.test_request_context(headers={'If-None-Match': f'"{etag}"'}):
+        assert conditional_json(orders, etag).status_code == 304
+    with app.test_request_context(headers={'If-None-Match': '"ancienne-version"'}):
+        response = conditional_json(orders, etag)
+        assert response.status_code == 200 and response.headers['ETag'] == f'"{etag}"'
+
+
+def test_close_order_runs_on_mt5_thread():
+    terminal, api = make_api()
+    ticket = open_position()
+    threads = []
+    order_send = terminal.order_send
+
+    def recording_send(request):
+        threads.append(threading.current_thread().name)
+        return order_send(request)
+
+    mt5.order_send = recording_send
+    result = api.close_order(str(ticket))
+    assert result['success'], result
+    assert threads and all(name.startswith('mt5') for name in threads)
+    assert not mt5.positions_get(ticket=ticket)
+
+
+def test_disconnect_keeps_last_snapshot():
+    terminal, api = make_api()
+    ticket = open_position()
+    poller = SnapshotPoller(api, interval=60)
+    poller.refresh()
+    subscriber = poller.subscribe()
+    version, account = poller.version, poller.account
+
+    # Terminal muet avant que la session ne le détecte, puis session déconnectée
+    terminal.drop_connection()
+    assert api.get_open_orders() is None
+    poller.refresh()
+    api.session._mark_disconnected()
+    poller.refresh()
+    assert subscriber.empty() and poller.version == version
+    assert poller.account == account and [order['id'] for order in poller.get_orders()[0]] == [str(ticket)]
+
+    # Reconnexion sans changement réel: aucun événement
+    assert api.session.check()
+    poller.refresh()
+    assert subscriber.empty() and poller.version == version
+
+
+def test_refresh_bounded_by_timeout(monkeypatch):
+    terminal, api = make_api()
+    poller = SnapshotPoller(api, interval=60)
+    monkeypatch.setattr(config, 'API_MT5_TIMEOUT', 0.1)
+    busy = MT5_EXECUTOR.submit(time.sleep, 0.5)
+    start = time.perf_counter()
+    poller.refresh()
+    assert time.perf_counter() - start < 0.4 and poller.version == 0
+    busy.result()
+
+
+def test_deal_sync_bounded_by_timeout(monkeypatch):
+    terminal, api = make_api()
+    assert api.get_closed_trades(30) == []
+    monkeypatch.setattr(config, 'API_MT5_TIMEOUT', 0.1)
+    # Thread MT5 occupé: l'API sert l'historique local au lieu d'attendre
+    busy = MT5_EXECUTOR.submit(time.sleep, 0.5)
+    start = time.perf_counter()
+    assert api.get_closed_trades(30) == []
+    assert api.get_statistics() == api.stats_engine.snapshot('30d')
+    assert time.perf_counter() - start < 0.4
+    busy.result()
+
+
+def test_deal_store_created_once_across_threads():
+    terminal, api = make_api()
+    stores = []
+    threads = [threading.Thread(target=lambda: stores.append(api.deal_store)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(store) for store in stores}) == 1
@@ -0,0 +1,76 @@
+"""
+Tests du moteur de statistiques glissantes et du R multiple réalisé.
+"""
+
+import fakeMt5
+
+fakeMt5.install()
+
+import MetaTrader5 as mt5  # noqa: E402
+from dealStore import DealStore  # noqa: E402
+from statsEngine import StatsEngine  # noqa: E402
+
+DAY = 86400
+NOW = 1_800_000_000
+
+
+def trade(position_id, pnl, days_ago, channel_id=1, symbol='EURUSD', r=None):
+    return {'position_id': position_id, 'channel_id': channel_id, 'symbol': symbol, 'pnl': pnl,
+            'close_time': NOW - days_ago * DAY, 'r_multiple': r}
+
+
+def test_rolling_windows():
+    engine = StatsEngine()
+    engine.ingest(trade(1, 100.0, days_ago=20, r=2.0))
+    engine.ingest(trade(2, -50.0, days_ago=3, channel_id=2, symbol='XAUUSD', r=-1.0))
+    engine.ingest(trade(3, 30.0, days_ago=0.5, r=0.6))
+
+    assert engine.snapshot('1d', now=NOW)['global']['totalSignals'] == 1
+    week = engine.snapshot('7d', now=NOW)
+    assert week['global'] == {'winRate': 50, 'avgRR': -0.2, 'totalSignals': 2}
+    assert week['channels']['channel2']['worstTrade'] == -50.0
+
+    month = engine.snapshot('30d', now=NOW)
+    assert month['channels']['channel1'] == {'totalSignals': 2, 'winRate': 100, 'avgRR': 1.3,
+                                             'totalPnl': 130.0, 'bestTrade': 100.0, 'worstTrade': 30.0}
+    assert [s['symbol'] for s in month['symbols']] == ['EURUSD', 'XAUUSD']
+
+
+def test_expiry_updates_best_trade():
+    engine = StatsEngine()
+    engine.ingest(trade(1, 100.0, days_ago=6.5))
+    engine.ingest(trade(2, 10.0, days_ago=1))
+    assert engine.snapshot('7d', now=NOW)['channels']['channel1']['bestTrade'] == 100.0
+    # Une journée plus tard, le meilleur trade sort de la fenêtre
+    stats = engine.snapshot('7d', now=NOW + DAY)
+    assert stats['channels']['channel1']['bestTrade'] == 10.0
+    assert stats['global']['totalSignals'] == 1
+
+
+def test_reingested_position_is_not_double_counted():
+    engine = StatsEngine()
+    engine.ingest(trade(1, 20.0, days_ago=1))
+    engine.ingest(trade(1, 40.0, days_ago=0.5))
+    stats = engine.snapshot('all', now=NOW)
+    assert stats['global']['totalSignals'] == 1
+    assert stats['channels']['channel1']['totalPnl'] == 40.0
+
+
+def test_r_multiple_from_initial_sl():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    terminal.set_price('EURUSD', 1.1000)
+    ask = terminal.symbols['EURUSD']['ask']
+    opened = mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                             'type': mt5.ORDER_TYPE_BUY, 'sl': ask - 0.0020})
+    # Gain de 2R sur le prix de sortie (bid)
+    terminal.set_price('EURUSD', ask + 0.0040)
+    mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                    'type': mt5.ORDER_TYPE_SELL, 'position': opened.order})
+
+    store = DealStore(terminal.login_id, ':memory:')
+    engine = StatsEngine()
+    store.add_listener(engine.ingest)
+    store.sync(min_interval=0)
+
+    assert round(store.trades()[0]['r_multiple'], 2) == 2.0
+    assert engine.snapshot('all')['global']['avgRR'] == 2.0
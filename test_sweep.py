@@ -0,0 +1,58 @@
+"""
+Tests de la recherche de paramètres (grille, pool de processus, table de résultats).
+"""
+
+import csv
+import os
+import tempfile
+import numpy as np
+import fakeMt5
+
+fakeMt5.install()
+
+from backtester import symbol_specs  # noqa: E402
+from fxConverter import fx_converter  # noqa: E402
+from symbolCache import symbol_cache  # noqa: E402
+from sweep import expand_grid, run_sweep, write_results  # noqa: E402
+from tickRecorder import TICK_DTYPE  # noqa: E402
+
+T0 = 1_800_000_000
+
+
+def market():
+    bids = np.array([2330.0, 2330.0, 2333.5, 2325.0, 2319.0, 2318.0, 2337.0, 2345.0])
+    ticks = np.zeros(len(bids), dtype=TICK_DTYPE)
+    ticks['time_msc'] = T0 * 1000 + np.arange(len(bids)) * 10_000
+    ticks['bid'] = bids
+    ticks['ask'] = bids
+    return {'XAUUSD': ticks}
+
+
+def test_expand_grid():
+    configs = expand_grid({'risk_per_signal_eur': [100, 300], 'leg_weights': [[1, 1, 1], [2, 1, 1]]})
+    assert len(configs) == 4
+    assert {'risk_per_signal_eur': 300, 'leg_weights': [2, 1, 1]} in configs
+
+
+def test_sweep_over_process_pool():
+    fakeMt5.install(fakeMt5.FakeTerminal())
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    specs = symbol_specs(['XAUUSD'])
+    signals = [{'time': T0 + 5, 'channel_id': 2, 'symbol': 'XAUUSD', 'sens': 'SELL', 'sl': 2340.0,
+                'entry_prices': [2330.0, 2333.0, 2336.0], 'tps': [2320.0, 2320.0, 2320.0]}]
+    grid = {'risk_per_signal_eur': [100, 300], 'channel2_ladder': [[0, 0.5, 1], [0, 0.1, 0.2]]}
+
+    folder = tempfile.mkdtemp()
+    rows = run_sweep(grid, market(), specs, signals, workers=2, folder=folder, fake_mt5=True)
+    assert len(rows) == 4
+    assert os.path.exists(os.path.join(folder, 'XAUUSD.npy'))
+    # Échelle resserrée: les trois jambes sont exécutées avant le TP
+    tight = [row for row in rows if row['channel2_ladder'] == '[0, 0.1, 0.2]']
+    assert all(row['legs'] == 3 for row in tight)
+    assert rows[0]['pnl_eur'] >= rows[-1]['pnl_eur']
+    assert rows[0]['channel2_pnl_eur'] == rows[0]['pnl_eur']
+
+    path = write_results(rows, os.path.join(folder, 'results.csv'))
+    with open(path, encoding='utf-8') as file:
+        assert len(list(csv.DictReader(file))) == 4
@@ -0,0 +1,65 @@
+"""
+Tests du cache des spécifications de symboles (TTL par champ, invalidation, compteurs).
+"""
+
+import time
+import fakeMt5
+
+fakeMt5.install()
+
+from symbolCache import SymbolSpecCache  # noqa: E402
+
+
+def test_static_fields_cached_for_session():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    cache = SymbolSpecCache(field_ttls={'tick_value': None})
+    spec = cache.get('XAUUSD')
+    assert spec['digits'] == 2 and spec['lot_step'] == 0.01
+
+    terminal.calls.clear()
+    for _ in range(10):
+        assert cache.get('XAUUSD') == spec
+    assert sum(terminal.calls.values()) == 0
+    assert cache.stats()['hits'] == 10 and cache.stats()['misses'] == 1
+
+
+def test_tick_value_refreshed_after_ttl():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    cache = SymbolSpecCache(field_ttls={'tick_value': 0.05})
+    tick_value = cache.get('XAUUSD')['tick_value']
+
+    # Compte en EUR: la valeur du tick XAUUSD suit EURUSD
+    terminal.set_price('EURUSD', 1.2000)
+    assert cache.get('XAUUSD')['tick_value'] == tick_value
+    time.sleep(0.06)
+    terminal.calls.clear()
+    assert cache.get('XAUUSD')['tick_value'] < tick_value
+    # Rafraîchissement partiel: pas de nouvelle sélection du symbole
+    assert terminal.calls['symbol_info'] == 1 and terminal.calls['symbol_select'] == 0
+    assert cache.stats()['refreshes'] == 1
+
+
+def test_invalidation():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    cache = SymbolSpecCache(field_ttls={'tick_value': None})
+    cache.get('EURUSD')
+    cache.get('XAUUSD')
+
+    cache.invalidate('EURUSD')
+    terminal.calls.clear()
+    cache.get('EURUSD')
+    cache.get('XAUUSD')
+    assert terminal.calls['symbol_select'] == 1
+
+    cache.invalidate()
+    assert cache.stats()['symbols'] == 0
+    terminal.calls.clear()
+    cache.get('XAUUSD')
+    assert terminal.calls['symbol_select'] == 1 and cache.stats()['misses'] == 4
+
+
+def test_unknown_symbol_not_cached():
+    fakeMt5.install(fakeMt5.FakeTerminal())
+    cache = SymbolSpecCache()
+    assert cache.get('NOPE') is None
+    assert cache.stats()['symbols'] == 0
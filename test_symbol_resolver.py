@@ -0,0 +1,59 @@
+"""
+Tests de la résolution des symboles vers les noms du courtier.
+"""
+
+import fakeMt5
+
+fakeMt5.install()
+
+from symbolResolver import SymbolResolver, normalize  # noqa: E402
+
+# Courtier avec suffixes et noms propres: nom → (base, profit, bid, digits, contract_size)
+BROKER_UNIVERSE = {
+    'EURUSD.m': ('EUR', 'USD', 1.08500, 5, 100000),
+    'EURUSD.pro': ('EUR', 'USD', 1.08500, 5, 100000),
+    'USDJPYm': ('USD', 'JPY', 151.200, 3, 100000),
+    'GOLD': ('XAU', 'USD', 2330.00, 2, 100),
+    'BTCUSD#': ('BTC', 'USD', 64000.00, 2, 1),
+    'DJ30.cash': ('USD', 'USD', 39100.0, 1, 1),
+}
+
+
+def test_normalize():
+    assert normalize('XAU/USD') == 'XAUUSD'
+    assert normalize('XAUUSD.m') == 'XAUUSD'
+    assert normalize('BTCUSD#') == 'BTCUSD'
+    assert normalize('EURUSDm') == 'EURUSD'
+    assert normalize('Gold') == 'GOLD'
+
+
+def test_broker_suffixes_and_aliases():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal(universe=BROKER_UNIVERSE))
+    resolver = SymbolResolver(overrides={})
+    assert resolver.resolve('XAUUSD') == 'GOLD'
+    assert resolver.resolve('XAU/USD') == 'GOLD'
+    assert resolver.resolve('BTCUSD') == 'BTCUSD#'
+    # Cotation USDT des signaux crypto → paire USD du courtier
+    assert resolver.resolve('BTCUSDT') == 'BTCUSD#'
+    assert resolver.resolve('BTC/USDT') == 'BTCUSD#'
+    assert resolver.resolve('USDJPY') == 'USDJPYm'
+    assert resolver.resolve('US30') == 'DJ30.cash'
+    assert resolver.resolve('EURUSD') in ('EURUSD.m', 'EURUSD.pro')
+    assert resolver.resolve('ZARJPY') is None
+
+    # Recherches suivantes: cache, aucun nouvel appel au terminal
+    terminal.calls.clear()
+    resolver.resolve('XAUUSD')
+    assert sum(terminal.calls.values()) == 0
+    assert resolver.builds == 1
+
+
+def test_overrides_win_and_refresh_on_change():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal(universe=BROKER_UNIVERSE))
+    resolver = SymbolResolver(overrides={'EURUSD': 'EURUSD.pro'})
+    assert resolver.resolve('EURUSD') == 'EURUSD.pro'
+
+    assert resolver.refresh_if_changed() is False
+    terminal.add_symbol('XAGUSD.m', 'XAG', 'USD', 27.5, digits=3, contract_size=5000)
+    assert resolver.refresh_if_changed() is True
+    assert resolver.resolve('SILVER') == 'XAGUSD.m'
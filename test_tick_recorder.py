@@ -0,0 +1,96 @@
+"""
+Tests de l'enregistreur de ticks (tampon circulaire, lecture sans terminal, fichiers journaliers).
+"""
+
+import os
+import tempfile
+import numpy as np
+import fakeMt5
+
+fakeMt5.install()
+
+from tickRecorder import TICK_DTYPE, TickRecorder, TickRing, load_ticks, tick_file_days  # noqa: E402
+
+DAY_MS = 86400 * 1000
+
+
+def ticks(times, bid=1.1000):
+    array = np.zeros(len(times), dtype=TICK_DTYPE)
+    array['time_msc'] = times
+    array['bid'] = bid
+    array['ask'] = bid + 0.0002
+    return array
+
+
+def test_ring_wraps_in_order():
+    ring = TickRing(4)
+    ring.extend(ticks([1, 2, 3]))
+    ring.extend(ticks([4, 5, 6]))
+    assert list(ring.last(10)['time_msc']) == [3, 4, 5, 6]
+    assert list(ring.window(5)['time_msc']) == [5, 6]
+    # Position déjà perdue: on repart du plus ancien tick encore en mémoire
+    assert list(ring.since(1)['time_msc']) == [3, 4, 5, 6]
+    ring.extend(ticks(range(7, 17)))
+    assert list(ring.last(4)['time_msc']) == [13, 14, 15, 16]
+
+
+def test_poll_then_latest_without_terminal():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    terminal.symbol_select('EURUSD')
+    recorder = TickRecorder(capacity=100, data_dir=tempfile.mkdtemp(), max_age=60)
+    recorder.add_symbols(['EURUSD'])
+    assert recorder.latest('EURUSD') is None
+
+    recorder.poll()
+    for bid in (1.0851, 1.0853, 1.0849):
+        terminal.set_price('EURUSD', bid)
+    assert recorder.poll() == 3
+
+    terminal.calls.clear()
+    tick = recorder.latest('EURUSD')
+    assert tick.bid == 1.0849
+    stats = recorder.market_stats('EURUSD', seconds=60)
+    assert stats['ticks'] == 4
+    assert abs(stats['spread_mean'] - 0.0002) < 1e-9
+    assert stats['volatility'] > 0
+    assert sum(terminal.calls.values()) == 0
+    # Polling trop ancien: le tick n'est plus servi
+    assert recorder.latest('EURUSD', max_age=0) is None
+
+
+def test_flush_writes_daily_files_and_archives_closed_days():
+    data_dir = tempfile.mkdtemp()
+    recorder = TickRecorder(capacity=100, data_dir=data_dir)
+    recorder.add_symbols(['XAUUSD'])
+    ring = recorder._rings['XAUUSD']
+    day1 = 1_800_000_000_000 - 1_800_000_000_000 % DAY_MS
+    ring.extend(ticks([day1 + 1, day1 + 2], bid=2330.0))
+    assert recorder.flush() == 2
+    assert recorder.flush() == 0
+
+    ring.extend(ticks([day1 + DAY_MS + 5], bid=2331.0))
+    assert recorder.flush() == 1
+    first, second = tick_file_days('XAUUSD', data_dir)
+    assert os.path.exists(os.path.join(data_dir, 'XAUUSD', f"{first}.npz"))
+    assert not os.path.exists(os.path.join(data_dir, 'XAUUSD', f"{first}.ticks"))
+
+    closed = load_ticks('XAUUSD', first, data_dir)
+    assert isinstance(closed, np.memmap)
+    assert list(closed['time_msc']) == [day1 + 1, day1 + 2]
+    assert list(load_ticks('XAUUSD', second, data_dir)['bid']) == [2331.0]
+
+
+def test_load_combines_archive_and_raw_ticks():
+    data_dir = tempfile.mkdtemp()
+    recorder = TickRecorder(capacity=100, data_dir=data_dir)
+    recorder.add_symbols(['XAUUSD'])
+    day1 = 1_800_000_000_000 - 1_800_000_000_000 % DAY_MS
+    recorder._rings['XAUUSD'].extend(ticks([day1 + 1, day1 + DAY_MS + 5]))
+    recorder.flush()
+    first, second = tick_file_days('XAUUSD', data_dir)
+
+    # Ticks du jour archivé écrits après l'archivage (avant le prochain passage)
+    with open(os.path.join(data_dir, 'XAUUSD', f"{first}.ticks"), 'ab') as file:
+        ticks([day1 + 2, day1 + 3]).tofile(file)
+    assert tick_file_days('XAUUSD', data_dir) == [first, second]
+    assert list(load_ticks('XAUUSD', first, data_dir)['time_msc']) == [day1 + 1, day1 + 2, day1 + 3]
@@ -0,0 +1,41 @@
+"""
+Tests du traçage des latences: histogrammes, journal JSONL et rotation par taille.
+"""
+
+import os
+import tempfile
+import fakeMt5
+
+fakeMt5.install()
+
+from tracing import SignalTrace, Tracer, summarize_log  # noqa: E402
+
+
+def finished_trace(tracer, duration_ms):
+    trace = SignalTrace(1)
+    trace.durations['parse'] = duration_ms
+    tracer.finish(trace)
+
+
+def test_summary_from_log():
+    path = os.path.join(tempfile.mkdtemp(), 'latency.jsonl')
+    tracer = Tracer(log_path=path)
+    for duration in (10.0, 20.0, 30.0):
+        finished_trace(tracer, duration)
+    assert tracer.summary()['parse']['count'] == 3
+    summary = summarize_log(path)['parse']
+    assert summary['count'] == 3 and summary['p50'] == 20.0 and summary['max'] == 30.0
+
+
+def test_log_rotated_by_size():
+    path = os.path.join(tempfile.mkdtemp(), 'latency.jsonl')
+    tracer = Tracer(log_path=path, max_bytes=500)
+    for duration in range(20):
+        finished_trace(tracer, float(duration))
+
+    # Journal courant et rotation .1 seulement: taille bornée, traces les plus récentes lues
+    assert os.path.exists(f"{path}.1") and not os.path.exists(f"{path}.2")
+    assert os.path.getsize(path) < 500 + 300
+    summary = summarize_log(path)['parse']
+    assert summary['max'] == 19.0 and summary['count'] < 20
+    assert summarize_log(path, limit=2)['parse']['count'] == 2
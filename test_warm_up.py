@@ -0,0 +1,63 @@
+"""
+Tests de la préparation des symboles et des caches au démarrage.
+"""
+
+import fakeMt5
+
+fakeMt5.install()
+
+import time  # noqa: E402
+import MetaTrader5 as mt5  # noqa: E402
+from fxConverter import fx_converter  # noqa: E402
+from info import Infos  # noqa: E402
+from symbolCache import symbol_cache  # noqa: E402
+from warmUp import keep_warm, symbol_universe, warm_up_symbols  # noqa: E402
+
+
+def fresh_terminal():
+    terminal = fakeMt5.install(fakeMt5.FakeTerminal())
+    symbol_cache.invalidate()
+    fx_converter.invalidate()
+    return terminal
+
+
+def test_universe_includes_recent_history():
+    terminal = fresh_terminal()
+    opened = mt5.order_send({'action': mt5.TRADE_ACTION_DEAL, 'symbol': 'GBPJPY', 'volume': 0.1,
+                             'type': mt5.ORDER_TYPE_BUY})
+    assert opened.retcode == mt5.TRADE_RETCODE_DONE
+    assert symbol_universe(['XAUUSD', 'EURUSD'], history_days=30) == ['XAUUSD', 'EURUSD', 'GBPJPY']
+    assert symbol_universe(['XAUUSD'], history_days=0) == ['XAUUSD']
+
+
+def test_first_signal_hits_hot_caches():
+    terminal = fresh_terminal()
+    report = warm_up_symbols(['XAUUSD', 'USDJPY', 'NOPE'], history_days=0, tick_timeout=0)
+    assert report['ready'] == ['XAUUSD', 'USDJPY']
+    assert report['missing'] == ['NOPE']
+    assert set(report['currencies']) == {'USD', 'JPY'}
+    assert {'XAUUSD', 'USDJPY'} <= terminal.selected
+
+    # Le calcul du premier signal ne recharge ni spécifications ni chemins de conversion
+    terminal.calls.clear()
+    assert Infos.get_pip_value_eur('USDJPY') is not None
+    assert terminal.calls['symbol_select'] == 0
+    assert terminal.calls['symbols_get'] == 0
+
+
+def test_keep_warm_refreshes_before_expiry(monkeypatch):
+    terminal = fresh_terminal()
+    warm_up_symbols(['USDJPY'], history_days=0, tick_timeout=0)
+    monkeypatch.setattr(fx_converter, 'rate_ttl', 0.2)
+    monkeypatch.setattr(symbol_cache, 'field_ttls', {'tick_value': 0.2})
+    assert keep_warm() == {'symbols': 0, 'rates': False}
+    terminal.set_price('USDJPY', 160.0)
+    time.sleep(0.15)
+    assert keep_warm() == {'symbols': 1, 'rates': True}
+    # JPY → USD → EUR avec le nouveau prix USDJPY
+    assert abs(fx_converter.rate_to_eur('JPY') - 1 / 160.0 / 1.085) < 1e-9
+
+    # Le premier signal après une période calme ne touche pas le terminal
+    terminal.calls.clear()
+    assert Infos.get_pip_value_eur('USDJPY') is not None
+    assert sum(terminal.calls.values()) == 0
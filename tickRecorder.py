@@ -0,0 +1,305 @@
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+import numpy as np
+import MetaTrader5 as mt5
+from config import config
+
+# Format des ticks enregistrés (tampon mémoire et fichiers journaliers)
+TICK_DTYPE = np.dtype([('time_msc', '<i8'), ('bid', '<f8'), ('ask', '<f8'), ('volume', '<f8')])
+
+
+class TickRing:
+    """Tampon circulaire préalloué des ticks d'un symbole (positions absolues croissantes)."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = np.zeros(capacity, dtype=TICK_DTYPE)
+        self.written = 0          # nombre total de ticks écrits depuis le démarrage
+        self.last_msc = 0
+
+    def extend(self, ticks):
+        count = len(ticks)
+        if not count:
+            return 0
+        kept = ticks[-self.capacity:]
+        start = (self.written + count - len(kept)) % self.capacity
+        first = min(len(kept), self.capacity - start)
+        self.data[start:start + first] = kept[:first]
+        self.data[:len(kept) - first] = kept[first:]
+        self.written += count
+        self.last_msc = int(ticks['time_msc'][-1])
+        return count
+
+    def since(self, position):
+        """Copie des ticks écrits depuis la position absolue donnée (tronquée à la capacité)."""
+        oldest = max(0, self.written - self.capacity)
+        position = max(position, oldest)
+        return self.last(self.written - position)
+
+    def last(self, count):
+        """Copie ordonnée des count derniers ticks."""
+        count = min(count, self.written, self.capacity)
+        if count <= 0:
+            return np.empty(0, dtype=TICK_DTYPE)
+        end = self.written % self.capacity
+        start = end - count
+        if start >= 0:
+            return self.data[start:end].copy()
+        return np.concatenate((self.data[start:], self.data[:end]))
+
+    def window(self, since_msc):
+        """Copie ordonnée des ticks postérieurs à since_msc (recherche binaire, sans tout copier)."""
+        end = self.written % self.capacity
+        if self.written < self.capacity:
+            segments = (self.data[:self.written],)
+        else:
+            segments = (self.data[end:], self.data[:end])
+        return np.concatenate([segment[np.searchsorted(segment['time_msc'], since_msc):] for segment in segments])
+
+
+class TickRecorder:
+    """
+    Enregistreur de ticks de l'univers actif: le polling (copy_ticks_from, repli sur
+    symbol_info_tick) alimente un tampon circulaire NumPy par symbole, vidé
+    périodiquement dans des fichiers journaliers (brut pour le jour courant,
+    compressé pour les jours clos). SendOrder et la couche de risque y lisent le
+    dernier tick et le spread/volatilité récents sans aller-retour terminal.
+    """
+
+    def __init__(self, capacity=None, data_dir=None, max_age=None):
+        """
+        Args:
+            capacity (int): Ticks conservés en mémoire par symbole (défaut: config.TICK_RECORDER_CAPACITY)
+            data_dir (str): Dossier des fichiers journaliers (défaut: config.TICK_DATA_DIR)
+            max_age (float): Âge maximal du dernier polling pour servir un tick, en secondes
+        """
+        self.capacity = capacity or config.TICK_RECORDER_CAPACITY
+        self.data_dir = data_dir or config.TICK_DATA_DIR
+        self.max_age = max_age if max_age is not None else config.TICK_RECORDER_MAX_AGE
+        self._lock = threading.Lock()
+        self._rings = {}          # symbole → TickRing
+        self._polled_at = {}      # symbole → time.monotonic() du dernier polling réussi
+        self._flushed = {}        # symbole → position absolue déjà écrite sur disque
+        self.polls = 0
+
+    @property
+    def symbols(self):
+        return list(self._rings)
+
+    def add_symbols(self, symbols):
+        """Ajoute des symboles à l'univers enregistré (sans effet s'ils le sont déjà)."""
+        with self._lock:
+            for symbol in symbols:
+                if symbol and symbol not in self._rings:
+                    self._rings[symbol] = TickRing(self.capacity)
+                    self._flushed[symbol] = 0
+
+    # --- Collecte (thread MT5) ---
+
+    def poll(self):
+        """
+        Récupère les nouveaux ticks de chaque symbole (thread MT5).
+
+        Returns:
+            int: Nombre de ticks ajoutés
+        """
+        self.polls += 1
+        added = 0
+        for symbol, ring in list(self._rings.items()):
+            ticks = self._fetch(symbol, ring.last_msc)
+            if ticks is None:
+                continue
+            with self._lock:
+                added += ring.extend(ticks)
+                self._polled_at[symbol] = time.monotonic()
+        return added
+
+    @staticmethod
+    def _fetch(symbol, last_msc):
+        """Ticks postérieurs à last_msc, ou None si le terminal n'a rien renvoyé."""
+        if last_msc:
+            # copy_ticks_from travaille à la seconde: on filtre ensuite à la milliseconde
+            raw = mt5.copy_ticks_from(symbol, datetime.fromtimestamp(last_msc // 1000, tz=timezone.utc),
+                                      100000, mt5.COPY_TICKS_ALL)
+            if raw is not None:
+                raw = raw[raw['time_msc'] > last_msc]
+                ticks = np.empty(len(raw), dtype=TICK_DTYPE)
+                for field in ('time_msc', 'bid', 'ask'):
+                    ticks[field] = raw[field]
+                ticks['volume'] = raw['volume_real'] if 'volume_real' in raw.dtype.names else raw['volume']
+                return ticks
+
+        # Premier polling (pas d'historique à rattraper) ou échec de copy_ticks_from
+        tick = mt5.symbol_info_tick(symbol)
+        if tick is None or not tick.bid:
+            return None
+        if tick.time_msc <= last_msc:
+            return np.empty(0, dtype=TICK_DTYPE)
+        return np.array([(tick.time_msc, tick.bid, tick.ask, getattr(tick, 'volume_real', 0.0))], dtype=TICK_DTYPE)
+
+    # --- Lecture (sans appel au terminal) ---
+
+    def latest(self, symbol, max_age=None):
+        """
+        Dernier tick enregistré, si le dernier polling du symbole est assez récent.
+
+        Args:
+            symbol (str): Symbole du courtier
+            max_age (float): Âge maximal du polling en secondes (défaut: self.max_age)
+
+        Returns:
+            SimpleNamespace: {time, time_msc, bid, ask} ou None (passer par symbol_info_tick)
+        """
+        max_age = max_age if max_age is not None else self.max_age
+        with self._lock:
+            ring = self._rings.get(symbol)
+            polled_at = self._polled_at.get(symbol)
+            if ring is None or polled_at is None or not ring.written:
+                return None
+            if time.monotonic() - polled_at > max_age:
+                return None
+            tick = ring.last(1)[0]
+        return SimpleNamespace(time=int(tick['time_msc']) // 1000, time_msc=int(tick['time_msc']),
+                               bid=float(tick['bid']), ask=float(tick['ask']))
+
+    def recent(self, symbol, seconds):
+        """Ticks des dernières secondes (horloge des ticks, pas l'horloge locale)."""
+        with self._lock:
+            ring = self._rings.get(symbol)
+            if ring is None or not ring.written:
+                return np.empty(0, dtype=TICK_DTYPE)
+            return ring.window(ring.last_msc - seconds * 1000)
+
+    def market_stats(self, symbol, seconds=60):
+        """
+        Spread et volatilité récents d'un symbole.
+
+        Args:
+            symbol (str): Symbole du courtier
+            seconds (float): Fenêtre en secondes
+
+        Returns:
+            dict: {ticks, spread_last, spread_mean, spread_max, volatility, high, low} ou None
+        """
+        ticks = self.recent(symbol, seconds)
+        if not len(ticks):
+            return None
+        spread = ticks['ask'] - ticks['bid']
+        mid = (ticks['ask'] + ticks['bid']) / 2
+        returns = np.diff(np.log(mid)) if len(mid) > 1 else np.zeros(1)
+        return {
+            'ticks': len(ticks),
+            'spread_last': float(spread[-1]),
+            'spread_mean': float(spread.mean()),
+            'spread_max': float(spread.max()),
+            # Volatilité réalisée sur la fenêtre (racine de la somme des rendements log au carré)
+            'volatility': float(np.sqrt(np.square(returns).sum())),
+            'high': float(mid.max()),
+            'low': float(mid.min())
+        }
+
+    # --- Persistance ---
+
+    def flush(self):
+        """
+        Écrit les ticks non encore persistés dans les fichiers journaliers puis
+        compresse les jours clos. Sans appel MT5 (thread quelconque).
+
+        Returns:
+            int: Nombre de ticks écrits
+        """
+        written = 0
+        for symbol in self.symbols:
+            with self._lock:
+                ring = self._rings[symbol]
+                lost = max(0, ring.written - ring.capacity - self._flushed[symbol])
+                ticks = ring.since(self._flushed[symbol])
+                self._flushed[symbol] = ring.written
+            if lost:
+                print(f"⚠️ {lost} tick(s) {symbol} perdus avant écriture (tampon trop petit)")
+            if not len(ticks):
+                continue
+
+            folder = os.path.join(self.data_dir, symbol)
+            os.makedirs(folder, exist_ok=True)
+            days = tick_days(ticks['time_msc'])
+            for day in np.unique(days):
+                with open(os.path.join(folder, f"{day}.ticks"), 'ab') as file:
+                    ticks[days == day].tofile(file)
+            written += len(ticks)
+            self._archive(folder, today=days[-1])
+        return written
+
+    @staticmethod
+    def _archive(folder, today):
+        """Compresse les fichiers bruts des jours antérieurs au dernier tick reçu."""
+        for name in os.listdir(folder):
+            day, extension = os.path.splitext(name)
+            if extension != '.ticks' or day >= today:
+                continue
+            raw_path = os.path.join(folder, name)
+            ticks = np.fromfile(raw_path, dtype=TICK_DTYPE)
+            archive_path = os.path.join(folder, f"{day}.npz")
+            if os.path.exists(archive_path):
+                # Ticks arrivés après un premier archivage: fusion
+                with np.load(archive_path) as archive:
+                    ticks = np.concatenate((archive['ticks'], ticks))
+            np.savez_compressed(archive_path, ticks=ticks)
+            os.remove(raw_path)
+
+
+def tick_days(time_msc):
+    """Jour (AAAAMMJJ, heure du serveur) de chaque horodatage en millisecondes."""
+    days = (np.asarray(time_msc) // 1000).astype('datetime64[s]').astype('datetime64[D]')
+    return np.char.replace(days.astype(str), '-', '')
+
+
+def tick_file_days(symbol, data_dir=None):
+    """Jours disponibles sur disque pour un symbole (AAAAMMJJ, triés)."""
+    folder = os.path.join(data_dir or config.TICK_DATA_DIR, symbol)
+    if not os.path.isdir(folder):
+        return []
+    return sorted({os.path.splitext(name)[0] for name in os.listdir(folder) if name.endswith(('.ticks', '.npz'))})
+
+
+def load_ticks(symbol, day, data_dir=None):
+    """
+    Ticks d'un jour en mémoire mappée: fichier brut du jour courant, ou archive
+    compressée décompressée une fois dans un fichier .npy voisin. Si des ticks
+    bruts ont été ajoutés après l'archivage, ils suivent ceux de l'archive.
+
+    Args:
+        symbol (str): Symbole du courtier
+        day (str): Jour AAAAMMJJ
+        data_dir (str): Dossier des ticks (défaut: config.TICK_DATA_DIR)
+
+    Returns:
+        np.ndarray: Ticks (TICK_DTYPE) en lecture seule, vide si le jour est absent
+    """
+    folder = os.path.join(data_dir or config.TICK_DATA_DIR, symbol)
+    raw_path = os.path.join(folder, f"{day}.ticks")
+    archive_path = os.path.join(folder, f"{day}.npz")
+    mapped_path = os.path.join(folder, f"{day}.npy")
+
+    raw = None
+    if os.path.exists(raw_path) and os.path.getsize(raw_path):
+        raw = np.memmap(raw_path, dtype=TICK_DTYPE, mode='r')
+    if not os.path.exists(archive_path):
+        return raw if raw is not None else np.empty(0, dtype=TICK_DTYPE)
+
+    if not os.path.exists(mapped_path) or os.path.getmtime(mapped_path) < os.path.getmtime(archive_path):
+        with np.load(archive_path) as archive:
+            np.save(mapped_path, archive['ticks'])
+    archived = np.load(mapped_path, mmap_mode='r')
+    if raw is None:
+        return archived
+    ticks = np.concatenate((archived, raw))
+    ticks.flags.writeable = False
+    return ticks
+
+
+# Instance globale
+tick_recorder = TickRecorder()
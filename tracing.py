@@ -0,0 +1,217 @@
+import asyncio
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from datetime import timezone
+from config import config
+
+
+class LatencyHistogram:
+    """Fenêtre glissante de latences (ms) avec percentiles."""
+
+    def __init__(self, maxlen=10000):
+        self.values = deque(maxlen=maxlen)
+        self.count = 0
+
+    def add(self, value_ms):
+        self.values.append(value_ms)
+        self.count += 1
+
+    def summary(self):
+        if not self.values:
+            return {'count': self.count, 'p50': None, 'p95': None, 'p99': None, 'max': None}
+        ordered = sorted(self.values)
+
+        def pick(pct):
+            return round(ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))], 3)
+
+        return {
+            'count': self.count,
+            'p50': pick(50),
+            'p95': pick(95),
+            'p99': pick(99),
+            'max': round(ordered[-1], 3)
+        }
+
+
+class SignalTrace:
+    """Horodatages d'un message, de sa réception Telegram jusqu'au dernier ordre acquitté."""
+
+    def __init__(self, channel_id, message_date=None):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.channel_id = channel_id
+        self.marks = {}
+        self.durations = {}
+        self.legs = []
+        if message_date is not None:
+            if message_date.tzinfo is None:
+                message_date = message_date.replace(tzinfo=timezone.utc)
+            self.marks['message_date'] = message_date.timestamp()
+        self.mark('received')
+
+    def mark(self, name, timestamp=None):
+        self.marks[name] = timestamp if timestamp is not None else time.time()
+
+    def span(self, name):
+        """Context manager: enregistre name_start/name_end et la durée de l'étape."""
+        return _Span(self, name)
+
+    def add_leg(self, order_number, submit_time, ack_time, filled=False):
+        self.legs.append({
+            'order_number': order_number,
+            'submit': submit_time,
+            'ack': ack_time,
+            'fill': ack_time if filled else None
+        })
+
+    def to_record(self):
+        record = {
+            'trace_id': self.trace_id,
+            'channel_id': self.channel_id,
+            'marks': {name: round(value, 6) for name, value in self.marks.items()},
+            'durations_ms': {name: round(value, 3) for name, value in self.durations.items()},
+            'legs': self.legs
+        }
+        return record
+
+
+class _Span:
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.trace.mark(f"{self.name}_start")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.mark(f"{self.name}_end")
+        self.trace.durations[self.name] = (time.perf_counter() - self.start) * 1000
+        return False
+
+
+class Tracer:
+    """
+    Collecte des latences du pipeline: histogrammes en mémoire (p50/p95/p99)
+    et journal structuré JSONL (une ligne par message tracé), renommé en .1
+    au-delà de max_bytes pour que sa taille ne croisse pas avec l'uptime.
+    """
+
+    def __init__(self, log_path=None, max_bytes=None):
+        self.log_path = log_path if log_path is not None else config.LATENCY_LOG_PATH
+        self.max_bytes = max_bytes if max_bytes is not None else config.LATENCY_LOG_MAX_BYTES
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, duration_ms):
+        with self._lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = LatencyHistogram()
+            histogram.add(duration_ms)
+
+    def finish(self, trace):
+        """Clôture une trace: calcule les étapes dérivées, alimente les histogrammes et journalise."""
+        marks = trace.marks
+        if 'message_date' in marks:
+            trace.durations['telegram_delivery'] = (marks['received'] - marks['message_date']) * 1000
+        for leg in trace.legs:
+            self.record('leg_submit_to_ack', (leg['ack'] - leg['submit']) * 1000)
+        if trace.legs:
+            last_ack = max(leg['ack'] for leg in trace.legs)
+            trace.durations['signal_to_last_ack'] = (last_ack - marks['received']) * 1000
+            fills = [leg['fill'] for leg in trace.legs if leg['fill']]
+            if fills:
+                trace.durations['signal_to_first_fill'] = (min(fills) - marks['received']) * 1000
+
+        for stage, duration in trace.durations.items():
+            self.record(stage, duration)
+
+        self._write(trace.to_record())
+
+    def summary(self):
+        with self._lock:
+            return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+
+    def _write(self, record):
+        if not self.log_path:
+            return
+        try:
+            directory = os.path.dirname(self.log_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                if self.max_bytes and os.path.exists(self.log_path) and os.path.getsize(self.log_path) >= self.max_bytes:
+                    os.replace(self.log_path, f"{self.log_path}.1")
+                with open(self.log_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            print(f"⚠️ Journal de latence indisponible: {e}")
+
+
+def summarize_log(path=None, limit=5000):
+    """
+    Percentiles par étape à partir du journal structuré (ex: bot dans un autre processus).
+    Lit le journal courant précédé de sa rotation .1: coût borné par LATENCY_LOG_MAX_BYTES.
+
+    Args:
+        path (str): Chemin du journal JSONL (défaut: config)
+        limit (int): Nombre maximal de traces récentes prises en compte
+
+    Returns:
+        dict: {étape: {count, p50, p95, p99, max}}
+    """
+    path = path or config.LATENCY_LOG_PATH
+    histograms = {}
+    if not path:
+        return {}
+    lines = deque(maxlen=limit)
+    for log_path in (f"{path}.1", path):
+        if os.path.exists(log_path):
+            with open(log_path, encoding='utf-8') as f:
+                lines.extend(f)
+    if not lines:
+        return {}
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        for stage, duration in record.get('durations_ms', {}).items():
+            histograms.setdefault(stage, LatencyHistogram()).add(duration)
+        for leg in record.get('legs', []):
+            histograms.setdefault('leg_submit_to_ack', LatencyHistogram()).add((leg['ack'] - leg['submit']) * 1000)
+    return {stage: histogram.summary() for stage, histogram in histograms.items()}
+
+
+def traced(stage):
+    """Décorateur: mesure la durée d'une fonction (sync ou async) dans l'histogramme stage."""
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    tracer.record(stage, (time.perf_counter() - start) * 1000)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                tracer.record(stage, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+# Instance globale
+tracer = Tracer()
@@ -0,0 +1,99 @@
+import time
+from datetime import datetime, timedelta
+import MetaTrader5 as mt5
+from config import config
+from fxConverter import fx_converter
+from info import Infos
+from symbolCache import symbol_cache
+from symbolResolver import symbol_resolver
+
+
+def symbol_universe(symbols=None, history_days=None):
+    """
+    Symboles à préparer: liste configurée + symboles tradés récemment.
+
+    Args:
+        symbols (list): Liste de base (défaut: config.WARMUP_SYMBOLS)
+        history_days (int): Profondeur de l'historique des deals (défaut: config.WARMUP_HISTORY_DAYS)
+
+    Returns:
+        list: Symboles uniques, dans l'ordre de découverte
+    """
+    # Noms configurés traduits en noms du courtier (XAUUSD → XAUUSD.m)
+    symbols = [symbol_resolver.resolve(symbol) or symbol
+               for symbol in (symbols if symbols is not None else config.WARMUP_SYMBOLS)]
+    history_days = history_days if history_days is not None else config.WARMUP_HISTORY_DAYS
+    if history_days:
+        date_from = datetime.now() - timedelta(days=history_days)
+        deals = mt5.history_deals_get(date_from, datetime.now() + timedelta(days=1)) or ()
+        symbols.extend(deal.symbol for deal in deals if deal.symbol)
+    return list(dict.fromkeys(symbols))
+
+
+def warm_up_symbols(symbols=None, history_days=None, tick_timeout=None):
+    """
+    Prépare l'univers de symboles avant le premier signal (thread MT5): sélection
+    dans le Market Watch, attente du premier tick, chargement des spécifications
+    et des taux de conversion vers EUR.
+
+    Args:
+        symbols (list): Liste de base (défaut: config.WARMUP_SYMBOLS)
+        history_days (int): Profondeur de l'historique des deals (défaut: config.WARMUP_HISTORY_DAYS)
+        tick_timeout (float): Attente maximale du premier tick par symbole en secondes
+
+    Returns:
+        dict: {ready, missing, no_tick, currencies, duration_ms}
+    """
+    start = time.perf_counter()
+    tick_timeout = tick_timeout if tick_timeout is not None else config.WARMUP_TICK_TIMEOUT
+
+    ready, missing, no_tick = [], [], []
+    currencies = set()
+    for symbol in symbol_universe(symbols, history_days):
+        # symbol_cache.get sélectionne le symbole puis charge ses spécifications
+        spec = symbol_cache.get(symbol)
+        if not spec:
+            missing.append(symbol)
+            continue
+
+        # Juste après la sélection, le terminal peut ne pas encore avoir reçu de tick
+        deadline = time.monotonic() + tick_timeout
+        tick = mt5.symbol_info_tick(symbol)
+        while (tick is None or not tick.bid) and time.monotonic() < deadline:
+            time.sleep(0.05)
+            tick = mt5.symbol_info_tick(symbol)
+        if tick is None or not tick.bid:
+            no_tick.append(symbol)
+
+        currencies.add(spec['currency_profit'])
+        ready.append(symbol)
+
+    rates = fx_converter.warm_up(sorted(currencies))
+    # Valeur du pip en EUR: même chemin que le dimensionnement des lots
+    for symbol in ready:
+        Infos.get_pip_value_eur(symbol)
+
+    report = {
+        'ready': ready,
+        'missing': missing,
+        'no_tick': no_tick,
+        'currencies': rates,
+        'duration_ms': round((time.perf_counter() - start) * 1000, 2)
+    }
+    print(f"🔥 Warm-up: {len(ready)} symbole(s) prêts, {len(rates)} devise(s) en {report['duration_ms']:.0f} ms")
+    if missing:
+        print(f"⚠️ Symboles indisponibles chez le courtier: {', '.join(missing)}")
+    if no_tick:
+        print(f"⚠️ Aucun tick reçu pour: {', '.join(no_tick)}")
+    return report
+
+
+def keep_warm():
+    """
+    Garde chauds les caches préparés par warm_up_symbols (thread MT5, appelé en boucle):
+    tick_value et taux de conversion sont rafraîchis avant leur expiration.
+
+    Returns:
+        dict: {symbols, rates} - symboles rafraîchis, instantané des taux rafraîchi
+    """
+    return {'symbols': symbol_cache.refresh(), 'rates': fx_converter.refresh()}